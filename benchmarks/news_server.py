@@ -0,0 +1,189 @@
+"""
+Local stand-in for the news sources, serving the pages in benchmarks/corpus.
+
+Usage:
+    python benchmarks/news_server.py [--port 8800] [--articles 50] [--latency-ms 20] [--error-rate 0.0]
+
+Each corpus page is the article template of one entry in news_sources and is served
+as its own site on consecutive ports: "/" is a section page linking to /news/0 ...
+/news/N-1, and every article gets a distinct, deterministic body and a publish date
+within the last few days. Responses are delayed by --latency-ms (with --jitter-ms of
+gaussian noise), and --error-rate of article requests fail with a 500 or a 503.
+"""
+import argparse
+import datetime
+import os
+import random
+import threading
+import time
+from datetime import timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+# (source name in news_sources, corpus page, domain of its extraction profile)
+SOURCES = [
+    ('CNBC', 'cnbc', 'cnbc.com'),
+    ('Bloomberg', 'bloomberg', 'bloomberg.com'),
+    ('Reuters Finance', 'reuters', 'reuters.com'),
+    ('Yahoo Finance', 'yahoo-finance', 'finance.yahoo.com'),
+    ('MarketWatch', 'marketwatch', 'marketwatch.com'),
+    ('Business Insider Finance', 'business-insider', 'businessinsider.com'),
+    ('Forbes', 'forbes', 'forbes.com'),
+]
+
+WORDS = '''
+the a of to and in that for on with as by at from market markets stock stocks shares investors traders
+fed inflation rates interest bond bonds yields treasury economy gdp growth recession earnings revenue profit
+quarter guidance analysts outlook bitcoin crypto ethereum blockchain bank banks banking loan mortgage housing
+oil energy gold commodities dollar currency forex tech company companies ceo deal merger acquisition ipo
+consumer spending jobs unemployment labor wages prices demand supply chain policy central government tariff
+trade exports imports china europe japan said according report data week month year percent points higher lower
+rose fell gained dropped rally selloff volatility risk outlook forecast expected amid while after before
+'''.split()
+
+
+def load_corpus(directory=CORPUS_DIR):
+    """Return {corpus page name: Template} for the pages in the corpus directory"""
+    templates = {}
+    for _, page, _ in SOURCES:
+        with open(os.path.join(directory, f'{page}.html'), encoding='utf-8') as f:
+            templates[page] = Template(f.read())
+    return templates
+
+
+def article_body(page, number, paragraphs=12):
+    """Deterministic, distinct article paragraphs, so articles are not near-duplicates"""
+    rng = random.Random(f'{page}-{number}')
+    return ''.join('<p>' + ' '.join(rng.choice(WORDS) for _ in range(rng.randint(60, 90))).capitalize() + '.</p>'
+                   for _ in range(paragraphs))
+
+
+def render_article(template, page, number, url, published):
+    rng = random.Random(f'{page}-{number}-meta')
+    author = f"{rng.choice(['Jane', 'John', 'Alex', 'Maria', 'Wei', 'Priya'])} {rng.choice(['Doe', 'Smith', 'Chen', 'Garcia', 'Patel'])}"
+    return template.safe_substitute(
+        TITLE=f'{page.replace("-", " ").title()} market story {number}',
+        DATE=published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        AUTHOR=author,
+        AUTHOR_SLUG=author.lower().replace(' ', '-'),
+        KEYWORDS='markets, stocks, economy',
+        URL=url,
+        BODY=article_body(page, number),
+    )
+
+
+class NewsServer:
+    """One ThreadingHTTPServer per corpus page, each on its own port, run in background threads"""
+
+    def __init__(self, port=8800, articles=50, latency_ms=20.0, jitter_ms=5.0, error_rate=0.0, seed=1):
+        self.templates = load_corpus()
+        self.articles = articles
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.started = datetime.datetime.now(timezone.utc)
+        self.requests = 0
+        self.errors = 0
+        self.sources = {}
+        self.profile_domains = {}
+        self.servers = []
+        for offset, (name, page, domain) in enumerate(SOURCES):
+            server = ThreadingHTTPServer(('127.0.0.1', port + offset), self._handler(page))
+            server.daemon_threads = True
+            url = f'http://127.0.0.1:{server.server_address[1]}/'
+            self.sources[name] = url
+            self.profile_domains[url] = domain
+            self.servers.append(server)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def publish_date(self, number):
+        """Articles are an hour apart, newest first"""
+        return self.started - datetime.timedelta(hours=number)
+
+    def _roll(self):
+        with self.random_lock:
+            delay = max(0.0, self.random.gauss(self.latency, self.jitter))
+            failed = self.random.random() < self.error_rate
+            status = self.random.choice((500, 503))
+        return delay, failed, status
+
+    def _handler(self, page):
+        news_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send_body(self, body, content_type='text/html; charset=utf-8'):
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                news_server.requests += 1
+                delay, failed, status = news_server._roll()
+                time.sleep(delay)
+                path = self.path.split('?')[0]
+                if path == '/':
+                    links = ''.join(f'<li><a href="/news/{n}">Story {n}</a></li>' for n in range(news_server.articles))
+                    self.send_body(f'<html><head><title>{page}</title></head><body><ul>{links}</ul></body></html>')
+                    return
+                number = path[len('/news/'):]
+                if path.startswith('/news/') and number.isdigit() and int(number) < news_server.articles:
+                    if failed:
+                        news_server.errors += 1
+                        self.send_response(status)
+                        if status == 503:
+                            self.send_header('Retry-After', '0')
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    number = int(number)
+                    url = f'http://127.0.0.1:{self.server.server_address[1]}/news/{number}'
+                    self.send_body(render_article(news_server.templates[page], page, number, url,
+                                                  news_server.publish_date(number)))
+                    return
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+        return Handler
+
+    def article_urls(self):
+        return [f'{url}news/{n}' for url in self.sources.values() for n in range(self.articles)]
+
+    def stop(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--port', type=int, default=8800, help='port of the first source')
+    arg_parser.add_argument('--articles', type=int, default=50, help='articles per source')
+    arg_parser.add_argument('--latency-ms', type=float, default=20.0)
+    arg_parser.add_argument('--jitter-ms', type=float, default=5.0)
+    arg_parser.add_argument('--error-rate', type=float, default=0.0)
+    args = arg_parser.parse_args()
+
+    server = NewsServer(args.port, args.articles, args.latency_ms, args.jitter_ms, args.error_rate)
+    for name, url in server.sources.items():
+        print(f"{name:28s} {url}")
+    print("Serving, press Ctrl-C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
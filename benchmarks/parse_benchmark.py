@@ -0,0 +1,211 @@
+"""
+Per-page parse time of article extraction, before and after the single-pass extractor.
+
+Usage:
+    python benchmarks/parse_benchmark.py [page.html ...] [--iterations N]
+
+Without page arguments a synthetic article page is used. "before" is the original
+selector-chain extraction on html.parser with its dateutil date parsing, copied here so it
+does not change with the scraper; "after" is ArticleExtractor on each backend.
+Outputs are compared with "before" field by field. Title, author and keywords are now read
+from the page's structured metadata first, so differences in them are expected and
+counted separately from mismatches in the extracted text.
+"""
+import argparse
+import datetime
+import logging
+import os
+import re
+import sys
+import time
+from datetime import timezone
+
+from bs4 import BeautifulSoup
+from dateutil import parser as date_parser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from financial_news_scraper import ArticleExtractor, DateParser  # noqa: E402
+
+# Date texts seen on news pages and the UTC time DateParser must read from them
+DATE_CASES = [
+    ('2025-04-10T13:45:00Z', '2025-04-10 13:45'),
+    ('2025-04-10T09:45:00-04:00', '2025-04-10 13:45'),
+    ('2025-04-10 13:45', '2025-04-10 13:45'),
+    ('2025-04-10 13:45 EST', '2025-04-10 18:45'),
+    ('Published 2025-04-10 09:45 EDT', '2025-04-10 13:45'),
+    ('April 10, 2025 1:45 PM EST', '2025-04-10 18:45'),
+    ('Apr. 10, 2025 at 1:45 PM GMT', '2025-04-10 13:45'),
+    ('Thu, 10 Apr 2025 13:45:00 +0000', '2025-04-10 13:45'),
+    ('04/10/2025', '2025-04-10 00:00'),
+]
+
+# Fields ArticleExtractor reads from JSON-LD/OpenGraph before the page markup, which the
+# selector chain never looked at
+METADATA_FIELDS = ('title', 'author', 'keywords')
+# Fields that must match the selector chain exactly
+COMPARED_FIELDS = ('content', 'summary')
+
+
+def check_dates():
+    """Return the DATE_CASES that DateParser reads wrongly, as (text, expected, got)"""
+    failures = []
+    for text, expected in DATE_CASES:
+        parsed, _ = DateParser().parse(text)
+        got = parsed.strftime('%Y-%m-%d %H:%M') if parsed else None
+        if got != expected:
+            failures.append((text, expected, got))
+    return failures
+
+
+def legacy_parse_relative_time(text):
+    """parse_relative_time as it was before DateParser, kept here so "before" stays fixed"""
+    now = datetime.datetime.now(timezone.utc)
+    text = text.lower().strip()
+    m = re.search(r'(\d+)\s*([mhdy])', text)
+    if m:
+        value = int(m.group(1))
+        unit = m.group(2)
+        if unit == 'm':
+            return now - datetime.timedelta(minutes=value)
+        elif unit == 'h':
+            return now - datetime.timedelta(hours=value)
+        elif unit == 'd':
+            return now - datetime.timedelta(days=value)
+        elif unit == 'y':
+            return now - datetime.timedelta(days=365*value)
+    if 'a few seconds ago' in text or 'just now' in text:
+        return now
+    raise ValueError(f"Unable to parse relative time: {text}")
+
+
+def legacy_extract(html, url=''):
+    """
+    The extraction code from extract_article_content before the single-pass extractor,
+    including its dateutil date parsing
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    title = soup.title.text.strip() if soup.title else ''
+    author = 'Unknown'
+    author_elements = soup.select('a[rel="author"], span.author, .byline, .author')
+    if author_elements:
+        author = author_elements[0].text.strip()
+    date_elements = soup.select('time, .date, .published, meta[property="article:published_time"]')
+    if date_elements:
+        if date_elements[0].name == 'meta':
+            date_text = date_elements[0].get('content', '').strip()
+        else:
+            date_text = date_elements[0].text.strip()
+        try:
+            if 'ago' in date_text.lower():
+                publish_date = legacy_parse_relative_time(date_text)
+            else:
+                publish_date = date_parser.parse(date_text)
+            if publish_date.tzinfo is None:
+                publish_date = publish_date.replace(tzinfo=timezone.utc)
+            else:
+                publish_date = publish_date.astimezone(timezone.utc)
+        except Exception as e:
+            logging.warning(f"Could not parse date '{date_text}' from {url}: {e}")
+            publish_date = datetime.datetime.now(timezone.utc)
+    else:
+        publish_date = datetime.datetime.now(timezone.utc)
+    content_selectors = [
+        'article', '.article-body', '.article-content', '.story-body',
+        '.post-content', '.entry-content', '.content', '#content',
+        '[itemprop="articleBody"]', '.body'
+    ]
+    content_element = None
+    for selector in content_selectors:
+        elements = soup.select(selector)
+        if elements:
+            content_element = elements[0]
+            break
+    if not content_element:
+        content_element = soup.body
+    paragraphs = content_element.find_all('p') if content_element else []
+    content = '\n\n'.join([p.text.strip() for p in paragraphs])
+    summary = '\n\n'.join([p.text.strip() for p in paragraphs[:2]])
+    if len(summary) > 500:
+        summary = summary[:497] + '...'
+    keywords = []
+    keyword_meta = soup.find('meta', attrs={'name': 'keywords'})
+    if keyword_meta:
+        keywords = [k.strip() for k in keyword_meta.get('content', '').split(',')]
+    return {
+        'title': title,
+        'author': author,
+        'publish_date': publish_date,
+        'content': content,
+        'summary': summary,
+        'keywords': ','.join(keywords)
+    }
+
+
+def synthetic_page():
+    """A page shaped like a typical news article: heavy navigation, then the story"""
+    nav = ''.join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(150))
+    related = ''.join(f'<div class="card"><a href="/news/{i}">Related story {i}</a><span>2h ago</span></div>' for i in range(60))
+    body = ''.join(f'<p>Paragraph {i}: stocks rallied as the Federal Reserve signalled that inflation is cooling, '
+                   f'while traders weighed earnings from the largest banks.</p>' for i in range(40))
+    return f'''<html><head><title>Stocks rally on Fed outlook</title>
+<meta property="article:published_time" content="2025-04-10T13:45:00Z">
+<meta name="keywords" content="stocks, fed, inflation"></head>
+<body><header><ul>{nav}</ul></header>
+<main><div class="byline"><a rel="author" href="/people/jane">Jane Doe</a></div>
+<div class="article-body">{body}</div></main>
+<aside>{related}</aside><footer><p>Copyright</p></footer></body></html>'''
+
+
+def count_differences(extract, pages, baseline, fields):
+    """Number of pages whose output differs from the baseline in any of the fields"""
+    return sum(1 for html, expected in zip(pages, baseline)
+               if any(extract(html).get(field) != expected[field] for field in fields))
+
+
+def time_per_page(extract, pages, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for html in pages:
+            extract(html)
+    return (time.perf_counter() - start) * 1000 / (iterations * len(pages))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('pages', nargs='*', help='saved article HTML files')
+    arg_parser.add_argument('--iterations', type=int, default=20)
+    args = arg_parser.parse_args()
+
+    pages = []
+    for path in args.pages:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            pages.append(f.read())
+    if not pages:
+        pages = [synthetic_page()]
+
+    candidates = [('before: selector chain, html.parser', legacy_extract)]
+    for backend in ('html.parser', 'lxml'):
+        try:
+            BeautifulSoup('<p></p>', backend)
+        except Exception:
+            print(f"Skipping unavailable parser backend: {backend}")
+            continue
+        candidates.append((f'after: single pass, {backend}', ArticleExtractor(backend).extract))
+
+    failures = check_dates()
+    print(f"Date parsing: {len(DATE_CASES) - len(failures)}/{len(DATE_CASES)} cases correct")
+    for text, expected, got in failures:
+        print(f"  {text!r}: expected {expected}, got {got}")
+
+    baseline = [legacy_extract(html) for html in pages]
+    print(f"{len(pages)} page(s), {args.iterations} iteration(s)")
+    for label, extract in candidates:
+        mismatches = count_differences(extract, pages, baseline, COMPARED_FIELDS)
+        metadata_differences = count_differences(extract, pages, baseline, METADATA_FIELDS)
+        per_page = time_per_page(extract, pages, args.iterations)
+        print(f"{label:40s} {per_page:8.2f} ms/page   text mismatches vs before: {mismatches}   "
+              f"metadata differences (expected): {metadata_differences}")
+
+
+if __name__ == '__main__':
+    main()
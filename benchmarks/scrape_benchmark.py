@@ -0,0 +1,340 @@
+"""
+End-to-end and per-component scraper performance against the local news server.
+
+Usage:
+    python benchmarks/scrape_benchmark.py [--articles 50] [--latency-ms 20] [--error-rate 0.0]
+        [--max-workers 8] [--parse-workers 0] [--worker-processes 1,2,4]
+        [--queue-backend sqlite|served] [--trials 1]
+        [--json results.json] [--baseline results.json]
+
+The pipeline run scrapes every source of benchmarks/news_server.py through
+scrape_sources, the full process_article path, into a fresh database, and reports
+pages/sec, fetch/parse/categorize/insert latency percentiles, DB inserts/sec and peak
+RSS. The component runs then time fetching, parsing, categorization and inserts on
+their own. --worker-processes crawls the sources again with that many run_worker
+processes for each count given, to show how the shared work queue scales: sharing one
+database (--queue-backend sqlite), or each with its own database, taking work from the
+queue of another one served over HTTP as for workers on other hosts (served). The
+pages/sec of each count is the median of --trials crawls. With --baseline, a throughput more than --tolerance below the baseline's
+is reported as a regression and the exit status is 1.
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timezone
+from types import SimpleNamespace
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from financial_news_scraper import (  # noqa: E402
+    DEFAULT_EXTRACTION_PROFILES, ArticleExtractor, ArticleWriter, ExtractionProfile,
+    FinancialNewsScraper, HostRateLimiter, KeywordCategorizer, SQLiteWorkQueue, profile_domain
+)
+from news_server import SOURCES, NewsServer, render_article  # noqa: E402
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def percentiles(samples):
+    """p50/p90/p99/max of a list of durations in seconds, in milliseconds"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+    return {'count': len(ordered), 'p50': pick(0.50), 'p90': pick(0.90), 'p99': pick(0.99), 'max': pick(1.0)}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and its finished children, in MB"""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def make_scraper(db_path, server, args, queue_url=None):
+    """A scraper pointed at the local server, with each source's real extraction profile"""
+    scraper = FinancialNewsScraper(db_path, max_workers=args.max_workers, per_host_limit=args.per_host_limit,
+                                   parse_workers=args.parse_workers, queue_url=queue_url)
+    scraper.news_sources = dict(server.sources)
+    scraper.feed_urls = {}
+    for url, domain in server.profile_domains.items():
+        local = profile_domain(url)
+        scraper.extractor.profiles[local] = ExtractionProfile(local, DEFAULT_EXTRACTION_PROFILES[domain])
+    if not args.polite:
+        # Measure the scraper, not the politeness delays
+        scraper.rate_limiter = HostRateLimiter(initial_rate=1000.0, max_rate=1000.0, burst=100)
+    return scraper
+
+
+def run_pipeline(server, args, workdir):
+    """Scrape every local source once and report the stage timings the scraper collected"""
+    scraper = make_scraper(os.path.join(workdir, 'pipeline.db'), server, args)
+    now = datetime.datetime.now(timezone.utc)
+    date_range = (now - datetime.timedelta(days=30), now + datetime.timedelta(days=1))
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        saved = scraper.scrape_sources(date_range)
+    elapsed = time.perf_counter() - start
+    scraper.close()
+
+    stages = {stage: timers['all'] for stage, timers in scraper.metrics.snapshot()['stages'].items()}
+    fetched = stages.get('fetch', {}).get('count', 0)
+    written = scraper.metrics.snapshot()['sources'].get('all', {}).get('rows_written', 0)
+    write_time = stages.get('db_write', {}).get('total_seconds')
+    return {
+        'pages': fetched,
+        'saved': saved,
+        'seconds': round(elapsed, 2),
+        'pages_per_sec': round(fetched / elapsed, 1) if elapsed else None,
+        'inserts_per_sec': round(written / write_time, 1) if write_time else None,
+        'stages_ms': {stage: {key: value for key, value in stages[stage].items() if key != 'total_seconds'}
+                      for stage in ('fetch', 'request', 'download', 'html_parse', 'extract', 'date_parse',
+                                    'simhash', 'categorize', 'dedupe', 'db_write', 'frontier_update')
+                      if stage in stages},
+    }
+
+
+def run_queue_worker(db_path, server, args, queue_url=None):
+    """One worker process of run_workers"""
+    logging.getLogger().setLevel(logging.ERROR)
+    scraper = make_scraper(db_path, server, args, queue_url)
+    scraper.default_poll_interval = 3600
+    scraper.poll_intervals = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.run_worker(idle_exit=1.0)
+    scraper.close()
+
+
+def crawl_with_workers(count, site, args, workdir):
+    """Crawl every local source once with count worker processes; returns pages, duplicates and seconds"""
+    queue_db = os.path.join(workdir, 'queue.db')
+    FinancialNewsScraper(queue_db).close()
+    work_queue = None
+    if args.queue_backend == 'served':
+        work_queue = SQLiteWorkQueue(queue_db)
+        queue_url = f"http://127.0.0.1:{work_queue.serve(0)}/"
+        db_paths = [os.path.join(workdir, f'worker-{number}.db') for number in range(count)]
+        for db_path in db_paths:
+            FinancialNewsScraper(db_path).close()
+    else:
+        queue_url = None
+        db_paths = [queue_db] * count
+    try:
+        start = time.perf_counter()
+        workers = [multiprocessing.Process(target=run_queue_worker, args=(db_path, site, args, queue_url))
+                   for db_path in db_paths]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        # Every worker waits out idle_exit once the queue is empty
+        elapsed = time.perf_counter() - start - 1.0
+    finally:
+        if work_queue is not None:
+            work_queue.close()
+    urls = []
+    for db_path in sorted(set(db_paths)):
+        conn = sqlite3.connect(db_path)
+        urls += [url for (url,) in conn.execute("SELECT url FROM articles")]
+        conn.close()
+    return len(urls), len(urls) - len(set(urls)), elapsed
+
+
+def run_workers(server, args, workdir):
+    """Crawl every local source with each number of worker processes and report pages/sec"""
+    # Only what make_scraper needs, so the workers can be started with any start method
+    site = SimpleNamespace(sources=dict(server.sources), profile_domains=dict(server.profile_domains))
+    results = {}
+    for count in args.worker_processes:
+        trials = []
+        for trial in range(args.trials):
+            trial_dir = os.path.join(workdir, f'workers-{count}-{trial}')
+            os.makedirs(trial_dir)
+            trials.append(crawl_with_workers(count, site, args, trial_dir))
+        rates = [pages / elapsed for pages, _, elapsed in trials if elapsed > 0]
+        pages, duplicates, elapsed = trials[-1]
+        results[count] = {'pages': pages, 'duplicates': max(duplicates for _, duplicates, _ in trials),
+                          'seconds': round(statistics.median(elapsed for _, _, elapsed in trials), 2),
+                          'pages_per_sec': round(statistics.median(rates), 1) if rates else None,
+                          'trials_pages_per_sec': [round(rate, 1) for rate in rates]}
+    return results
+
+
+def run_components(server, args, workdir):
+    """Time fetching, parsing, categorization and inserts on their own"""
+    results = {}
+    urls = server.article_urls()[:args.component_pages]
+
+    session = requests.Session()
+    samples = []
+    start = time.perf_counter()
+    for url in urls:
+        t = time.perf_counter()
+        session.get(url, timeout=10).content
+        samples.append(time.perf_counter() - t)
+    results['fetch'] = {'per_sec': round(len(urls) / (time.perf_counter() - start), 1), 'ms': percentiles(samples)}
+
+    pages = []
+    corpus_pages = {domain: page for _, page, domain in SOURCES}
+    for url, domain in server.profile_domains.items():
+        page = corpus_pages[domain]
+        for number in range(args.component_pages // len(server.profile_domains) or 1):
+            article_url = f'{url}news/{number}'
+            pages.append((article_url, render_article(server.templates[page], page, number, article_url,
+                                                      server.publish_date(number)).encode('utf-8')))
+    profiled = ArticleExtractor(profiles={profile_domain(url): DEFAULT_EXTRACTION_PROFILES[domain]
+                                          for url, domain in server.profile_domains.items()})
+    generic = ArticleExtractor()
+    articles = []
+    for label, extractor in (('parse', profiled), ('parse_generic', generic)):
+        samples = []
+        for url, html in pages:
+            t = time.perf_counter()
+            article = extractor.extract(extractor.parse(html), url)
+            samples.append(time.perf_counter() - t)
+            if extractor is profiled:
+                articles.append(article)
+        results[label] = {'per_sec': round(len(samples) / sum(samples), 1), 'ms': percentiles(samples)}
+
+    categorizer = KeywordCategorizer()
+    samples = []
+    for article in articles:
+        t = time.perf_counter()
+        categorizer.categorize(article['content'], article['title'])
+        samples.append(time.perf_counter() - t)
+    results['categorize'] = {'per_sec': round(len(samples) / sum(samples), 1), 'ms': percentiles(samples)}
+
+    db_path = os.path.join(workdir, 'inserts.db')
+    FinancialNewsScraper(db_path).close()
+    retrieved = datetime.datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    rows = [{
+        'title': f'Insert benchmark {i}', 'url': f'http://bench.local/news/{i}', 'url_key': f'http://bench.local/news/{i}',
+        'source': 'Bench', 'author': 'Bench', 'publish_date': retrieved, 'content': articles[i % len(articles)]['content'] + str(i),
+        'summary': '', 'keywords': '', 'retrieved_date': retrieved, 'category': 'general'
+    } for i in range(args.insert_rows)]
+    start = time.perf_counter()
+    with ArticleWriter(db_path) as writer:
+        for row in rows:
+            writer.add(row)
+    elapsed = time.perf_counter() - start
+    results['insert'] = {'per_sec': round(len(rows) / elapsed, 1), 'rows': len(rows)}
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return the throughput metrics that fell more than tolerance below the baseline"""
+    regressions = []
+    checks = [('pipeline pages/sec', ('pipeline', 'pages_per_sec')), ('pipeline inserts/sec', ('pipeline', 'inserts_per_sec'))]
+    checks += [(f'{name} per second', ('components', name, 'per_sec')) for name in results.get('components', {})]
+    for label, path in checks:
+        current, previous = results, baseline
+        for key in path:
+            current = current.get(key) if isinstance(current, dict) else None
+            previous = previous.get(key) if isinstance(previous, dict) else None
+        if current and previous and current < previous * (1 - tolerance):
+            regressions.append(f"{label}: {current} vs baseline {previous} ({(current / previous - 1) * 100:+.1f}%)")
+    return regressions
+
+
+def print_report(results):
+    pipeline = results['pipeline']
+    print(f"Pipeline: {pipeline['pages']} pages in {pipeline['seconds']}s, {pipeline['saved']} saved")
+    print(f"  pages/sec {pipeline['pages_per_sec']}   DB inserts/sec {pipeline['inserts_per_sec']}   peak RSS {results['peak_rss_mb']} MB")
+    for stage, stats in pipeline['stages_ms'].items():
+        print(f"  {stage:15s} n={stats['count']:<5d} p50 {stats['p50_ms']:8.2f} ms  p90 {stats['p90_ms']:8.2f} ms  "
+              f"p99 {stats['p99_ms']:8.2f} ms  max {stats['max_ms']:8.2f} ms")
+    if 'workers' in results:
+        print(f"Worker processes ({results['settings']['queue_backend']} queue, {results['cpu_count']} CPUs, "
+              f"median of {results['settings']['trials']}):")
+        single = results['workers'].get(1, {}).get('pages_per_sec')
+        for count, stats in results['workers'].items():
+            scaling = f"  {stats['pages_per_sec'] / single:5.2f}x" if single and stats['pages_per_sec'] else ''
+            print(f"  {count:3d} {stats['pages_per_sec']:10.1f} pages/sec  {stats['pages']} pages, "
+                  f"{stats['duplicates']} duplicates{scaling}  trials {stats['trials_pages_per_sec']}")
+    if 'components' in results:
+        print("Components:")
+        for name, stats in results['components'].items():
+            timing = f"  p50 {stats['ms']['p50']:8.2f} ms  p99 {stats['ms']['p99']:8.2f} ms" if 'ms' in stats else ''
+            print(f"  {name:14s} {stats['per_sec']:10.1f} /sec{timing}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--articles', type=int, default=50, help='articles per source')
+    arg_parser.add_argument('--latency-ms', type=float, default=20.0)
+    arg_parser.add_argument('--jitter-ms', type=float, default=5.0)
+    arg_parser.add_argument('--error-rate', type=float, default=0.0)
+    arg_parser.add_argument('--port', type=int, default=8800)
+    arg_parser.add_argument('--max-workers', type=int, default=8)
+    arg_parser.add_argument('--per-host-limit', type=int, default=2)
+    arg_parser.add_argument('--parse-workers', type=int, default=0)
+    arg_parser.add_argument('--polite', action='store_true', help='keep the default per-host rate limits')
+    arg_parser.add_argument('--component-pages', type=int, default=70)
+    arg_parser.add_argument('--insert-rows', type=int, default=2000)
+    arg_parser.add_argument('--skip-components', action='store_true')
+    arg_parser.add_argument('--worker-processes', type=lambda value: [int(n) for n in value.split(',')], default=[],
+                            help='comma-separated worker process counts to crawl the shared queue with')
+    arg_parser.add_argument('--queue-backend', choices=('sqlite', 'served'), default='sqlite',
+                            help='workers share one database, or each has its own and takes work from a served queue')
+    arg_parser.add_argument('--trials', type=int, default=1, help='crawls per worker process count; the median is reported')
+    arg_parser.add_argument('--json', help='write the results to this file')
+    arg_parser.add_argument('--baseline', help='results file of an earlier run to compare against')
+    arg_parser.add_argument('--tolerance', type=float, default=0.10)
+    args = arg_parser.parse_args()
+
+    # Per-article warnings would drown the report (parser processes keep their own logging setup)
+    logging.getLogger().setLevel(logging.ERROR)
+    server = NewsServer(args.port, args.articles, args.latency_ms, args.jitter_ms, args.error_rate)
+    workdir = tempfile.mkdtemp(prefix='scrape-benchmark-')
+    try:
+        results = {
+            'settings': {key: value for key, value in vars(args).items() if key not in ('json', 'baseline')},
+            'cpu_count': os.cpu_count(),
+            'pipeline': run_pipeline(server, args, workdir),
+        }
+        if args.worker_processes:
+            results['workers'] = run_workers(server, args, workdir)
+        if not args.skip_components:
+            results['components'] = run_components(server, args, workdir)
+        results['peak_rss_mb'] = peak_rss_mb()
+        results['server'] = {'requests': server.requests, 'injected_errors': server.errors}
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
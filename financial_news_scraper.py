@@ -1,5 +1,8 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+import soupsieve
 import sqlite3
 import datetime
 import time
@@ -10,11 +13,50 @@ import logging
 import sys
 import traceback
 import re
-from urllib.parse import urlparse, urljoin
-from collections import Counter
+import threading
+import queue
+import multiprocessing
+import hashlib
+import base64
+import binascii
+import argparse
+import atexit
+import signal
+import socket
+import csv
+import gzip
+import zlib
+import xml.etree.ElementTree as ElementTree
+from urllib.robotparser import RobotFileParser
+from email.utils import parsedate_to_datetime
+from html import unescape
+from urllib.parse import urlparse, urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+from collections import Counter, OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from datetime import timezone
 from dateutil import parser as date_parser  
 
+# pyarrow is only needed for Parquet exports
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# feedparser reads RSS/Atom feeds for article discovery; without it only sitemaps and listing pages are used
+try:
+    import feedparser
+except ImportError:
+    feedparser = None
+
+# lxml is a much faster tree builder for BeautifulSoup; fall back to the stdlib parser without it
+try:
+    import lxml  # noqa: F401
+    DEFAULT_HTML_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_HTML_PARSER = 'html.parser'
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -50,11 +92,2366 @@ def parse_relative_time(text):
         return now
     raise ValueError(f"Unable to parse relative time: {text}")
 
+# Query parameters that only track the click or referrer and never change the article
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'cmpid', 'ncid', 'guccounter',
+    'guce_referrer', 'guce_referrer_sig', '__source', '.tsrc', 'tpcc', 'smid', 'mod', 'ref',
+    'sr_share', 'soc_src', 'soc_trk', 'taid', 'yptr', 'amp', 'outputtype'
+}
+
+# Path segments that look like an article (a slug, a date or a page) rather than a section
+ARTICLE_SEGMENT_PATTERN = re.compile(r'[-\d]|\.html?$')
+
+def strip_amp_path(path):
+    """
+    Map the path of an AMP copy of an article to the article's own path: a trailing /amp
+    after an article slug, an /amp/ prefix before an article path, or a .amp.html page.
+    Section paths such as /markets/amp are left alone.
+    """
+    segments = path.split('/')
+    if len(segments) > 2 and segments[-1] == 'amp' and ARTICLE_SEGMENT_PATTERN.search(segments[-2]):
+        return '/'.join(segments[:-1])
+    if len(segments) > 2 and segments[1] == 'amp' and ARTICLE_SEGMENT_PATTERN.search(segments[-1]):
+        return '/' + '/'.join(segments[2:])
+    if path.endswith('.amp.html'):
+        return path[:-9] + '.html'
+    return path
+
+def normalize_url(url):
+    """
+    Normalize a URL for duplicate checks: lowercase scheme and host, drop default ports,
+    fragments and trailing slashes, strip tracking parameters (utm_* and TRACKING_PARAMS),
+    AMP variants and the www. prefix, and sort the remaining query parameters.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    # amp.example.com and www.example.com both key as example.com
+    if netloc.startswith('amp.') or netloc.startswith('www.'):
+        netloc = netloc[4:]
+    path = strip_amp_path(parts.path.rstrip('/') or '/')
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    ))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+def url_hash(url_key):
+    """Return a compact 8-byte digest of a normalized URL for the in-memory index"""
+    return hashlib.blake2b(url_key.encode('utf-8'), digest_size=8).digest()
+
+# ISO-8601 dates (JSON-LD, OpenGraph, <time datetime>), found anywhere in a date text
+ISO_DATE_PATTERN = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:[.,](\d{1,6})\d*)?)?\s*(Z|[+-]\d{2}(?::?\d{2})?)?)?'
+)
+
+def parse_iso_date(text):
+    """Parse the first ISO-8601 date in a text into a UTC datetime (naive times are UTC), or None"""
+    m = ISO_DATE_PATTERN.search(text)
+    if not m:
+        return None
+    year, month, day, hour, minute, second, fraction, zone = m.groups()
+    try:
+        parsed = datetime.datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0),
+                                   int(second or 0), int((fraction or '0').ljust(6, '0')))
+        if zone and zone.upper() != 'Z':
+            digits = zone[1:].replace(':', '')
+            offset = datetime.timedelta(hours=int(digits[:2]), minutes=int(digits[2:4] or 0))
+            return parsed.replace(tzinfo=datetime.timezone(-offset if zone[0] == '-' else offset)).astimezone(timezone.utc)
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=timezone.utc)
+
+# Date formats seen on news pages, tried with strptime after ISO-8601
+DATE_FORMATS = [
+    '%B %d, %Y %I:%M %p', '%B %d, %Y %H:%M', '%B %d, %Y', '%b %d, %Y %I:%M %p', '%b %d, %Y %H:%M', '%b %d, %Y',
+    '%A, %B %d, %Y %I:%M %p', '%A, %B %d, %Y', '%d %B %Y %H:%M', '%d %B %Y', '%d %b %Y %H:%M', '%d %b %Y',
+    '%a, %d %b %Y %H:%M:%S %z', '%a, %d %b %Y %H:%M:%S', '%m/%d/%Y %I:%M %p', '%m/%d/%Y', '%Y/%m/%d %H:%M', '%Y/%m/%d',
+]
+# Labels in front of a visible date ("Published: ...", "Updated on ...")
+DATE_LABEL_PATTERN = re.compile(r'^\s*(?:(?:first\s+|last\s+)?(?:published|updated|posted|modified)(?:\s+on)?\s*:?\s*)', re.I)
+# UTC offsets of the timezone abbreviations news pages print after a time, in hours
+TIMEZONE_OFFSETS = {'UTC': 0, 'GMT': 0, 'EST': -5, 'EDT': -4, 'CST': -6, 'CDT': -5, 'PST': -8, 'PDT': -7,
+                    'BST': 1, 'CET': 1, 'CEST': 2, 'JST': 9, 'HKT': 8, 'SGT': 8, 'IST': 5.5}
+TIMEZONE_SUFFIX_PATTERN = re.compile(r'\s+([A-Z]{2,4})$')
+ABBREVIATED_MONTH_PATTERN = re.compile(r'\b(Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\.')
+
+class DateParser:
+    """
+    Publish date parser that tries the cheap parsers first: the strptime format that last
+    worked for the same source, an ISO-8601 scan, the other DATE_FORMATS, and only then
+    parse_relative_time and dateutil. The format that read a source's dates is cached per
+    source, so most pages of a site are parsed on the first try.
+    """
+    def __init__(self):
+        self.formats = {}
+
+    def _strptime(self, text, fmt):
+        try:
+            parsed = datetime.datetime.strptime(text, fmt)
+        except ValueError:
+            return None
+        return parsed.replace(tzinfo=timezone.utc) if parsed.tzinfo is None else parsed.astimezone(timezone.utc)
+
+    def parse(self, text, source=''):
+        """Return (UTC datetime, method) for a date text, or (None, None) when nothing can read it"""
+        text = ' '.join(text.split())
+        if not text:
+            return None, None
+        text = DATE_LABEL_PATTERN.sub('', text)
+        cleaned = ABBREVIATED_MONTH_PATTERN.sub(r'\1', text.replace(' at ', ' '))
+        # Fixed-offset timezone abbreviations are applied here, strptime's %Z only knows UTC/GMT
+        offset = None
+        m = TIMEZONE_SUFFIX_PATTERN.search(cleaned)
+        if m and m.group(1) in TIMEZONE_OFFSETS:
+            offset = datetime.timedelta(hours=TIMEZONE_OFFSETS[m.group(1)])
+            cleaned = cleaned[:m.start()]
+
+        cached = self.formats.get(source)
+        if cached is not None:
+            parsed = self._strptime(cleaned, cached)
+            if parsed is not None:
+                return (parsed - offset if offset else parsed), cached
+        parsed = parse_iso_date(cleaned)
+        if parsed is not None:
+            if offset and not ISO_DATE_PATTERN.search(cleaned).group(8):
+                # A naive ISO time followed by an abbreviation is in that timezone
+                parsed -= offset
+            return parsed, 'iso'
+        for fmt in DATE_FORMATS:
+            if fmt == cached:
+                continue
+            parsed = self._strptime(cleaned, fmt)
+            if parsed is not None:
+                self.formats[source] = fmt
+                return (parsed - offset if offset else parsed), fmt
+        try:
+            if 'ago' in text.lower() or 'just now' in text.lower():
+                return parse_relative_time(text), 'relative'
+            parsed = date_parser.parse(text)
+        except Exception as e:
+            logging.debug(f"Could not parse date '{text}': {e}")
+            return None, None
+        if parsed.tzinfo is None:
+            return parsed.replace(tzinfo=timezone.utc), 'dateutil'
+        return parsed.astimezone(timezone.utc), 'dateutil'
+
+# Shared parser for parse_publish_date
+DATE_PARSER = DateParser()
+
+def parse_publish_date(date_text, url=''):
+    """
+    Parse a publish date string (absolute or relative) into a UTC datetime.
+    Falls back to the current time when the text cannot be parsed.
+    """
+    publish_date, _ = DATE_PARSER.parse(date_text, profile_domain(url))
+    if publish_date is None:
+        logging.warning(f"Could not parse date '{date_text}' from {url}")
+        return datetime.datetime.now(timezone.utc)
+    return publish_date
+
+# End of a page's head, found in the raw bytes while the page is still streaming in
+HEAD_END_BYTES_PATTERN = re.compile(rb'</head\s*>|<body[\s>]', re.I)
+
+def find_head_date(html_start):
+    """
+    Read the publish date a page declares in its <head>, JSON-LD datePublished first and
+    then article:published_time, the way ArticleExtractor reads it. Only the head is looked
+    at, so the dates of related stories further down the page never count; call it once the
+    head is complete. Returns a UTC datetime, or None.
+    """
+    head_end = HEAD_END_BYTES_PATTERN.search(html_start)
+    if head_end:
+        html_start = html_start[:head_end.start()]
+    date_text = read_structured_metadata(html_start).get('date')
+    if not date_text:
+        return None
+    publish_date, _ = DATE_PARSER.parse(date_text)
+    return publish_date
+
+# Site-specific selectors for the sources in FinancialNewsScraper.news_sources, by domain
+DEFAULT_EXTRACTION_PROFILES = {
+    'cnbc.com': {
+        'content': ['.ArticleBody-articleBody'],
+        'author': ['.Author-authorName'],
+        'date': ['time[data-testid="published-timestamp"]']
+    },
+    'bloomberg.com': {
+        'content': ['.body-content', '[class^="body-copy"]'],
+        'author': ['[rel="author"]', '.author'],
+        'date': ['time[itemprop="datePublished"]', 'time']
+    },
+    'reuters.com': {
+        'content': ['[class^="article-body__content"]', '[data-testid="ArticleBody"]'],
+        'author': ['[rel="author"]', '[class^="author-name"]'],
+        'date': ['meta[property="article:published_time"]', 'time']
+    },
+    'finance.yahoo.com': {
+        'content': ['.caas-body', '.atoms-wrapper'],
+        'author': ['.caas-attr-item-author', '.byline-attr-author'],
+        'date': ['time']
+    },
+    'marketwatch.com': {
+        'content': ['#js-article__body', '.article__body'],
+        'author': ['.author'],
+        'date': ['time.timestamp--pub', 'time']
+    },
+    'businessinsider.com': {
+        'content': ['.content-lock-content', '#piano-inline-content-wrapper'],
+        'author': ['.byline-author-name', '.byline-link'],
+        'date': ['.byline-timestamp', 'time']
+    },
+    'forbes.com': {
+        'content': ['.article-body'],
+        'author': ['.contrib-link--name', '.fs-author-name'],
+        'date': ['time']
+    }
+}
+
+def profile_domain(url):
+    """
+    The domain an extraction profile is kept under: the URL's host without 'www.',
+    plus the port when one is given (sites served side by side on one host differ)
+    """
+    parts = urlsplit(url)
+    host = parts.hostname or ''
+    if host.startswith('www.'):
+        host = host[4:]
+    return f"{host}:{parts.port}" if parts.port else host
+
+class ExtractionProfile:
+    """
+    Selectors tried for one domain before the generic extraction rules, compiled once with
+    soupsieve. Besides the configured selectors, the profile counts which selector matched
+    each field on the domain's pages; once one has won min_hits times with at least
+    min_share of the matches, it is tried first. A miss halves its count, so a redesigned
+    site soon stops preferring a selector that no longer matches.
+    """
+    fields = ('content', 'author', 'date')
+
+    def __init__(self, domain, selectors=None, min_hits=3, min_share=0.6):
+        self.domain = domain
+        self.selectors = {field: list((selectors or {}).get(field, ())) for field in self.fields}
+        self.min_hits = min_hits
+        self.min_share = min_share
+        self.hits = {field: Counter() for field in self.fields}
+        self.lock = threading.Lock()
+        self.compiled = {}
+        self.order = {}
+        for field in self.fields:
+            self._update_order(field)
+
+    def _compile(self, selector):
+        pattern = self.compiled.get(selector)
+        if pattern is None:
+            pattern = self.compiled[selector] = soupsieve.compile(selector)
+        return pattern
+
+    def _update_order(self, field):
+        order = [selector for selector in self.selectors[field]]
+        winner = self.learned(field)
+        if winner is not None:
+            order = [winner] + [selector for selector in order if selector != winner]
+        valid = []
+        for selector in order:
+            try:
+                valid.append((selector, self._compile(selector)))
+            except Exception as e:
+                logging.warning(f"Ignoring invalid selector {selector!r} for {self.domain}: {e}")
+        self.order[field] = valid
+
+    def learned(self, field):
+        """The selector that has won this field often enough to be tried first, or None"""
+        counts = self.hits[field]
+        if not counts:
+            return None
+        selector, hits = counts.most_common(1)[0]
+        if hits >= self.min_hits and hits >= self.min_share * sum(counts.values()):
+            return selector
+        return None
+
+    def select(self, field, soup):
+        """
+        Return (tag, selector, missed) for the first of the field's selectors that matches a
+        page, where missed is the learned selector if it was tried and did not match
+        """
+        learned = self.learned(field)
+        missed = None
+        for selector, pattern in self.order[field]:
+            tag = pattern.select_one(soup)
+            if tag is not None:
+                return tag, selector, missed
+            if selector == learned:
+                missed = selector
+        return None, None, missed
+
+    def record(self, matched, missed=()):
+        """Count the selectors that matched each field of a page and decay the learned ones that missed"""
+        with self.lock:
+            for field, selector in matched.items():
+                if selector:
+                    self.hits[field][selector] += 1
+            for field, selector in missed:
+                self.hits[field][selector] //= 2
+            for field in self.fields:
+                self._update_order(field)
+
+    def set_hits(self, field, selector, hits):
+        with self.lock:
+            self.hits[field][selector] = hits
+            self._update_order(field)
+
+# Structured metadata is read from the raw page with these, without walking the parsed tree
+JSON_LD_PATTERN = re.compile(r'<script[^>]*type\s*=\s*["\']?application/ld\+json[^>]*>(.*?)</script\s*>', re.I | re.S)
+META_TAG_PATTERN = re.compile(r'<meta\s[^>]*>', re.I)
+TAG_ATTRIBUTE_PATTERN = re.compile(r'([\w:.-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+HEAD_END_PATTERN = re.compile(r'</head\s*>|<body[\s>]', re.I)
+ARTICLE_TYPES = {'NewsArticle', 'Article', 'ReportageNewsArticle', 'AnalysisNewsArticle', 'OpinionNewsArticle',
+                 'BackgroundNewsArticle', 'BlogPosting', 'LiveBlogPosting', 'Report'}
+# Meta tags (property or name, lowercased) holding each field, best first
+META_FIELDS = {
+    'title': ('og:title', 'twitter:title'),
+    'date': ('article:published_time', 'og:article:published_time', 'datepublished', 'parsely-pub-date',
+             'sailthru.date', 'pubdate', 'publishdate', 'dc.date.issued'),
+    'author': ('author', 'article:author', 'parsely-author', 'sailthru.author', 'dc.creator'),
+    'keywords': ('news_keywords', 'keywords', 'article:tag'),
+}
+
+def _json_ld_items(data):
+    """Yield every object in a JSON-LD document, descending into lists and @graph"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _json_ld_items(item)
+    elif isinstance(data, dict):
+        yield data
+        if '@graph' in data:
+            yield from _json_ld_items(data['@graph'])
+
+def _json_ld_names(value):
+    """Names of a JSON-LD author value: a string, a Person/Organization object, or a list of them"""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        name = value.get('name')
+        return [name] if isinstance(name, str) else []
+    if isinstance(value, list):
+        return [name for item in value for name in _json_ld_names(item)]
+    return []
+
+def read_structured_metadata(html, encoding=None):
+    """
+    Read the headline, author, publish date and keywords a page declares about itself,
+    from a JSON-LD NewsArticle (or other Article type) and, for the fields it lacks, from
+    OpenGraph/article meta tags. Works on the raw HTML with regular expressions, so it
+    costs a fraction of a tree walk. Returns a dict with the fields found, and
+    'date_source' ('json-ld' or 'meta') when there is a date.
+    """
+    if isinstance(html, bytes):
+        html = html.decode(encoding or 'utf-8', 'replace')
+    found = {}
+    for block in JSON_LD_PATTERN.finditer(html):
+        try:
+            document = json.loads(block.group(1).strip().removeprefix('<!--').removesuffix('-->'))
+        except ValueError:
+            continue
+        for item in _json_ld_items(document):
+            types = item.get('@type')
+            types = set(types) if isinstance(types, list) else {types}
+            if not types & ARTICLE_TYPES:
+                continue
+            if isinstance(item.get('headline'), str) and item['headline'].strip():
+                found.setdefault('title', unescape(item['headline'].strip()))
+            if isinstance(item.get('datePublished'), str) and item['datePublished'].strip():
+                found.setdefault('date', item['datePublished'].strip())
+                found.setdefault('date_source', 'json-ld')
+            authors = [unescape(name.strip()) for name in _json_ld_names(item.get('author')) if name.strip()]
+            if authors:
+                found.setdefault('author', ', '.join(authors))
+            keywords = item.get('keywords')
+            if isinstance(keywords, list):
+                keywords = ','.join(k for k in keywords if isinstance(k, str))
+            if isinstance(keywords, str) and keywords.strip():
+                found.setdefault('keywords', unescape(keywords))
+    if not {'title', 'date', 'author', 'keywords'} <= found.keys():
+        head_end = HEAD_END_PATTERN.search(html)
+        meta = {}
+        for tag in META_TAG_PATTERN.finditer(html, 0, head_end.start() if head_end else len(html)):
+            attributes = {name.lower(): first if first is not None else second
+                          for name, first, second in TAG_ATTRIBUTE_PATTERN.findall(tag.group(0))}
+            key = (attributes.get('property') or attributes.get('name') or attributes.get('itemprop') or '').lower()
+            if key and attributes.get('content', '').strip():
+                meta.setdefault(key, unescape(attributes['content'].strip()))
+        for field, keys in META_FIELDS.items():
+            if field in found:
+                continue
+            for key in keys:
+                value = meta.get(key)
+                # article:author is often a profile URL rather than a name
+                if value and not (field == 'author' and value.startswith(('http://', 'https://'))):
+                    found[field] = value
+                    if field == 'date':
+                        found['date_source'] = 'meta'
+                    break
+    return found
+
+class ArticleExtractor:
+    """
+    Extracts title, author, publish date, keywords, content and summary from an
+    article page in a single walk over the parsed tree, instead of one selector
+    scan per field. `parser` is the BeautifulSoup tree builder ('lxml', 'html.parser', ...).
+    `profiles` maps domains to their selectors (see DEFAULT_EXTRACTION_PROFILES); a page
+    from a profiled domain tries those selectors first and only walks the tree for the
+    fields they did not find. Given the raw page, the headline, author, date and keywords
+    it declares in JSON-LD or meta tags are used before any selector is tried.
+    """
+    # Content containers in order of preference, as (kind, value) tests on a tag
+    content_selectors = [
+        ('name', 'article'), ('class', 'article-body'), ('class', 'article-content'),
+        ('class', 'story-body'), ('class', 'post-content'), ('class', 'entry-content'),
+        ('class', 'content'), ('id', 'content'), ('itemprop', 'articleBody'), ('class', 'body')
+    ]
+
+    def __init__(self, parser=DEFAULT_HTML_PARSER, profiles=None):
+        self.parser = parser
+        self.profiles = {domain: ExtractionProfile(domain, selectors) for domain, selectors in (profiles or {}).items()}
+        self.profiles_lock = threading.Lock()
+        self.dates = DateParser()
+
+    def profile_for(self, url, create=False):
+        """Return the extraction profile for a URL's domain (or a parent domain), or None"""
+        parts = profile_domain(url).split('.')
+        for i in range(len(parts) - 1):
+            profile = self.profiles.get('.'.join(parts[i:]))
+            if profile is not None:
+                return profile
+        if create and url:
+            with self.profiles_lock:
+                return self.profiles.setdefault(profile_domain(url), ExtractionProfile(profile_domain(url)))
+        return None
+
+    def profile_state(self):
+        """Configured selectors and learned counts of every profile, as plain data for other processes"""
+        return {domain: {'selectors': profile.selectors, 'hits': {field: dict(counts) for field, counts in profile.hits.items()}}
+                for domain, profile in list(self.profiles.items())}
+
+    def load_profile_state(self, state):
+        """Restore profiles from profile_state()"""
+        for domain, data in state.items():
+            profile = self.profiles.setdefault(domain, ExtractionProfile(domain, data['selectors']))
+            for field, counts in data['hits'].items():
+                for selector, hits in counts.items():
+                    profile.set_hits(field, selector, hits)
+
+    @staticmethod
+    def _selector_css(kind, value):
+        if kind == 'name':
+            return value
+        if kind == 'class':
+            return '.' + value
+        if kind == 'id':
+            return '#' + value
+        return f'[{kind}="{value}"]'
+
+    def parse(self, html, encoding=None):
+        """Build the BeautifulSoup tree for a page with the configured backend"""
+        if encoding and isinstance(html, bytes):
+            return BeautifulSoup(html, self.parser, from_encoding=encoding)
+        return BeautifulSoup(html, self.parser)
+
+    @classmethod
+    def _content_rank(cls, tag, classes):
+        for rank, (kind, value) in enumerate(cls.content_selectors):
+            if kind == 'name':
+                matched = tag.name == value
+            elif kind == 'class':
+                matched = value in classes
+            else:
+                matched = tag.get(kind) == value
+            if matched:
+                return rank
+        return None
+
+    def extract(self, page, url='', html=None, encoding=None):
+        """
+        Extract the article fields from HTML text or an already parsed soup; pass the raw
+        page as html along with a soup to use its structured metadata.
+        Returns the dict produced by FinancialNewsScraper.extract_article_content, plus
+        'selector_stats': the selectors that found the content, author and date, and the
+        learned profile selectors that missed, for ExtractionProfile.record();
+        'date_source': where the publish date came from ('json-ld', 'meta', 'page', or
+        None when no date was found and publish_date is None); and 'timings':
+        seconds spent on parts of the extraction, by stage name.
+        """
+        if isinstance(page, (str, bytes)):
+            html = page if html is None else html
+            soup = self.parse(page, encoding)
+        else:
+            soup = page
+        metadata_start = time.perf_counter()
+        metadata = read_structured_metadata(html, encoding) if html is not None else {}
+        source = profile_domain(url)
+        publish_date, date_source = None, None
+        if 'date' in metadata:
+            publish_date, _ = self.dates.parse(metadata['date'], source)
+            if publish_date is not None:
+                date_source = metadata['date_source']
+        metadata_seconds = time.perf_counter() - metadata_start
+        title = metadata.get('title')
+        author = metadata.get('author')
+        title_tag = author_tag = date_tag = keyword_meta = canonical_link = None
+        content_element, content_rank = None, len(self.content_selectors)
+        matched = {'content': None, 'author': None, 'date': None}
+        missed = []
+        profile = self.profile_for(url)
+        if profile is not None:
+            found = {}
+            for field in profile.fields:
+                # Fields the page declared in its metadata need no selector
+                if (field == 'author' and author) or (field == 'date' and date_source):
+                    continue
+                tag, selector, missed_selector = profile.select(field, soup)
+                if tag is not None:
+                    found[field] = tag
+                    matched[field] = selector
+                if missed_selector is not None:
+                    missed.append((field, missed_selector))
+            author_tag = found.get('author')
+            date_tag = found.get('date')
+            if 'content' in found:
+                content_element, content_rank = found['content'], 0
+        need_title = not title
+        need_author = not author and author_tag is None
+        need_date = date_source is None and date_tag is None
+        need_keywords = 'keywords' not in metadata
+        # With every body field found by the profile or the metadata, only the head is left to walk
+        walk = soup.head if content_rank == 0 and not need_author and not need_date and soup.head else soup
+        for tag in walk.descendants:
+            name = tag.name
+            if name is None:
+                continue
+            classes = tag.get('class') or ()
+            if need_title and name == 'title':
+                title_tag, need_title = tag, False
+            if need_author:
+                if name == 'a' and tag.get('rel') == ['author']:
+                    author_tag, matched['author'], need_author = tag, 'a[rel="author"]', False
+                elif 'author' in classes or 'byline' in classes:
+                    author_tag, matched['author'], need_author = tag, '.author' if 'author' in classes else '.byline', False
+            if need_date:
+                if name == 'time':
+                    date_tag, matched['date'] = tag, 'time'
+                elif 'date' in classes or 'published' in classes:
+                    date_tag, matched['date'] = tag, '.date' if 'date' in classes else '.published'
+                elif name == 'meta' and tag.get('property') == 'article:published_time':
+                    date_tag, matched['date'] = tag, 'meta[property="article:published_time"]'
+                need_date = date_tag is None
+            if need_keywords and name == 'meta' and tag.get('name') == 'keywords':
+                keyword_meta, need_keywords = tag, False
+            if canonical_link is None and name == 'link' and 'canonical' in (tag.get('rel') or ()):
+                canonical_link = tag
+            if content_rank > 0:
+                rank = self._content_rank(tag, classes)
+                if rank is not None and rank < content_rank:
+                    content_element, content_rank = tag, rank
+                    matched['content'] = self._selector_css(*self.content_selectors[rank])
+            elif not (need_title or need_author or need_date or need_keywords) and canonical_link is not None:
+                # Every field has its best possible match, nothing later can change the result
+                break
+
+        if not title:
+            title = title_tag.text.strip() if title_tag else ''
+        if not author:
+            author = author_tag.text.strip() if author_tag else 'Unknown'
+
+        date_start = time.perf_counter()
+        if date_source is None and date_tag is not None:
+            if date_tag.name == 'meta':
+                date_text = date_tag.get('content', '').strip()
+            else:
+                # A <time datetime> attribute is exact, its text is often "Published ..." or relative
+                date_text = (date_tag.get('datetime') or '').strip() or date_tag.text.strip()
+            publish_date, _ = self.dates.parse(date_text, source)
+            if publish_date is not None:
+                date_source = 'page'
+            else:
+                logging.warning(f"Could not parse date '{date_text}' from {url}")
+        date_seconds = metadata_seconds + time.perf_counter() - date_start
+
+        if content_element is None:
+            content_element = soup.body
+        paragraphs = [p.text.strip() for p in content_element.find_all('p')] if content_element else []
+        content = '\n\n'.join(paragraphs)
+
+        # Simple summary: first 2 paragraphs (max 500 characters)
+        summary = '\n\n'.join(paragraphs[:2])
+        if len(summary) > 500:
+            summary = summary[:497] + '...'
+
+        # Extract keywords from meta tags if available
+        keywords = []
+        if 'keywords' in metadata:
+            keywords = [k.strip() for k in metadata['keywords'].split(',')]
+        elif keyword_meta:
+            keywords = [k.strip() for k in keyword_meta.get('content', '').split(',')]
+
+        return {
+            'title': title,
+            'author': author,
+            'publish_date': publish_date,
+            'content': content,
+            'summary': summary,
+            'keywords': ','.join(keywords),
+            'canonical_url': urljoin(url, canonical_link['href']) if canonical_link is not None and canonical_link.get('href') else None,
+            'selector_stats': {'matched': matched, 'missed': missed},
+            'date_source': date_source,
+            'timings': {'date_parse': date_seconds}
+        }
+
+DEFAULT_TAXONOMY = {
+    'stocks': ['stock', 'stocks', 'equities', 'nasdaq', 'dow jones', 'nyse', 's&p'],
+    'cryptocurrency': ['bitcoin', 'ethereum', 'crypto', 'blockchain', 'token', 'cryptocurrency'],
+    'economy': ['economy', 'gdp', 'inflation', 'recession', 'economic growth', 'fed', 'federal reserve'],
+    'markets': ['market', 'trading', 'trader', 'bulls', 'bears', 'rally', 'correction'],
+    'business': ['company', 'earnings', 'revenue', 'profit', 'ceo', 'startup', 'merger', 'acquisition'],
+    'personal_finance': ['investing', 'retirement', 'mortgage', 'loan', 'credit', 'debt', 'saving'],
+    'real_estate': ['housing', 'real estate', 'property', 'mortgage', 'commercial real estate']
+}
+
+class KeywordCategorizer:
+    """
+    Scores every taxonomy category in one pass over the article text.
+    All keywords are compiled into a single prefix-factored regular expression that
+    only matches whole words (an optional plural 's'/'es' is allowed), so 'fed' no
+    longer matches 'feedback' and 'token' no longer matches 'tokenized'.
+    A category's score is the number of its distinct keywords found in the text.
+    """
+    def __init__(self, taxonomy=None):
+        self.taxonomy = {category: [k.lower() for k in keywords]
+                         for category, keywords in (taxonomy or DEFAULT_TAXONOMY).items()}
+        self.keyword_categories = {}
+        for category, keywords in self.taxonomy.items():
+            for keyword in keywords:
+                self.keyword_categories.setdefault(keyword, []).append(category)
+        self.pattern = re.compile(
+            r'(?<![a-z0-9])(' + self._trie_pattern(self.keyword_categories) + r')(?:s|es)?(?![a-z0-9])')
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a taxonomy from a JSON file mapping category names to keyword lists"""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @staticmethod
+    def _trie_pattern(words):
+        """Build a regex alternation factored on shared prefixes, longest match first"""
+        trie = {}
+        for word in words:
+            node = trie
+            for ch in word:
+                node = node.setdefault(ch, {})
+            node[''] = {}
+
+        def build(node):
+            branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+            return '(?:' + body + ')?' if '' in node else body
+        return build(trie)
+
+    def score(self, text):
+        """Return {category: score} for the categories with at least one keyword in text"""
+        found = {m.group(1) for m in self.pattern.finditer(text.lower())}
+        scores = Counter()
+        for keyword in found:
+            for category in self.keyword_categories[keyword]:
+                scores[category] += 1
+        return scores
+
+    def categorize(self, content, title):
+        """Return the best scoring category, or 'general' when no keyword matches"""
+        scores = self.score(title + " " + content)
+        if not scores:
+            return 'general'
+        # Ties go to the category listed first in the taxonomy
+        return max((category for category in self.taxonomy if category in scores), key=scores.get)
+
+class HostWorkQueue:
+    """
+    Per-host queues of pending article links for concurrent crawling.
+    Each host is drained by at most `per_host_limit` lane threads, so one slow
+    or busy host never holds up links queued for another host.
+    """
+    def __init__(self, worker, per_host_limit=2):
+        self.worker = worker
+        self.per_host_limit = per_host_limit
+        self.lock = threading.Lock()
+        self.queues = {}
+        self.active_lanes = Counter()
+        # Only running lanes are kept, so a long-lived queue does not pile up finished threads
+        self.lanes = set()
+
+    def add(self, host, items):
+        """Queue items for a host and start lanes up to the per-host limit"""
+        with self.lock:
+            pending = self.queues.setdefault(host, deque())
+            pending.extend(items)
+            while self.active_lanes[host] < min(self.per_host_limit, len(pending)):
+                self.active_lanes[host] += 1
+                lane = threading.Thread(target=self._drain, args=(host,), daemon=True)
+                self.lanes.add(lane)
+                lane.start()
+
+    def _drain(self, host):
+        while True:
+            with self.lock:
+                pending = self.queues[host]
+                if not pending:
+                    self.active_lanes[host] -= 1
+                    self.lanes.discard(threading.current_thread())
+                    return
+                item = pending.popleft()
+            try:
+                self.worker(item)
+            except Exception as e:
+                logging.error(f"Unhandled error in crawl lane for {host}: {e}")
+
+    def join(self):
+        """Wait for every lane to finish; call once no more items will be added"""
+        while True:
+            with self.lock:
+                lanes = list(self.lanes)
+            if not lanes:
+                return
+            for lane in lanes:
+                lane.join()
+
+def parse_retry_after(value):
+    """Return the delay in seconds requested by a Retry-After header (seconds or HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.datetime.now(timezone.utc)).total_seconds())
+
+class HostRateLimiter:
+    """
+    Per-host token buckets whose refill rate adapts to how each host responds (AIMD).
+    Every good response adds increase_step requests/second to the host's rate, up to
+    max_rate or the host's robots.txt crawl delay. A 429 or 5xx response, a connection
+    error or a response much slower than the host's usual latency multiplies the rate by
+    decrease_factor. A Retry-After pause blocks the host outright until it has passed.
+    """
+    def __init__(self, initial_rate=1.0, min_rate=0.05, max_rate=10.0, burst=2,
+                 increase_step=0.1, decrease_factor=0.5, latency_factor=3.0, max_pause=300):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        self.max_pause = max_pause
+        self.lock = threading.Lock()
+        self.hosts = {}
+
+    def _state(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = {
+                'rate': self.initial_rate, 'ceiling': self.max_rate, 'tokens': 1.0,
+                'updated': time.monotonic(), 'paused_until': 0.0, 'latency': None, 'responses': 0
+            }
+        return state
+
+    def _refill(self, state, now):
+        state['tokens'] = min(self.burst, state['tokens'] + (now - state['updated']) * state['rate'])
+        state['updated'] = now
+
+    def _delay(self, host):
+        """Seconds until the host has a token to spend (0 if it has one now)"""
+        state = self._state(host)
+        now = time.monotonic()
+        self._refill(state, now)
+        return max(state['paused_until'] - now, (1 - state['tokens']) / state['rate'], 0.0)
+
+    def set_crawl_delay(self, host, delay):
+        """Cap a host's rate at one request per delay seconds (robots.txt Crawl-delay)"""
+        with self.lock:
+            state = self._state(host)
+            state['ceiling'] = min(self.max_rate, 1.0 / delay) if delay else self.max_rate
+            state['rate'] = min(state['rate'], state['ceiling'])
+
+    def wait_ready(self, host):
+        """Wait until the host could be requested, without taking its token"""
+        while True:
+            with self.lock:
+                delay = self._delay(host)
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def acquire(self, host):
+        """Wait for and take a token for one request to host"""
+        while True:
+            with self.lock:
+                delay = self._delay(host)
+                if delay <= 0:
+                    self.hosts[host]['tokens'] -= 1
+                    return
+            time.sleep(delay)
+
+    def record(self, host, status, latency, retry_after=None):
+        """Adjust a host's rate from a response status (None for a failed request) and its latency"""
+        with self.lock:
+            state = self._state(host)
+            throttled = status is None or status == 429 or status >= 500
+            slow = (state['responses'] >= 5 and state['latency'] is not None
+                    and latency > self.latency_factor * state['latency'])
+            if throttled or slow:
+                state['rate'] = max(self.min_rate, state['rate'] * self.decrease_factor)
+            else:
+                state['rate'] = min(state['ceiling'], state['rate'] + self.increase_step)
+            if not throttled:
+                # Exponentially weighted moving average of normal response times
+                state['latency'] = latency if state['latency'] is None else 0.8 * state['latency'] + 0.2 * latency
+                state['responses'] += 1
+            if retry_after is not None and status in (429, 503):
+                state['paused_until'] = max(state['paused_until'], time.monotonic() + min(retry_after, self.max_pause))
+                state['tokens'] = min(state['tokens'], 0.0)
+            if throttled or slow:
+                logging.info(f"Slowing down {host} to {state['rate']:.2f} requests/s (status {status}, {latency:.2f}s)")
+
+def write_json_atomically(path, data):
+    """Write data as JSON to path through a temporary file, so readers never see a partial file"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_path, path)
+
+def lease_owner_alive(owner):
+    """
+    False if a lease owner id (host:pid:nonce) names a process on this host that no longer
+    exists. Owners on other hosts are assumed alive until their lease runs out.
+    """
+    parts = owner.rsplit(':', 2)
+    if len(parts) != 3 or parts[0] != socket.gethostname() or not parts[1].isdigit() or os.name == 'nt':
+        # os.kill() would terminate the process on Windows rather than probe it
+        return True
+    try:
+        os.kill(int(parts[1]), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+def prometheus_labels(**values):
+    """Format a Prometheus label set, leaving out labels whose value is None"""
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{key}="{escape(value)}"' for key, value in values.items() if value is not None)
+
+class ScrapeMetrics:
+    """
+    Thread-safe timers and counters for a scrape run. Stage durations are kept as
+    Prometheus-style histograms (plus the most recent samples for percentiles), keyed by
+    stage and optionally by source; counters are kept per source. snapshot() returns them
+    as plain data and prometheus_text() in the Prometheus text exposition format.
+    """
+    buckets = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, recent_samples=1024):
+        self.recent_samples = recent_samples
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.stages = {}
+        self.counters = {}
+        self.server = None
+        self.reporter = None
+        self.stop_event = threading.Event()
+
+    def observe(self, stage, seconds, source=None):
+        """Record one duration of a stage, in the stage's overall timer and the source's own"""
+        with self.lock:
+            for key in ((stage, None), (stage, source)) if source else ((stage, None),):
+                timer = self.stages.get(key)
+                if timer is None:
+                    timer = self.stages[key] = {
+                        'count': 0, 'sum': 0.0, 'max': 0.0, 'buckets': [0] * len(self.buckets),
+                        'recent': deque(maxlen=self.recent_samples)
+                    }
+                timer['count'] += 1
+                timer['sum'] += seconds
+                timer['max'] = max(timer['max'], seconds)
+                for i, bound in enumerate(self.buckets):
+                    if seconds <= bound:
+                        timer['buckets'][i] += 1
+                        break
+                timer['recent'].append(seconds)
+
+    def time(self, stage, source=None):
+        """Context manager timing the enclosed block as one run of a stage"""
+        return _StageTimer(self, stage, source)
+
+    def count(self, source, event, amount=1):
+        """Add to one of a source's counters (fetched, bytes, saved, duplicate, ...)"""
+        with self.lock:
+            counters = self.counters.setdefault(source or 'all', Counter())
+            counters[event] += amount
+
+    def snapshot(self):
+        """Current timers and counters as a JSON-serializable dict"""
+        with self.lock:
+            stages = {}
+            for (stage, source), timer in sorted(self.stages.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+                recent = sorted(timer['recent'])
+                entry = {
+                    'count': timer['count'],
+                    'total_seconds': round(timer['sum'], 6),
+                    'mean_ms': round(timer['sum'] / timer['count'] * 1000, 3),
+                    'max_ms': round(timer['max'] * 1000, 3),
+                }
+                for name, q in (('p50_ms', 0.5), ('p90_ms', 0.9), ('p99_ms', 0.99)):
+                    entry[name] = round(recent[min(len(recent) - 1, int(q * len(recent)))] * 1000, 3)
+                stages.setdefault(stage, {})[source or 'all'] = entry
+            return {
+                'timestamp': datetime.datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+                'uptime_seconds': round(time.time() - self.started, 1),
+                'stages': stages,
+                'sources': {source: dict(counters) for source, counters in sorted(self.counters.items())},
+            }
+
+    def prometheus_text(self):
+        """Timers and counters in the Prometheus text exposition format"""
+        labels = prometheus_labels
+        lines = ['# HELP financial_news_stage_seconds Time spent in each scrape stage',
+                 '# TYPE financial_news_stage_seconds histogram']
+        with self.lock:
+            for (stage, source), timer in sorted(self.stages.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+                cumulative = 0
+                for bound, hits in zip(self.buckets, timer['buckets']):
+                    cumulative += hits
+                    lines.append(f'financial_news_stage_seconds_bucket{{{labels(stage=stage, source=source, le=bound)}}} {cumulative}')
+                lines.append(f'financial_news_stage_seconds_bucket{{{labels(stage=stage, source=source, le="+Inf")}}} {timer["count"]}')
+                lines.append(f'financial_news_stage_seconds_sum{{{labels(stage=stage, source=source)}}} {timer["sum"]:.6f}')
+                lines.append(f'financial_news_stage_seconds_count{{{labels(stage=stage, source=source)}}} {timer["count"]}')
+            lines += ['# HELP financial_news_source_events_total Articles and bytes per source and outcome',
+                      '# TYPE financial_news_source_events_total counter']
+            for source, counters in sorted(self.counters.items()):
+                for event, value in sorted(counters.items()):
+                    lines.append(f'financial_news_source_events_total{{{labels(source=source, event=event)}}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write_snapshot(self, path):
+        """Write snapshot() to a JSON file, replacing it atomically"""
+        write_json_atomically(path, self.snapshot())
+
+    def start_snapshots(self, path, interval=30):
+        """Write a JSON snapshot to path every interval seconds until stop()"""
+        def report():
+            while not self.stop_event.wait(interval):
+                try:
+                    self.write_snapshot(path)
+                except OSError as e:
+                    logging.error(f"Error writing metrics snapshot {path}: {e}")
+        self.reporter = threading.Thread(target=report, daemon=True)
+        self.reporter.start()
+
+    def serve(self, port, host='127.0.0.1'):
+        """Serve /metrics (Prometheus text) and /metrics.json over HTTP from a background thread"""
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                if path == '/metrics':
+                    body, content_type = metrics.prometheus_text().encode('utf-8'), 'text/plain; version=0.0.4'
+                elif path == '/metrics.json':
+                    body, content_type = json.dumps(metrics.snapshot()).encode('utf-8'), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        logging.info(f"Serving scrape metrics on http://{host}:{self.server.server_address[1]}/metrics")
+        return self.server.server_address[1]
+
+    def stop(self):
+        """Stop the snapshot thread and the metrics endpoint"""
+        self.stop_event.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def summary(self, stages=None):
+        """Lines summarizing each stage across sources, slowest total first"""
+        totals = {}
+        with self.lock:
+            for (stage, source), timer in self.stages.items():
+                if source is None and (stages is None or stage in stages):
+                    totals[stage] = timer
+            lines = []
+            for stage, timer in sorted(totals.items(), key=lambda item: -item[1]['sum']):
+                recent = sorted(timer['recent'])
+                p50 = recent[len(recent) // 2] * 1000
+                p99 = recent[min(len(recent) - 1, int(0.99 * len(recent)))] * 1000
+                lines.append(f"{stage:16s} {timer['count']:7d} calls {timer['sum']:9.2f}s total "
+                             f"p50 {p50:8.2f} ms  p99 {p99:8.2f} ms")
+        return lines
+
+class _StageTimer:
+    """Context manager returned by ScrapeMetrics.time()"""
+    def __init__(self, metrics, stage, source):
+        self.metrics = metrics
+        self.stage = stage
+        self.source = source
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start, self.source)
+        return False
+
+class SamplingProfiler:
+    """
+    Statistical profiler for a single run: a background thread samples the stack of every
+    other thread every interval seconds through sys._current_frames() and counts how often
+    each stack is seen. It measures wall-clock time, so threads waiting on the network or
+    a lock show up as much as threads using the CPU. write() saves the counts as collapsed stacks ("a;b;c 42" lines),
+    which flamegraph.pl and speedscope read; top() lists the functions most often found
+    running (at the top of a sampled stack).
+    """
+    def __init__(self, interval=0.005, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+        self.thread.start()
+        return self
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        while not self.stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+    def write(self, path):
+        """Write the sampled stacks in collapsed format"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, hits in self.stacks.most_common():
+                f.write(f"{stack} {hits}\n")
+
+    def top(self, limit=15):
+        """The functions most often at the top of a stack, as (function, share of samples) pairs"""
+        running = Counter()
+        for stack, hits in self.stacks.items():
+            running[stack.rsplit(';', 1)[-1]] += hits
+        total = sum(running.values()) or 1
+        return [(function, hits / total) for function, hits in running.most_common(limit)]
+
+def print_progress(text, quiet=False, end='\n'):
+    """Print a line of crawl progress, unless the crawl is quiet (daemon polls log instead)"""
+    if not quiet:
+        sys.stdout.write(text + end)
+        sys.stdout.flush()
+
+# Extractor and categorizer of a parser process, built once by init_parse_worker
+_parse_worker = {}
+
+def init_parse_worker(html_parser, taxonomy, profile_state=None):
+    """Process pool initializer: build the extractor and categorizer once per parser process"""
+    _parse_worker['extractor'] = ArticleExtractor(html_parser)
+    _parse_worker['extractor'].load_profile_state(profile_state or {})
+    _parse_worker['categorizer'] = KeywordCategorizer(taxonomy)
+
+def parse_article_page(html, encoding, url, extractor=None, categorizer=None):
+    """
+    The CPU-bound part of processing an article: extract its fields from the raw page,
+    fingerprint the body and pick a category. Adds 'simhash' and 'category' to the
+    extracted dict, and the time each step took to its 'timings', so the parent process
+    can record them even when the page was parsed in another process. Without an
+    extractor and categorizer the parser process's own are used.
+    """
+    extractor = extractor or _parse_worker['extractor']
+    categorizer = categorizer or _parse_worker['categorizer']
+    start = time.perf_counter()
+    soup = extractor.parse(html, encoding)
+    parsed = time.perf_counter()
+    article = extractor.extract(soup, url, html, encoding)
+    extracted = time.perf_counter()
+    article['simhash'] = simhash(article['content'])
+    fingerprinted = time.perf_counter()
+    article['category'] = categorizer.categorize(article['content'], article['title'])
+    article['timings'].update(html_parse=parsed - start, extract=extracted - parsed,
+                              simhash=fingerprinted - extracted, categorize=time.perf_counter() - fingerprinted)
+    return article
+
+class ParsePipeline:
+    """
+    Parse stage between the fetch threads and the database writer. Fetch threads submit
+    raw pages, a pool of parser processes runs parse_article_page on them outside the
+    GIL, and a single consumer thread hands every result to on_parsed in the order they
+    finish. At most max_pending pages are waiting or being parsed at once; beyond that
+    submit() blocks, which slows the fetchers down instead of letting pages pile up.
+    A long-lived pipeline can serve one crawl after another, with wait() between them.
+    """
+    def __init__(self, on_parsed, parse_workers, max_pending, html_parser, taxonomy, profile_state=None):
+        self.on_parsed = on_parsed
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.results = queue.Queue()
+        self.pending = 0
+        self.idle = threading.Condition()
+        # Spawned rather than forked: the crawler is full of threads holding locks at this point
+        self.pool = ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context('spawn'),
+                                        initializer=init_parse_worker, initargs=(html_parser, taxonomy, profile_state))
+        self.consumer = threading.Thread(target=self._consume, daemon=True)
+        self.consumer.start()
+
+    def submit(self, html, encoding, url, context=None):
+        """Queue a page for parsing, waiting while max_pending pages are already queued"""
+        self.slots.acquire()
+        with self.idle:
+            self.pending += 1
+        try:
+            future = self.pool.submit(parse_article_page, html, encoding, url)
+        except Exception:
+            self._done()
+            raise
+        future.add_done_callback(lambda done: self.results.put((done, url, context)))
+
+    def _consume(self):
+        while True:
+            item = self.results.get()
+            if item is None:
+                return
+            future, url, context = item
+            try:
+                error = future.exception()
+                self.on_parsed(url, None if error else future.result(), error, context)
+            except Exception as e:
+                logging.error(f"Error handling parsed article {url}: {e}")
+            finally:
+                self._done()
+
+    def _done(self):
+        self.slots.release()
+        with self.idle:
+            self.pending -= 1
+            if not self.pending:
+                self.idle.notify_all()
+
+    def wait(self):
+        """Wait until every page submitted so far is parsed and handled"""
+        with self.idle:
+            self.idle.wait_for(lambda: not self.pending)
+
+    def close(self):
+        """Wait until every submitted page is parsed and handled, then stop the parser processes"""
+        self.pool.shutdown(wait=True)
+        self.results.put(None)
+        self.consumer.join()
+
+def simhash(text, shingle_size=3, min_words=50):
+    """
+    Return the 64-bit SimHash of a text's word shingles, or None when the text has fewer
+    than min_words words (stubs and paywall teasers are too short to compare reliably).
+    Near-identical texts get fingerprints that differ in only a few bits.
+    """
+    words = re.findall(r'\w+', text.lower())
+    if len(words) < max(min_words, shingle_size):
+        return None
+    hashes = {
+        hashlib.blake2b(' '.join(words[i:i + shingle_size]).encode('utf-8'), digest_size=8).digest()
+        for i in range(len(words) - shingle_size + 1)
+    }
+    # Count the set bits of every position across all shingle hashes, one bit column at a time
+    columns = zip(*(format(int.from_bytes(h, 'big'), '064b') for h in hashes))
+    threshold = len(hashes) / 2
+    bits = ''.join('1' if column.count('1') > threshold else '0' for column in columns)
+    return int(bits, 2)
+
+def to_signed64(value):
+    """Map an unsigned 64-bit fingerprint onto SQLite's signed INTEGER range"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+class NearDuplicateIndex:
+    """
+    In-memory index of article SimHash fingerprints. Each fingerprint is split into
+    max_distance + 1 bands; two fingerprints within max_distance bits must agree exactly
+    on at least one band, so a lookup only compares against the articles sharing a band
+    instead of scanning the whole archive.
+    """
+    def __init__(self, max_distance=3):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = 64 // self.bands
+        self.buckets = [{} for _ in range(self.bands)]
+        self.lock = threading.Lock()
+        self.size = 0
+
+    def _band_keys(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (band * self.band_bits)) & mask for band in range(self.bands)]
+
+    def _closest(self, fingerprint, keys, exclude_url=None):
+        best = None
+        for band, key in enumerate(keys):
+            for other, url in self.buckets[band].get(key, ()):
+                if url == exclude_url:
+                    continue
+                distance = bin(fingerprint ^ other).count('1')
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (url, distance)
+        return best
+
+    def add(self, fingerprint, url):
+        """Index a fingerprint for an article URL"""
+        keys = self._band_keys(fingerprint)
+        with self.lock:
+            self._add(fingerprint, url, keys)
+
+    def _add(self, fingerprint, url, keys):
+        for band, key in enumerate(keys):
+            self.buckets[band].setdefault(key, []).append((fingerprint, url))
+        self.size += 1
+
+    def discard(self, fingerprint, url):
+        """Remove an article's fingerprint, e.g. when its row could not be written"""
+        keys = self._band_keys(fingerprint)
+        with self.lock:
+            removed = False
+            for band, key in enumerate(keys):
+                bucket = self.buckets[band].get(key)
+                if bucket and (fingerprint, url) in bucket:
+                    bucket.remove((fingerprint, url))
+                    removed = True
+                    if not bucket:
+                        del self.buckets[band][key]
+            if removed:
+                self.size -= 1
+
+    def find_or_add(self, fingerprint, url):
+        """
+        Return (original_url, distance) of the closest indexed near-duplicate, or None
+        after indexing this fingerprint as a new original. Atomic, so two copies of a
+        story fetched at the same time cannot both be treated as originals. An entry for
+        the same URL, left from an earlier attempt at it, is never a match.
+        """
+        keys = self._band_keys(fingerprint)
+        with self.lock:
+            match = self._closest(fingerprint, keys, exclude_url=url)
+            if match is None:
+                self._add(fingerprint, url, keys)
+            return match
+
+def parse_feed_timestamp(text):
+    """Parse a feed or sitemap timestamp into an aware UTC datetime, or None if it is unusable"""
+    if not text:
+        return None
+    # Sitemaps use ISO-8601 and RSS uses RFC 822 dates; anything else goes to dateutil
+    parsed = parse_iso_date(text)
+    if parsed is not None:
+        return parsed
+    try:
+        parsed = parsedate_to_datetime(text.strip())
+    except (TypeError, ValueError):
+        try:
+            parsed = date_parser.parse(text.strip())
+        except (ValueError, OverflowError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+def parse_sitemap(document):
+    """
+    Parse a sitemap, news sitemap or sitemap index (optionally gzipped).
+    Returns (entries, child_sitemaps): entries are (url, published, modified) tuples, with
+    published taken from <news:publication_date> and modified from <lastmod>; child
+    sitemaps are (url, modified) pairs from a sitemap index.
+    """
+    if document[:2] == b'\x1f\x8b':
+        document = gzip.decompress(document)
+    root = ElementTree.fromstring(document)
+    entries, child_sitemaps = [], []
+    for node in root:
+        # Match on local names, sitemaps in the wild do not agree on namespaces
+        fields = {}
+        for child in node.iter():
+            fields.setdefault(child.tag.rsplit('}', 1)[-1], (child.text or '').strip())
+        if not fields.get('loc'):
+            continue
+        modified = parse_feed_timestamp(fields.get('lastmod'))
+        if node.tag.rsplit('}', 1)[-1] == 'sitemap':
+            child_sitemaps.append((fields['loc'], modified))
+        else:
+            entries.append((fields['loc'], parse_feed_timestamp(fields.get('publication_date')), modified))
+    return entries, child_sitemaps
+
+def in_date_window(published, modified, date_range):
+    """
+    Whether a discovered link may hold an article inside date_range. A publish date must
+    fall inside the window; a modification date only rules out articles last touched before
+    it starts, since an older article can be updated later.
+    """
+    if date_range is None:
+        return True
+    start_date, end_date = date_range
+    if published is not None:
+        return start_date <= published <= end_date
+    if modified is not None:
+        return modified >= start_date
+    return True
+
+def compress_body(text):
+    """
+    Return (content_hash, compressed_body) for an article body, or (None, None) when it is empty.
+    Bodies are stored once per SHA-256 of their text, so syndicated copies share a row.
+    """
+    if not text:
+        return None, None
+    data = text.encode('utf-8')
+    return hashlib.sha256(data).hexdigest(), zlib.compress(data, 6)
+
+def inflate_body(body):
+    """Decompress an article body from the article_bodies table"""
+    return zlib.decompress(body).decode('utf-8') if body is not None else None
+
+def article_content(content, body):
+    """The text of an article from the content and body columns of articles_full"""
+    return content if content is not None else inflate_body(body)
+
+def connect_database(db_path, **kwargs):
+    """
+    Open a connection to the articles database with the inflate_body() SQL function
+    registered, for queries that read article content. The schema itself never calls it,
+    so the database stays usable from connections that do not register it.
+    """
+    conn = sqlite3.connect(db_path, **kwargs)
+    conn.create_function('inflate_body', 1, inflate_body, deterministic=True)
+    return conn
+
+class ArticleWriter:
+    """
+    Buffered writer for the articles table that keeps a single connection open.
+    Articles are written with executemany, one transaction per batch, when the buffer
+    reaches batch_size or is older than flush_interval seconds. Pending articles are
+    flushed on close(), which also runs at interpreter exit. Page archive index rows
+    added with add_archive_entry() are written in the same transactions. With a ScrapeMetrics, the
+    time of every batch transaction is recorded as the 'db_write' stage.
+    A batch that fails to write is retried once; if that fails too, on_write_failure is
+    called with its articles, as dicts of the columns, and the error, so they can be
+    fetched again. on_write, if given, is called with the URL keys of every batch written,
+    whether each article was inserted or already stored.
+    """
+    columns = ('title', 'url', 'url_key', 'source', 'author', 'publish_date',
+               'content_hash', 'content_length', 'summary', 'keywords', 'retrieved_date', 'category', 'simhash')
+
+    def __init__(self, db_path, batch_size=50, flush_interval=5.0, metrics=None, on_write_failure=None, retry_delay=1.0,
+                 on_write=None):
+        self.batch_size = batch_size
+        self.metrics = metrics
+        self.on_write_failure = on_write_failure
+        self.on_write = on_write
+        self.retry_delay = retry_delay
+        self.flush_interval = flush_interval
+        self.conn = connect_database(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.fts_enabled = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='articles_fts'").fetchone() is not None
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.bodies = []
+        self.archive_entries = []
+        self.oldest_pending = None
+        self.inserted = 0
+        self.closed = False
+        self.stop_event = threading.Event()
+        self.flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self.flusher.start()
+        atexit.register(self.close)
+
+    def add(self, data):
+        """Buffer an article dict, flushing if the batch is full"""
+        # Compress in the caller's thread, outside the lock
+        content_hash, body = compress_body(data['content'])
+        row = dict(data, content_hash=content_hash, content_length=len(data['content'] or ''))
+        row.setdefault('simhash', None)
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("ArticleWriter is closed")
+            self.bodies.append((content_hash, body, row['content_length'], data['content']) if content_hash else None)
+            self.buffer.append(tuple(row[column] for column in self.columns))
+            if self.oldest_pending is None:
+                self.oldest_pending = time.time()
+            if len(self.buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def is_pending(self, url_key):
+        """Whether an article with this URL key is buffered and not written yet"""
+        index = self.columns.index('url_key')
+        with self.lock:
+            return any(row[index] == url_key for row in self.buffer)
+
+    def add_archive_entry(self, entry):
+        """
+        Buffer a page_archive index row, a tuple of
+        (url_key, url, fetched_date, encoding, page_hash, segment, offset, length)
+        """
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("ArticleWriter is closed")
+            self.archive_entries.append(entry)
+            if self.oldest_pending is None:
+                self.oldest_pending = time.time()
+            if len(self.archive_entries) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        """Write all buffered articles in one transaction"""
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self.buffer and not self.archive_entries:
+            return
+        batch, self.buffer, self.oldest_pending = self.buffer, [], None
+        bodies, self.bodies = self.bodies, []
+        archive_entries, self.archive_entries = self.archive_entries, []
+        for attempt in range(2):
+            start = time.perf_counter()
+            try:
+                rowcount = self._write_batch(batch, bodies, archive_entries)
+                break
+            except sqlite3.Error as e:
+                error = e
+                if attempt == 0:
+                    logging.warning(f"Error writing batch of {len(batch)} articles, retrying: {e}")
+                    time.sleep(self.retry_delay)
+        else:
+            logging.error(f"Error writing batch of {len(batch)} articles: {error}")
+            if self.on_write_failure is not None and batch:
+                self.on_write_failure([dict(zip(self.columns, row)) for row in batch], error)
+            return
+        self.inserted += rowcount
+        if self.metrics is not None:
+            self.metrics.observe('db_write', time.perf_counter() - start)
+            self.metrics.count(None, 'rows_written', rowcount)
+        logging.info(f"Wrote {rowcount} of {len(batch)} buffered articles to the database")
+        if self.on_write is not None and batch:
+            index = self.columns.index('url_key')
+            self.on_write([row[index] for row in batch])
+
+    def _write_batch(self, batch, bodies, archive_entries):
+        """Write one batch in a single transaction and return the number of articles inserted"""
+        with self.conn:
+            self.conn.executemany('''
+            INSERT INTO page_archive (url_key, url, fetched_date, encoding, page_hash, segment, offset, length)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', archive_entries)
+            inserted = 0
+            stored, indexed, ignored = [], [], []
+            for row, body in zip(batch, bodies):
+                cursor = self.conn.execute(f'''
+                INSERT OR IGNORE INTO articles ({', '.join(self.columns)})
+                VALUES ({', '.join('?' * len(self.columns))})
+                ''', row)
+                inserted += cursor.rowcount
+                if not cursor.rowcount:
+                    ignored.append((row[self.columns.index('retrieved_date')], row[self.columns.index('url_key')]))
+                # A row ignored as already stored keeps the body it has; storing this one
+                # would leave it with no article pointing at it
+                if cursor.rowcount and body is not None:
+                    stored.append(body[:3])
+                    indexed.append((body[3], cursor.lastrowid))
+            self.conn.executemany('''
+            INSERT OR IGNORE INTO article_bodies (content_hash, body, length)
+            VALUES (?, ?, ?)
+            ''', stored)
+            # The articles trigger that marks a frontier URL done only fires for inserted rows;
+            # one already stored is done as well, and must not stay leased in flight
+            self.conn.executemany('''
+            UPDATE frontier SET state = 'done', last_error = NULL, lease_owner = NULL, lease_expires = NULL,
+                updated_date = ?
+            WHERE url_key = ?
+            ''', ignored)
+            # The full-text index triggers only see title and summary; bodies are added here
+            if self.fts_enabled:
+                self.conn.executemany("UPDATE articles_fts SET content=? WHERE rowid=?", indexed)
+        return inserted
+
+    def _flush_periodically(self):
+        while not self.stop_event.wait(min(1.0, self.flush_interval)):
+            with self.lock:
+                if self.oldest_pending is not None and time.time() - self.oldest_pending >= self.flush_interval:
+                    self._flush_locked()
+
+    def close(self):
+        """Flush pending articles and close the connection"""
+        self.stop_event.set()
+        with self.lock:
+            if self.closed:
+                return
+            self._flush_locked()
+            self.closed = True
+            self.conn.close()
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class PageArchive:
+    """
+    Append-only archive of raw article pages. Each page is one gzip member holding a JSON
+    header line (url, fetch time, charset) followed by the response body, appended to the
+    current segment file; a new segment is started once it reaches segment_bytes. Segments
+    are never rewritten, and members can be read back individually from their offset.
+    """
+    def __init__(self, directory, segment_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+        # Reentrant so callers can hold it around a lookup and append()
+        self.lock = threading.RLock()
+        # Every archive instance writes its own segments, so concurrent runs never share a file
+        self.prefix = f"pages-{datetime.datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}-{os.getpid()}"
+        self.segment_number = 0
+        self.segment = None
+        self.file = None
+
+    def _open_segment(self):
+        if self.file is not None:
+            self.file.close()
+        self.segment_number += 1
+        self.segment = f"{self.prefix}-{self.segment_number:04d}.gz"
+        self.file = open(os.path.join(self.directory, self.segment), 'ab')
+
+    def append(self, url, html, encoding, fetched_date):
+        """Append a page and return (segment, offset, length) of its record"""
+        header = json.dumps({'url': url, 'fetched_date': fetched_date, 'encoding': encoding, 'length': len(html)})
+        record = gzip.compress(header.encode('utf-8') + b'\n' + html, compresslevel=6)
+        with self.lock:
+            if self.file is None or self.file.tell() >= self.segment_bytes:
+                self._open_segment()
+            offset = self.file.tell()
+            self.file.write(record)
+            self.file.flush()
+            return self.segment, offset, len(record)
+
+    def read(self, segment, offset, length):
+        """Return the compressed record stored at a location"""
+        with open(os.path.join(self.directory, segment), 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+def unpack_archive_record(record):
+    """Split a compressed archive record into (header dict, raw page bytes)"""
+    header, _, html = gzip.decompress(record).partition(b'\n')
+    return json.loads(header), html
+
+def reextract_archived_page(item):
+    """
+    Re-extraction worker: parse one archived page with the current extraction code.
+    Returns (article_id, article), with article None if the page could not be parsed.
+    """
+    article_id, url, record = item
+    try:
+        header, html = unpack_archive_record(record)
+        article = parse_article_page(html, header.get('encoding'), url)
+        return article_id, article
+    except Exception as e:
+        logging.error(f"Error re-extracting archived page {url}: {e}")
+        return article_id, None
+
+class SQLiteWorkQueue:
+    """
+    The work queue shared by workers: the frontier and source_jobs tables of an articles
+    database. Frontier URLs and due sources are leased to a worker id for lease_seconds at
+    a time and go to the next worker that asks once a lease runs out. Outcomes are recorded
+    in batches, each batch in the same write transaction as the worker's next lease, and
+    calls that find nothing to lease or record only read, so idle workers do not hold up
+    the others on the database write lock. serve() makes the queue reachable to workers on
+    other hosts through RemoteWorkQueue.
+    """
+    # Saved articles are written to this database, where a trigger marks their URLs done
+    marks_saved = True
+    # Methods served to RemoteWorkQueue
+    remote_methods = ('prepare', 'enqueue', 'lease', 'finish', 'renew', 'release', 'lease_source', 'finish_source')
+
+    def __init__(self, db_path, timeout=30):
+        self.db_path = db_path
+        self.conn = connect_database(db_path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.lock = threading.Lock()
+        self.server = None
+
+    def _read(self, query, params=()):
+        with self.lock:
+            return self.conn.execute(query, params).fetchall()
+
+    def _write(self, work):
+        """Run work(cursor) in one BEGIN IMMEDIATE transaction and return what it returns"""
+        with self.lock:
+            cursor = self.conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(cursor)
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+            return result
+
+    def prepare(self, retention_days):
+        """
+        Return URLs left in flight by an interrupted run to pending and prune finished rows
+        older than retention_days. URLs leased to a process that is still running (or may be,
+        on another host) are left alone until their lease runs out. Returns the number of URLs
+        waiting from earlier runs.
+        """
+        now = datetime.datetime.now(timezone.utc)
+        now_text = now.strftime('%Y-%m-%d %H:%M:%S')
+        cutoff = (now - datetime.timedelta(days=retention_days)).strftime('%Y-%m-%d %H:%M:%S')
+        dead_owners = [(owner,) for (owner,) in self._read(
+            "SELECT DISTINCT lease_owner FROM frontier WHERE state='in_flight' AND lease_owner IS NOT NULL")
+            if not lease_owner_alive(owner)]
+
+        def work(cursor):
+            cursor.execute('''
+            UPDATE frontier SET state='pending', lease_owner=NULL, lease_expires=NULL
+            WHERE state='in_flight' AND (lease_owner IS NULL OR lease_expires <= ?)
+            ''', (now_text,))
+            interrupted = cursor.rowcount
+            cursor.executemany('''
+            UPDATE frontier SET state='pending', lease_owner=NULL, lease_expires=NULL
+            WHERE state='in_flight' AND lease_owner=?
+            ''', dead_owners)
+            interrupted += max(cursor.rowcount, 0)
+            cursor.execute('''
+            DELETE FROM frontier
+            WHERE (state IN ('done', 'skipped') OR (state = 'failed' AND retry_after IS NULL)) AND updated_date < ?
+            ''', (cutoff,))
+            cursor.execute('''
+            SELECT COUNT(*) FROM frontier
+            WHERE state = 'pending' OR (state = 'failed' AND retry_after <= ?)
+            ''', (now_text,))
+            return interrupted, cursor.fetchone()[0]
+
+        interrupted, waiting = self._write(work)
+        if interrupted:
+            logging.info(f"Returned {interrupted} URLs left in flight by an interrupted run to the frontier")
+        return waiting
+
+    def enqueue(self, source, links):
+        """
+        Add discovered article links as pending. URLs already in the frontier keep their
+        state, except skipped ones, which are looked at again when re-listed.
+        """
+        if not links:
+            return
+        now = datetime.datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        self._write(lambda cursor: cursor.executemany('''
+        INSERT INTO frontier (url_key, url, source, state, discovered_date, updated_date)
+        VALUES (?, ?, ?, 'pending', ?, ?)
+        ON CONFLICT (url_key) DO UPDATE SET state = 'pending', updated_date = excluded.updated_date
+        WHERE state = 'skipped'
+        ''', [(normalize_url(link), link, source, now, now) for link in links]))
+
+    def lease(self, owner, lease_seconds, limit=None, source=None, outcomes=(), retry=None):
+        """
+        Record outcomes (see finish) and lease frontier URLs to owner in one write transaction,
+        returning them as [(url, source)], oldest first: pending URLs, failed URLs whose retry
+        time has come and in-flight URLs whose lease ran out, at most limit of them and only a
+        source's if given. Concurrent workers never lease the same URL.
+        """
+        now = datetime.datetime.now(timezone.utc)
+        now_text = now.strftime('%Y-%m-%d %H:%M:%S')
+        expires = (now + datetime.timedelta(seconds=lease_seconds)).strftime('%Y-%m-%d %H:%M:%S')
+        where = '''(state = 'pending' OR (state = 'failed' AND retry_after <= ?)
+               OR (state = 'in_flight' AND (lease_expires IS NULL OR lease_expires <= ?)))'''
+        params = [now_text, now_text]
+        if source is not None:
+            where += " AND source = ?"
+            params.append(source)
+        if not outcomes and not self._read(f"SELECT 1 FROM frontier WHERE {where} LIMIT 1", params):
+            return []
+        query = f"SELECT url_key, url, source FROM frontier WHERE {where} ORDER BY discovered_date, rowid"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        def work(cursor):
+            self._record(cursor, owner, outcomes, retry, now)
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            cursor.executemany('''
+            UPDATE frontier SET state='in_flight', lease_owner=?, lease_expires=?, updated_date=? WHERE url_key=?
+            ''', [(owner, expires, now_text, url_key) for url_key, _, _ in rows])
+            return rows
+
+        return [(url, row_source) for _, url, row_source in self._write(work)]
+
+    def finish(self, owner, outcomes, retry=None):
+        """
+        Record the outcomes of URLs leased to owner, as (url_key, state, error, permanent)
+        with state 'done', 'skipped' or 'failed'. Failures are retried with exponential
+        backoff after retry = (max_attempts, base, max) seconds, except permanent ones,
+        and given up after max_attempts. Returns the number recorded.
+        """
+        if not outcomes:
+            return 0
+        now = datetime.datetime.now(timezone.utc)
+        return self._write(lambda cursor: self._record(cursor, owner, outcomes, retry, now))
+
+    @staticmethod
+    def _record(cursor, owner, outcomes, retry, now):
+        now_text = now.strftime('%Y-%m-%d %H:%M:%S')
+        max_attempts, retry_base, retry_max = retry or (5, 60, 6 * 3600)
+        finished = []
+        failed = []
+        for url_key, state, error, permanent in outcomes:
+            if state != 'failed':
+                finished.append((state, now_text, url_key, owner))
+                continue
+            cursor.execute("SELECT attempts FROM frontier WHERE url_key=?", (url_key,))
+            row = cursor.fetchone()
+            attempts = (row[0] if row else 0) + 1
+            if permanent or attempts >= max_attempts:
+                retry_after = None
+                logging.warning(f"Giving up on {url_key} after {attempts} attempt(s): {error}")
+            else:
+                delay = min(retry_base * 2 ** (attempts - 1), retry_max)
+                retry_after = (now + datetime.timedelta(seconds=delay * random.uniform(1, 1.5))).strftime('%Y-%m-%d %H:%M:%S')
+            failed.append((attempts, retry_after, (error or '')[:500], now_text, url_key, owner))
+        # Nothing is recorded for a URL whose lease has passed to another worker in the meantime
+        recorded = 0
+        for row in finished:
+            cursor.execute('''
+            UPDATE frontier SET state=?, updated_date=?, lease_owner=NULL, lease_expires=NULL
+            WHERE url_key=? AND state='in_flight' AND (lease_owner=? OR lease_owner IS NULL)
+            ''', row)
+            recorded += cursor.rowcount
+        for row in failed:
+            cursor.execute('''
+            UPDATE frontier SET state='failed', attempts=?, retry_after=?, last_error=?, updated_date=?,
+                lease_owner=NULL, lease_expires=NULL
+            WHERE url_key=? AND state='in_flight' AND (lease_owner=? OR lease_owner IS NULL)
+            ''', row)
+            recorded += cursor.rowcount
+        if recorded < len(outcomes):
+            logging.warning(f"Not recording {len(outcomes) - recorded} outcome(s) of {owner} whose lease passed to another worker")
+        return recorded
+
+    def renew(self, owner, lease_seconds):
+        """Extend the leases of owner's in-flight URLs and source jobs by lease_seconds"""
+        expires = (datetime.datetime.now(timezone.utc) + datetime.timedelta(seconds=lease_seconds)).strftime('%Y-%m-%d %H:%M:%S')
+
+        def work(cursor):
+            cursor.execute("UPDATE frontier SET lease_expires=? WHERE lease_owner=? AND state='in_flight'",
+                           (expires, owner))
+            renewed = cursor.rowcount
+            cursor.execute("UPDATE source_jobs SET lease_expires=? WHERE lease_owner=?", (expires, owner))
+            return renewed
+
+        return self._write(work)
+
+    def release(self, owner):
+        """Hand owner's unfinished URLs and source jobs back to the queue. Returns the number of URLs."""
+        def work(cursor):
+            cursor.execute('''
+            UPDATE frontier SET state='pending', lease_owner=NULL, lease_expires=NULL
+            WHERE lease_owner=? AND state='in_flight'
+            ''', (owner,))
+            released = cursor.rowcount
+            cursor.execute("UPDATE source_jobs SET lease_owner=NULL, lease_expires=NULL WHERE lease_owner=?", (owner,))
+            return released
+
+        return self._write(work)
+
+    def lease_source(self, owner, lease_seconds, names):
+        """
+        Lease the source that has been due for a poll the longest, among names, to owner and
+        return its name, or None if none is due. Sources not polled by any worker yet are due
+        at once.
+        """
+        now = datetime.datetime.now(timezone.utc)
+        now_text = now.strftime('%Y-%m-%d %H:%M:%S')
+        expires = (now + datetime.timedelta(seconds=lease_seconds)).strftime('%Y-%m-%d %H:%M:%S')
+        names = list(names)
+        if not names:
+            return None
+        placeholders = ','.join('?' * len(names))
+        due = self._read(f'''
+        SELECT source, next_poll <= ? AND (lease_owner IS NULL OR lease_expires <= ?) FROM source_jobs
+        WHERE source IN ({placeholders})
+        ''', [now_text, now_text] + names)
+        if len(due) == len(names) and not any(is_due for _, is_due in due):
+            return None
+
+        def work(cursor):
+            cursor.executemany("INSERT OR IGNORE INTO source_jobs (source, next_poll) VALUES (?, ?)",
+                               [(name, now_text) for name in names])
+            cursor.execute(f'''
+            SELECT source FROM source_jobs
+            WHERE source IN ({placeholders}) AND next_poll <= ?
+                AND (lease_owner IS NULL OR lease_expires <= ?)
+            ORDER BY next_poll
+            LIMIT 1
+            ''', names + [now_text, now_text])
+            row = cursor.fetchone()
+            if row:
+                cursor.execute("UPDATE source_jobs SET lease_owner=?, lease_expires=? WHERE source=?",
+                               (owner, expires, row[0]))
+            return row[0] if row else None
+
+        return self._write(work)
+
+    def finish_source(self, owner, source, interval, error=None):
+        """Release owner's lease on a polled source and schedule its next poll interval seconds from now"""
+        now = datetime.datetime.now(timezone.utc)
+        self._write(lambda cursor: cursor.execute('''
+        UPDATE source_jobs SET next_poll=?, last_polled=?, last_error=?, lease_owner=NULL, lease_expires=NULL
+        WHERE source=? AND lease_owner=?
+        ''', ((now + datetime.timedelta(seconds=interval)).strftime('%Y-%m-%d %H:%M:%S'),
+              now.strftime('%Y-%m-%d %H:%M:%S'), error, source, owner)))
+
+    def serve(self, port, host='127.0.0.1'):
+        """
+        Serve the queue over HTTP from a background thread and return the port. Each method
+        in remote_methods is a POST to /<method> with its keyword arguments as a JSON object.
+        """
+        work_queue = self
+
+        class QueueHandler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                method = self.path.strip('/')
+                try:
+                    if method not in SQLiteWorkQueue.remote_methods:
+                        status, reply = 404, {'error': f"No queue method {method}"}
+                    else:
+                        args = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+                        status, reply = 200, {'result': getattr(work_queue, method)(**args)}
+                except (TypeError, ValueError) as e:
+                    status, reply = 400, {'error': str(e)}
+                except sqlite3.Error as e:
+                    logging.error(f"Error answering queue call {method}: {e}")
+                    status, reply = 500, {'error': 'Database error'}
+                body = json.dumps(reply).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer((host, port), QueueHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        logging.info(f"Serving the work queue of {self.db_path} on http://{host}:{self.server.server_address[1]}/")
+        return self.server.server_address[1]
+
+    def close(self):
+        """Stop serving and close the database connection"""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        with self.lock:
+            self.conn.close()
+
+class RemoteWorkQueue:
+    """
+    A work queue served by SQLiteWorkQueue.serve() on another host, with the same methods.
+    Lease times follow the server's clock. Failed calls raise requests.RequestException.
+    """
+    # The worker's articles go to its own database, so saved URLs have to be marked done here
+    marks_saved = False
+
+    def __init__(self, url, timeout=60):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def call(self, method, **args):
+        response = self.session.post(f"{self.url}/{method}", json=args, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()['result']
+
+    def prepare(self, retention_days):
+        return self.call('prepare', retention_days=retention_days)
+
+    def enqueue(self, source, links):
+        if links:
+            self.call('enqueue', source=source, links=list(links))
+
+    def lease(self, owner, lease_seconds, limit=None, source=None, outcomes=(), retry=None):
+        return [tuple(item) for item in self.call('lease', owner=owner, lease_seconds=lease_seconds, limit=limit,
+                                                  source=source, outcomes=list(outcomes), retry=retry)]
+
+    def finish(self, owner, outcomes, retry=None):
+        return self.call('finish', owner=owner, outcomes=list(outcomes), retry=retry) if outcomes else 0
+
+    def renew(self, owner, lease_seconds):
+        return self.call('renew', owner=owner, lease_seconds=lease_seconds)
+
+    def release(self, owner):
+        return self.call('release', owner=owner)
+
+    def lease_source(self, owner, lease_seconds, names):
+        return self.call('lease_source', owner=owner, lease_seconds=lease_seconds, names=list(names))
+
+    def finish_source(self, owner, source, interval, error=None):
+        self.call('finish_source', owner=owner, source=source, interval=interval, error=error)
+
+    def close(self):
+        self.session.close()
+
+# What a work queue call can fail with, local or remote
+WORK_QUEUE_ERRORS = (sqlite3.Error, requests.RequestException)
+
+# Recorded in PRAGMA user_version once setup_database has brought a database up to date.
+# Databases below the version that introduced a one-off migration still need it run;
+# 1: URL keys without www., duplicate originals stored as URL keys and the articles_full
+#    layout with the compressed body
+SCHEMA_VERSION = 1
+
+# Seconds between polls of a source in daemon mode; wires and live market pages change fastest
+DEFAULT_POLL_INTERVALS = {
+    'CNBC': 60,
+    'Bloomberg': 120,
+    'Reuters Finance': 60,
+    'Yahoo Finance': 60,
+    'MarketWatch': 120,
+    'Business Insider Finance': 300,
+    'Forbes': 300
+}
+
+# Article columns the read API can return, as expressions over articles a LEFT JOIN article_bodies b
+API_COLUMNS = {
+    'id': 'a.id',
+    'title': 'a.title',
+    'url': 'a.url',
+    'source': 'a.source',
+    'author': 'a.author',
+    'publish_date': 'a.publish_date',
+    'summary': 'a.summary',
+    'keywords': 'a.keywords',
+    'retrieved_date': 'a.retrieved_date',
+    'category': 'a.category',
+    'content_length': 'a.content_length',
+    'content': 'IFNULL(a.content, inflate_body(b.body))',
+}
+DEFAULT_API_COLUMNS = ('id', 'title', 'url', 'source', 'publish_date', 'summary', 'category')
+# Default columns of the search and by-category results, in their original tuple layout
+SEARCH_COLUMNS = ('id', 'title', 'url', 'source', 'publish_date', 'summary', 'snippet')
+CATEGORY_COLUMNS = ('id', 'title', 'url', 'source', 'publish_date', 'summary')
+ARTICLE_RECORD_TYPES = {}
+
+def select_article_columns(columns, default=DEFAULT_API_COLUMNS, allowed=API_COLUMNS):
+    """
+    Validate a column list or comma-separated string against allowed, defaulting to default.
+    Duplicates are dropped; raises ValueError for unknown columns.
+    """
+    if not columns:
+        return list(default)
+    if isinstance(columns, str):
+        columns = [column.strip() for column in columns.split(',') if column.strip()]
+    unknown = [column for column in columns if column not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown article columns: {', '.join(unknown)}")
+    return list(dict.fromkeys(columns))
+
+def article_record_type(columns):
+    """The ArticleRecord namedtuple class for rows of these columns, created once per column list"""
+    columns = tuple(columns)
+    record_type = ARTICLE_RECORD_TYPES.get(columns)
+    if record_type is None:
+        record_type = ARTICLE_RECORD_TYPES.setdefault(columns, namedtuple('ArticleRecord', columns))
+    return record_type
+
+def encode_page_cursor(publish_date, article_id):
+    """Opaque cursor for the page after the row with this (publish_date, id)"""
+    return base64.urlsafe_b64encode(json.dumps([publish_date, article_id]).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_page_cursor(cursor):
+    """(publish_date, id) of a page cursor; raises ValueError for a malformed one"""
+    try:
+        publish_date, article_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(publish_date, (str, type(None))) or not isinstance(article_id, int):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return publish_date, article_id
+
+class ArticleQueryService:
+    """
+    Read-only queries over the articles database for dashboards, served as JSON over HTTP.
+    Article lists are paged by keyset on (publish_date, id), newest first, so every page
+    is an index range scan however deep it is and however large the archive grows, and
+    only the requested columns are read. Responses are kept in an LRU cache of cache_size
+    entries. All requests share one read connection, used under db_lock. PRAGMA
+    data_version on it tells, without reading anything, whether another connection has
+    committed since the last request; only then is the articles_version counter kept by
+    the articles triggers read, and the cache is cleared if it moved.
+    """
+    max_limit = 500
+
+    def __init__(self, db_path, cache_size=256):
+        self.db_path = db_path
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_version = None
+        self.lock = threading.Lock()
+        self.conn = None
+        self.db_lock = threading.Lock()
+        self.data_version = None
+        self.last_articles_version = None
+        self.hits = 0
+        self.misses = 0
+        self.server = None
+
+    def connection(self):
+        """The shared read connection, opened on first use; only use it while holding db_lock"""
+        if self.conn is None:
+            self.conn = connect_database(self.db_path, timeout=30, check_same_thread=False)
+        return self.conn
+
+    def fetch(self, query, params, one=False):
+        """Run a read query on the shared connection and return its rows (or first row)"""
+        with self.db_lock:
+            cursor = self.connection().execute(query, params)
+            return cursor.fetchone() if one else cursor.fetchall()
+
+    def articles_version(self):
+        """Current articles_version, re-read only when the database changed since the last request"""
+        with self.db_lock:
+            conn = self.connection()
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self.data_version:
+                self.last_articles_version = conn.execute("SELECT version FROM articles_version").fetchone()[0]
+                self.data_version = data_version
+            return self.last_articles_version
+
+    def cached(self, key, compute):
+        """Return the cached result for key, computing and caching it on a miss"""
+        version = self.articles_version()
+        with self.lock:
+            if version != self.cache_version:
+                self.cache.clear()
+                self.cache_version = version
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return self.cache[key], version
+            self.misses += 1
+        result = compute()
+        with self.lock:
+            if version == self.cache_version:
+                self.cache[key] = result
+                if len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return result, version
+
+    def list_articles(self, columns=None, category=None, source=None, start_date=None, end_date=None,
+                      cursor=None, limit=50):
+        """
+        One page of articles, newest publish date first, as {'articles': [...], 'next_cursor': ...}.
+        start_date/end_date are YYYY-MM-DD (both inclusive); pass next_cursor back as cursor for
+        the following page, until it is None. Raises ValueError for invalid arguments.
+        """
+        columns = select_article_columns(columns)
+        limit = int(limit)
+        if not 1 <= limit <= self.max_limit:
+            raise ValueError(f"limit must be between 1 and {self.max_limit}")
+        conditions, params = [], []
+        if category:
+            conditions.append("a.category = ?")
+            params.append(category)
+        if source:
+            conditions.append("a.source = ?")
+            params.append(source)
+        if start_date:
+            conditions.append("a.publish_date >= ?")
+            params.append(datetime.datetime.strptime(start_date, '%Y-%m-%d').strftime('%Y-%m-%d %H:%M:%S'))
+        if end_date:
+            conditions.append("a.publish_date <= ?")
+            params.append(datetime.datetime.strptime(end_date, '%Y-%m-%d').strftime('%Y-%m-%d 23:59:59'))
+        if cursor:
+            cursor_date, cursor_id = decode_page_cursor(cursor)
+            # Undated articles sort after all dated ones
+            if cursor_date is None:
+                conditions.append("a.publish_date IS NULL AND a.id < ?")
+                params.append(cursor_id)
+            else:
+                conditions.append("((a.publish_date, a.id) < (?, ?) OR a.publish_date IS NULL)")
+                params.extend([cursor_date, cursor_id])
+        # The cursor needs the sort key of the last row even if it was not asked for
+        selected = list(dict.fromkeys(columns + ['publish_date', 'id']))
+        query = f"SELECT {', '.join(API_COLUMNS[column] for column in selected)} FROM articles a"
+        if 'content' in columns:
+            query += " LEFT JOIN article_bodies b ON b.content_hash = a.content_hash"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY a.publish_date DESC, a.id DESC LIMIT ?"
+        rows = self.fetch(query, params + [limit + 1])
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_page_cursor(rows[-1][selected.index('publish_date')], rows[-1][selected.index('id')])
+        return {
+            'articles': [dict(zip(columns, row)) for row in rows],
+            'next_cursor': next_cursor,
+        }
+
+    def get_article(self, article_id, columns=None):
+        """One article by id with the given columns (default: all, including content), or None"""
+        columns = select_article_columns(columns, default=API_COLUMNS)
+        query = f"SELECT {', '.join(API_COLUMNS[column] for column in columns)} FROM articles a"
+        if 'content' in columns:
+            query += " LEFT JOIN article_bodies b ON b.content_hash = a.content_hash"
+        row = self.fetch(query + " WHERE a.id = ?", (article_id,), one=True)
+        return dict(zip(columns, row)) if row else None
+
+    def handle(self, path, params):
+        """
+        Answer a GET request as (status, JSON body bytes, articles_version the answer is
+        current for, or None): /articles (params columns, category, source, start, end,
+        cursor, limit), /articles/<id> (param columns) and /health.
+        """
+        if path == '/health':
+            version = self.articles_version()
+            with self.lock:
+                body = {'status': 'ok', 'articles_version': version, 'cached': len(self.cache),
+                        'hits': self.hits, 'misses': self.misses}
+            return 200, json.dumps(body).encode('utf-8'), None
+        key = (path, tuple(sorted(params.items())))
+        match = re.fullmatch(r'/articles/(\d+)', path)
+        try:
+            if path == '/articles':
+                def lookup():
+                    page = self.list_articles(params.get('columns'), params.get('category'), params.get('source'),
+                                              params.get('start'), params.get('end'), params.get('cursor'),
+                                              params.get('limit', 50))
+                    return 200, json.dumps(page, ensure_ascii=False).encode('utf-8')
+            elif match:
+                def lookup():
+                    article = self.get_article(int(match.group(1)), params.get('columns'))
+                    if article is None:
+                        return 404, json.dumps({'error': 'Article not found'}).encode('utf-8')
+                    return 200, json.dumps(article, ensure_ascii=False).encode('utf-8')
+            else:
+                return 404, json.dumps({'error': f'Unknown path: {path}'}).encode('utf-8'), None
+            (status, body), version = self.cached(key, lookup)
+            return status, body, version
+        except ValueError as e:
+            return 400, json.dumps({'error': str(e)}).encode('utf-8'), None
+
+    def serve(self, port, host='127.0.0.1'):
+        """Serve the API over HTTP from a background thread and return the port"""
+        service = self
+
+        class QueryHandler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                try:
+                    status, body, version = service.handle(url.path.rstrip('/') or '/', dict(parse_qsl(url.query)))
+                except sqlite3.Error as e:
+                    logging.error(f"Error answering {self.path}: {e}")
+                    status, body, version = 500, json.dumps({'error': 'Database error'}).encode('utf-8'), None
+                # Any response is current for as long as the articles are unchanged
+                etag = f'"{version}"' if status == 200 and version is not None else None
+                if etag and self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                if etag:
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer((host, port), QueryHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        logging.info(f"Serving the article API on http://{host}:{self.server.server_address[1]}/articles")
+        return self.server.server_address[1]
+
+    def stop(self):
+        """Stop serving and close the read connection"""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        with self.db_lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+                self.data_version = None
+
 class FinancialNewsScraper:
-    def __init__(self, db_path='financial_news.db'):
-        """Initialize the scraper with a database connection"""
+    def __init__(self, db_path='financial_news.db', max_workers=8, per_host_limit=2, source_workers=4,
+                 html_parser=DEFAULT_HTML_PARSER, max_page_bytes=5 * 1024 * 1024, taxonomy_path=None,
+                 parse_workers=0, parse_queue_size=32, archive_dir=None, profiles_path=None,
+                 metrics_path=None, metrics_port=None, queue_url=None):
+        """
+        Initialize the scraper with a database connection.
+        max_workers caps article fetches in flight across all hosts (1 scrapes serially),
+        per_host_limit caps concurrent fetches against a single host and
+        source_workers is how many source listing pages are fetched in parallel.
+        html_parser selects the BeautifulSoup backend ('lxml' when installed) and
+        article pages larger than max_page_bytes are abandoned mid-download.
+        taxonomy_path is an optional JSON file of category keywords that replaces DEFAULT_TAXONOMY.
+        parse_workers moves page parsing and categorization of the concurrent crawler into that
+        many processes (0 parses in the fetch threads), with at most parse_queue_size fetched
+        pages waiting for a parser before fetching pauses.
+        archive_dir, when set, keeps the raw HTML of every fetched article in a PageArchive
+        there, so articles can be re-extracted later without downloading them again.
+        profiles_path is an optional JSON file of per-domain extraction selectors that replaces
+        DEFAULT_EXTRACTION_PROFILES.
+        Stage timings and per-source counters are collected in self.metrics; metrics_path gets
+        a JSON snapshot of them every metrics_interval seconds and after every scrape, and
+        metrics_port serves them for Prometheus at http://127.0.0.1:<port>/metrics.
+        queue_url takes frontier URLs and source jobs from the work queue another host serves
+        there (see SQLiteWorkQueue.serve) instead of from this database, which then only
+        stores the articles.
+        """
         self.db_path = db_path
+        self.max_page_bytes = max_page_bytes
+        # How far into a page to look for the end of its head before giving up on early filtering
+        self.head_probe_bytes = 256 * 1024
+        self.html_parser = html_parser
+        if profiles_path:
+            with open(profiles_path, encoding='utf-8') as f:
+                self.extractor = ArticleExtractor(html_parser, json.load(f))
+            logging.info(f"Loaded extraction profiles from {profiles_path}")
+        else:
+            self.extractor = ArticleExtractor(html_parser, DEFAULT_EXTRACTION_PROFILES)
+        if taxonomy_path:
+            self.categorizer = KeywordCategorizer.from_file(taxonomy_path)
+            logging.info(f"Loaded category taxonomy from {taxonomy_path}")
+        else:
+            self.categorizer = KeywordCategorizer()
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.source_workers = source_workers
+        self.parse_workers = parse_workers
+        self.parse_queue_size = parse_queue_size
+        # A ParsePipeline kept open across crawls by run_daemon; crawls open their own otherwise
+        self.parse_pipeline = None
+        self.archive = PageArchive(archive_dir) if archive_dir else None
+        # Where recently archived pages went, by page hash, so a page fetched again is not
+        # appended twice while its index row is still buffered in the writer
+        self.archived_locations = OrderedDict()
+        self.archived_locations_size = 50000
+        self.archive_reader = None
+        # Read connection of is_known_url, opened on first use
+        self.known_url_reader = None
+        self.known_url_reader_lock = threading.Lock()
+        self.metrics = ScrapeMetrics()
+        self.metrics_path = metrics_path
+        self.metrics_interval = 30
+        if metrics_path:
+            self.metrics.start_snapshots(metrics_path, self.metrics_interval)
+        if metrics_port:
+            self.metrics.serve(metrics_port)
+        self.known_urls = None
+        self.duplicate_index = None
+        # Only articles published this many days back are compared for near-duplicates
+        self.duplicate_window_days = 30
+        self.writer = None
+        self.writer_lock = threading.Lock()
+        # Work queue of the frontier and source jobs, opened on first use, and the frontier
+        # outcomes waiting to be recorded with the next lease
+        self.queue_url = queue_url
+        self.work_queue = None
+        self.work_queue_lock = threading.Lock()
+        self.frontier_outcomes = []
+        self.frontier_outcomes_lock = threading.Lock()
         self.setup_database()
+        self.load_extraction_stats()
+        self.session = self.create_session()
+        # Paces requests per host in place of a fixed sleep between articles
+        self.rate_limiter = HostRateLimiter()
+        # 429/503 responses are retried this many times, if their Retry-After is at most max_retry_wait seconds
+        self.throttle_retries = 2
+        self.max_retry_wait = 60
+        # robots.txt crawl delays per host, refreshed after robots_ttl seconds
+        self.robots_ttl = 24 * 3600
+        self.robots_cache = {}
+        self.robots_lock = threading.Lock()
+        # One lock per origin, so concurrent lanes missing the cache fetch robots.txt once
+        self.robots_fetch_locks = {}
+        # Set by request_stop(): crawls stop taking new links and run_daemon returns
+        self.stop_requested = threading.Event()
+        # Seconds between polls of each source in run_daemon, default_poll_interval for the rest
+        self.poll_intervals = dict(DEFAULT_POLL_INTERVALS)
+        self.default_poll_interval = 300
         
         # Common financial news sources
         self.news_sources = {
@@ -67,6 +2464,39 @@ class FinancialNewsScraper:
             'Forbes': 'https://www.forbes.com/money/'
         }
         
+        # RSS/Atom feeds and news sitemaps used to discover articles; the section pages
+        # above are only scraped for links when none of a source's feeds can be read
+        self.feed_urls = {
+            'CNBC': ['https://www.cnbc.com/id/10000664/device/rss/rss.html',
+                     'https://www.cnbc.com/sitemap_news.xml'],
+            'Bloomberg': ['https://www.bloomberg.com/feeds/sitemap_news.xml'],
+            'Reuters Finance': ['https://www.reuters.com/arc/outboundfeeds/news-sitemap/?outputType=xml'],
+            'Yahoo Finance': ['https://finance.yahoo.com/news/rssindex'],
+            'MarketWatch': ['https://feeds.content.dowjones.io/public/rss/mw_topstories'],
+            'Business Insider Finance': ['https://feeds.businessinsider.com/custom/all'],
+            'Forbes': ['https://www.forbes.com/money/feed/']
+        }
+        # Child sitemaps followed per sitemap index, newest first
+        self.max_child_sitemaps = 5
+        # Failed article fetches are retried with exponential backoff (seconds) until they
+        # have failed frontier_max_attempts times; finished frontier rows are kept for a while
+        self.frontier_max_attempts = 5
+        self.frontier_retry_base = 60
+        self.frontier_retry_max = 6 * 3600
+        self.frontier_retention_days = 30
+        # When polling without a date range, feed entries older than a source's watermark minus this overlap are not fetched
+        self.watermark_overlap = datetime.timedelta(hours=6)
+        # Claimed frontier URLs and source jobs are leased to this process for lease_seconds at a time,
+        # renewed while it runs; a lease that runs out (the process died) lets another process take the job
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{os.urandom(3).hex()}"
+        self.lease_seconds = 300
+        self.lease_keeper = None
+        self.lease_lock = threading.Lock()
+        self.lease_keeper_stop = threading.Event()
+        # URLs a worker leases at a time, and how often it reloads the URL and near-duplicate indexes
+        self.worker_batch_size = 32
+        self.index_refresh_interval = 600
+        
         # User agents to rotate (to avoid being blocked)
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -76,60 +2506,856 @@ class FinancialNewsScraper:
             'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         ]
     
+    def connect(self, **kwargs):
+        """Open a connection to the articles database"""
+        return connect_database(self.db_path, **kwargs)
+    
     def setup_database(self):
-        """Create the SQLite database and tables if they don't exist"""
-        conn = sqlite3.connect(self.db_path)
+        """
+        Create the SQLite database and tables if they don't exist and run the migrations it
+        still needs. A database already at SCHEMA_VERSION is left as it is. Setup runs in one
+        write transaction, so processes starting together on the same database wait for the
+        first one to finish instead of running the migrations alongside it.
+        """
+        # Long enough to wait out another process migrating a large database
+        conn = self.connect(timeout=600)
         cursor = conn.cursor()
+        # WAL lets the analysis and search queries read while the writer commits
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA user_version")
+        version = cursor.fetchone()[0]
+        if version < SCHEMA_VERSION:
+            cursor.execute("BEGIN IMMEDIATE")
+            # Another process may have finished the setup while this one waited for the lock
+            cursor.execute("PRAGMA user_version")
+            version = cursor.fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='articles_fts'")
+            self.fts_enabled = cursor.fetchone() is not None
+            conn.rollback()
+            conn.close()
+            return
         
         # Create articles table
         cursor.execute('''
-        CREATE TABLE IF NOT EXISTS articles (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT,
-            url TEXT UNIQUE,
-            source TEXT,
-            author TEXT,
-            publish_date TEXT,
-            content TEXT,
-            summary TEXT,
-            keywords TEXT,
-            retrieved_date TEXT,
-            category TEXT
+        CREATE TABLE IF NOT EXISTS articles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT,
+            url TEXT UNIQUE,
+            source TEXT,
+            author TEXT,
+            publish_date TEXT,
+            content TEXT,
+            summary TEXT,
+            keywords TEXT,
+            retrieved_date TEXT,
+            category TEXT
+        )
+        ''')
+        
+        # Create search_terms table for tracking keywords
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS search_terms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            term TEXT UNIQUE,
+            last_search TEXT
+        )
+        ''')
+        
+        # Create http_validators table for conditional GETs of listing pages
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS http_validators (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            checked_date TEXT
+        )
+        ''')
+        
+        # Add the normalized URL key used by the known-URL index to older databases
+        cursor.execute("PRAGMA table_info(articles)")
+        if 'url_key' not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE articles ADD COLUMN url_key TEXT")
+            cursor.execute("SELECT id, url FROM articles")
+            cursor.executemany("UPDATE articles SET url_key=? WHERE id=?",
+                               [(normalize_url(url), id) for id, url in cursor.fetchall()])
+            logging.info("Added url_key column to articles")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_url_key ON articles(url_key)")
+        
+        # Article bodies are stored compressed, once per distinct text
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS article_bodies (
+            content_hash TEXT PRIMARY KEY,
+            body BLOB NOT NULL,
+            length INTEGER NOT NULL
+        )
+        ''')
+        migrated_bodies = self.migrate_article_bodies(cursor)
+        # Articles in the original articles column layout, with the compressed body alongside
+        # content (which is only set on rows written before the migration); see article_content
+        if version < 1:
+            cursor.execute("DROP VIEW IF EXISTS articles_full")
+        cursor.execute('''
+        CREATE VIEW IF NOT EXISTS articles_full AS
+        SELECT a.id, a.title, a.url, a.source, a.author, a.publish_date, a.content,
+               a.summary, a.keywords, a.retrieved_date, a.category, b.body
+        FROM articles a
+        LEFT JOIN article_bodies b ON b.content_hash = a.content_hash
+        ''')
+        
+        self.setup_fts(cursor)
+        self.setup_analytics(cursor)
+        self.setup_duplicates(cursor)
+        self.setup_frontier(cursor)
+        self.setup_archive(cursor)
+        if version < 1:
+            self.rekey_www_urls(cursor)
+            self.rekey_duplicate_originals(cursor)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS extraction_stats (
+            domain TEXT NOT NULL,
+            field TEXT NOT NULL,
+            selector TEXT NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (domain, field, selector)
+        ) WITHOUT ROWID
+        ''')
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        
+        conn.commit()
+        if migrated_bodies:
+            # Give the space of the old uncompressed bodies back to the filesystem
+            conn.execute("VACUUM")
+        conn.close()
+        logging.info("Database setup complete")
+    
+    def migrate_article_bodies(self, cursor, batch_size=500):
+        """
+        Move article bodies out of articles.content into the compressed article_bodies
+        store, in place. Runs once, when the content_hash column does not exist yet.
+        The full-text index and the rollup triggers are dropped here and recreated for the
+        new layout by setup_fts and setup_analytics. Returns the number of migrated articles.
+        """
+        cursor.execute("PRAGMA table_info(articles)")
+        if 'content_hash' in [row[1] for row in cursor.fetchall()]:
+            return 0
+        cursor.execute("ALTER TABLE articles ADD COLUMN content_hash TEXT")
+        cursor.execute("ALTER TABLE articles ADD COLUMN content_length INTEGER")
+        for name in ('articles_fts_insert', 'articles_fts_delete', 'articles_fts_update',
+                     'articles_rollup_insert', 'articles_rollup_delete', 'articles_rollup_update'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute("DROP TABLE IF EXISTS articles_fts")
+        cursor.execute("DROP INDEX IF EXISTS idx_articles_short_content")
+        migrated = 0
+        last_id = 0
+        while True:
+            cursor.execute("SELECT id, content FROM articles WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            bodies = []
+            updates = []
+            for id, content in rows:
+                content_hash, body = compress_body(content)
+                if content_hash:
+                    bodies.append((content_hash, body, len(content)))
+                updates.append((content_hash, len(content or ''), id))
+            cursor.executemany("INSERT OR IGNORE INTO article_bodies (content_hash, body, length) VALUES (?, ?, ?)", bodies)
+            cursor.executemany("UPDATE articles SET content=NULL, content_hash=?, content_length=? WHERE id=?", updates)
+            last_id = rows[-1][0]
+            migrated += len(rows)
+        if migrated:
+            logging.info(f"Moved {migrated} article bodies into compressed storage")
+        return migrated
+    
+    def setup_duplicates(self, cursor):
+        """
+        Create the article_duplicates table, which links URLs whose story was already stored
+        to the first copy (original_url holds that copy's url_key), and the SimHash fingerprint column on articles. The first time
+        this runs on an existing database the URL keys are recomputed with the current
+        canonicalization and fingerprints are backfilled.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='article_duplicates'")
+        needs_backfill = cursor.fetchone() is None
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS article_duplicates (
+            url TEXT PRIMARY KEY,
+            url_key TEXT,
+            source TEXT,
+            original_url TEXT,
+            match_type TEXT,
+            distance INTEGER,
+            detected_date TEXT
+        )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_article_duplicates_url_key ON article_duplicates(url_key)")
+        cursor.execute("PRAGMA table_info(articles)")
+        if 'simhash' not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE articles ADD COLUMN simhash INTEGER")
+        if not needs_backfill:
+            return
+        cursor.execute("SELECT id, url FROM articles")
+        cursor.executemany("UPDATE articles SET url_key=? WHERE id=?",
+                           [(normalize_url(url), id) for id, url in cursor.fetchall()])
+        last_id = 0
+        while True:
+            cursor.execute("SELECT id, content, body FROM articles_full WHERE id > ? ORDER BY id LIMIT 500", (last_id,))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            updates = []
+            for id, content, body in rows:
+                fingerprint = simhash(article_content(content, body) or '')
+                if fingerprint is not None:
+                    updates.append((to_signed64(fingerprint), id))
+            cursor.executemany("UPDATE articles SET simhash=? WHERE id=?", updates)
+            last_id = rows[-1][0]
+        logging.info("Recomputed URL keys and near-duplicate fingerprints for existing articles")
+    
+    def setup_frontier(self, cursor):
+        """
+        Create the crawl frontier, which records every discovered article URL with its state
+        (pending, in_flight, done, skipped or failed), and the per-source high-watermarks of
+        the newest stored publish date. Triggers on articles mark a URL done and advance its
+        source's watermark in the same transaction that stores the article.
+        In-flight URLs are leased to one scraper process (lease_owner) until lease_expires,
+        and source_jobs leases the polling of each source the same way, so any number of
+        worker processes can share the queue.
+        """
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS frontier (
+            url_key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            source TEXT NOT NULL,
+            state TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            retry_after TEXT,
+            last_error TEXT,
+            discovered_date TEXT,
+            updated_date TEXT
         )
         ''')
-        
-        # Create search_terms table for tracking keywords
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_frontier_state ON frontier(source, state, retry_after)")
+        cursor.execute("PRAGMA table_info(frontier)")
+        if 'lease_owner' not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE frontier ADD COLUMN lease_owner TEXT")
+            cursor.execute("ALTER TABLE frontier ADD COLUMN lease_expires TEXT")
+            cursor.execute("DROP TRIGGER IF EXISTS articles_frontier_done")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_frontier_claim ON frontier(state, discovered_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_frontier_lease ON frontier(lease_owner)")
         cursor.execute('''
-        CREATE TABLE IF NOT EXISTS search_terms (
+        CREATE TABLE IF NOT EXISTS source_jobs (
+            source TEXT PRIMARY KEY,
+            next_poll TEXT,
+            lease_owner TEXT,
+            lease_expires TEXT,
+            last_polled TEXT,
+            last_error TEXT
+        )
+        ''')
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_frontier_done AFTER INSERT ON articles BEGIN
+            UPDATE frontier SET state = 'done', last_error = NULL, lease_owner = NULL, lease_expires = NULL,
+                updated_date = new.retrieved_date
+            WHERE url_key = new.url_key;
+        END
+        ''')
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='source_watermarks'")
+        needs_backfill = cursor.fetchone() is None
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type='trigger' AND name='articles_watermark_insert'")
+        row = cursor.fetchone()
+        if row and 'IFNULL(new.retrieved_date' not in row[0]:
+            # Older watermarks took future (misparsed) publish dates as they were; rebuild them clamped
+            # to the retrieval time, so one bad date can no longer hide a source's new articles
+            cursor.execute("DROP TRIGGER articles_watermark_insert")
+            cursor.execute("DELETE FROM source_watermarks")
+            needs_backfill = True
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS source_watermarks (
+            source TEXT PRIMARY KEY,
+            newest_publish_date TEXT NOT NULL,
+            updated_date TEXT
+        )
+        ''')
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_watermark_insert AFTER INSERT ON articles
+        WHEN new.source IS NOT NULL AND new.publish_date IS NOT NULL BEGIN
+            INSERT INTO source_watermarks (source, newest_publish_date, updated_date)
+            VALUES (new.source, MIN(new.publish_date, IFNULL(new.retrieved_date, new.publish_date)), new.retrieved_date)
+            ON CONFLICT (source) DO UPDATE SET
+                newest_publish_date = MAX(newest_publish_date, excluded.newest_publish_date),
+                updated_date = excluded.updated_date;
+        END
+        ''')
+        if needs_backfill:
+            cursor.execute('''
+            INSERT INTO source_watermarks (source, newest_publish_date, updated_date)
+            SELECT source, MAX(MIN(publish_date, IFNULL(retrieved_date, publish_date))), MAX(retrieved_date) FROM articles
+            WHERE source IS NOT NULL AND publish_date IS NOT NULL
+            GROUP BY source
+            ''')
+    
+    def setup_archive(self, cursor):
+        """
+        Create the index of the raw page archive: where each fetched page is stored, by URL
+        and fetch time. Pages with identical bytes share one archived record.
+        """
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS page_archive (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            term TEXT UNIQUE,
-            last_search TEXT
+            url_key TEXT NOT NULL,
+            url TEXT NOT NULL,
+            fetched_date TEXT NOT NULL,
+            encoding TEXT,
+            page_hash TEXT NOT NULL,
+            segment TEXT NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL
         )
         ''')
-        
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_page_archive_url_key ON page_archive(url_key, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_page_archive_page_hash ON page_archive(page_hash)")
+    
+    def rekey_duplicate_originals(self, cursor):
+        """
+        Replace the original URLs of simhash duplicates, which used to be stored as fetched,
+        with their URL keys
+        """
+        cursor.execute('''
+        SELECT url, original_url FROM article_duplicates
+        WHERE match_type = 'simhash' AND original_url NOT IN (SELECT url_key FROM articles WHERE url_key IS NOT NULL)
+        ''')
+        cursor.executemany("UPDATE article_duplicates SET original_url=? WHERE url=?",
+                           [(normalize_url(original_url), url) for url, original_url in cursor.fetchall()
+                            if original_url and normalize_url(original_url) != original_url])
+    
+    def rekey_www_urls(self, cursor):
+        """
+        Recompute URL keys that were stored with their www. prefix, from before normalize_url
+        dropped it, so www. and amp. links to a story share one key. A frontier entry whose
+        new key is already queued is dropped in favour of the existing one.
+        """
+        www_keys = "(url_key LIKE 'http://www.%' OR url_key LIKE 'https://www.%')"
+        cursor.execute(f"SELECT 1 FROM articles WHERE {www_keys} UNION ALL SELECT 1 FROM frontier WHERE {www_keys} LIMIT 1")
+        if cursor.fetchone() is None:
+            return
+        for table, key in (('articles', 'id'), ('article_duplicates', 'url'), ('page_archive', 'id')):
+            cursor.execute(f"SELECT {key}, url FROM {table} WHERE {www_keys}")
+            cursor.executemany(f"UPDATE {table} SET url_key=? WHERE {key}=?",
+                               [(normalize_url(url), id) for id, url in cursor.fetchall()])
+        cursor.execute(f"SELECT url_key, url FROM frontier WHERE {www_keys}")
+        rows = cursor.fetchall()
+        cursor.executemany("UPDATE OR IGNORE frontier SET url_key=? WHERE url_key=?",
+                           [(normalize_url(url), url_key) for url_key, url in rows])
+        # Rows still on their old key collided with an entry already queued under the new one
+        cursor.executemany("DELETE FROM frontier WHERE url_key=?", [(url_key,) for url_key, _ in rows])
+        logging.info("Recomputed URL keys without the www. prefix")
+    
+    def archive_page(self, url, html, encoding):
+        """
+        Store a fetched page in the archive and index it; identical pages are stored once.
+        The lookup and append happen under the archive lock, and the index row is written
+        by the batched article writer rather than in a transaction of its own.
+        """
+        fetched_date = datetime.datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        page_hash = hashlib.sha256(html).hexdigest()
+        with self.archive.lock:
+            location = self.archived_locations.get(page_hash)
+            if location is None:
+                if self.archive_reader is None:
+                    self.archive_reader = self.connect(timeout=30, check_same_thread=False)
+                location = self.archive_reader.execute(
+                    "SELECT segment, offset, length FROM page_archive WHERE page_hash=? LIMIT 1", (page_hash,)).fetchone()
+                location = tuple(location) if location else self.archive.append(url, html, encoding, fetched_date)
+            self.archived_locations[page_hash] = location
+            self.archived_locations.move_to_end(page_hash)
+            if len(self.archived_locations) > self.archived_locations_size:
+                self.archived_locations.popitem(last=False)
+        self.get_writer().add_archive_entry((normalize_url(url), url, fetched_date, encoding, page_hash) + location)
+    
+    def reextract_archived_articles(self, workers=None, batch_size=200):
+        """
+        Re-run extraction and categorization over the latest archived page of every stored
+        article, in parallel processes and without any network access, and update the
+        articles in place. Articles whose page now yields no content are left unchanged.
+        Returns the number of articles updated.
+        """
+        if self.archive is None:
+            print("No page archive configured.")
+            return 0
+        conn = self.connect(timeout=30)
+        cursor = conn.cursor()
+        updated = scanned = 0
+        last_id = 0
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=init_parse_worker,
+                                 initargs=(self.html_parser, self.categorizer.taxonomy,
+                                           self.extractor.profile_state())) as pool:
+            while True:
+                cursor.execute('''
+                SELECT a.id, a.url, p.segment, p.offset, p.length
+                FROM articles a
+                JOIN page_archive p ON p.id = (SELECT MAX(id) FROM page_archive WHERE url_key = a.url_key)
+                WHERE a.id > ?
+                ORDER BY a.id
+                LIMIT ?
+                ''', (last_id, batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                items = []
+                for id, url, segment, offset, length in rows:
+                    try:
+                        items.append((id, url, self.archive.read(segment, offset, length)))
+                    except OSError as e:
+                        logging.error(f"Error reading archived page for {url}: {e}")
+                bodies, updates, indexed = [], [], []
+                for id, article in pool.map(reextract_archived_page, items, chunksize=8):
+                    if article is None or not article['content']:
+                        continue
+                    content_hash, body = compress_body(article['content'])
+                    bodies.append((content_hash, body, len(article['content'])))
+                    updates.append((
+                        article['title'], article['author'],
+                        article['publish_date'].strftime('%Y-%m-%d %H:%M:%S') if article['publish_date'] else None,
+                        article['summary'], article['keywords'], article['category'],
+                        to_signed64(article['simhash']) if article['simhash'] is not None else None,
+                        content_hash, len(article['content']), id
+                    ))
+                    indexed.append((article['content'], id))
+                cursor.executemany("INSERT OR IGNORE INTO article_bodies (content_hash, body, length) VALUES (?, ?, ?)", bodies)
+                cursor.executemany('''
+                UPDATE articles SET title=?, author=?, publish_date=IFNULL(?, publish_date), summary=?, keywords=?,
+                    category=?, simhash=?, content_hash=?, content_length=?
+                WHERE id=?
+                ''', updates)
+                if self.fts_enabled:
+                    cursor.executemany("UPDATE articles_fts SET content=? WHERE rowid=?", indexed)
+                conn.commit()
+                last_id = rows[-1][0]
+                scanned += len(rows)
+                updated += len(updates)
+                sys.stdout.write(f"\rRe-extracted {scanned} archived articles | Updated: {updated}    ")
+                sys.stdout.flush()
+        # Drop the bodies no article points to any more
+        cursor.execute('''
+        DELETE FROM article_bodies
+        WHERE content_hash NOT IN (SELECT content_hash FROM articles WHERE content_hash IS NOT NULL)
+        ''')
         conn.commit()
         conn.close()
-        logging.info("Database setup complete")
+        print()
+        logging.info(f"Re-extraction completed. {updated} of {scanned} archived articles updated.")
+        return updated
+    
+    def load_extraction_stats(self):
+        """Load the learned selector counts of every domain into the extraction profiles"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT domain, field, selector, hits FROM extraction_stats WHERE hits > 0")
+        rows = cursor.fetchall()
+        conn.close()
+        for domain, field, selector, hits in rows:
+            profile = self.extractor.profiles.get(domain)
+            if profile is None:
+                profile = self.extractor.profiles[domain] = ExtractionProfile(domain)
+            if field in profile.fields:
+                profile.set_hits(field, selector, hits)
+    
+    def save_extraction_stats(self):
+        """Persist the learned selector counts of every extraction profile"""
+        rows = [(domain, field, selector, hits)
+                for domain, profile in list(self.extractor.profiles.items())
+                for field, counts in list(profile.hits.items())
+                for selector, hits in list(counts.items())]
+        if not rows:
+            return
+        conn = self.connect(timeout=30)
+        cursor = conn.cursor()
+        cursor.executemany('''
+        INSERT INTO extraction_stats (domain, field, selector, hits) VALUES (?, ?, ?, ?)
+        ON CONFLICT (domain, field, selector) DO UPDATE SET hits = excluded.hits
+        ''', rows)
+        conn.commit()
+        conn.close()
+    
+    def record_selector_stats(self, url, selector_stats):
+        """Teach the URL's extraction profile which selectors matched its page"""
+        if selector_stats:
+            self.extractor.profile_for(url, create=True).record(selector_stats['matched'], selector_stats['missed'])
+    
+    def setup_analytics(self, cursor):
+        """
+        Create the secondary indexes used by the query methods and the daily_rollup table,
+        which holds article counts per (day, source, category) and is kept up to date by
+        triggers on articles. Articles without a publish date are not counted. The rollup is backfilled once for an existing database.
+        articles_version counts changes to articles, so ArticleQueryService knows when its
+        cached results are stale.
+        """
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_publish_date ON articles(publish_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source, publish_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_category ON articles(category, publish_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_articles_retrieved_date ON articles(retrieved_date)")
+        # Only the short articles listed by the analysis report are indexed here
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_articles_short_content ON articles(publish_date)
+        WHERE IFNULL(content_length, 0) < 500
+        ''')
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='daily_rollup'")
+        needs_backfill = cursor.fetchone() is None
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_rollup (
+            day TEXT NOT NULL,
+            source TEXT NOT NULL,
+            category TEXT NOT NULL,
+            article_count INTEGER NOT NULL DEFAULT 0,
+            short_content_count INTEGER NOT NULL DEFAULT 0,
+            very_short_content_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, source, category)
+        ) WITHOUT ROWID
+        ''')
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type='trigger' AND name='articles_rollup_insert'")
+        row = cursor.fetchone()
+        if row and 'publish_date IS NOT NULL' not in row[0]:
+            # Older triggers counted undated articles under day ''; they are now left out
+            for event in ('insert', 'delete', 'update'):
+                cursor.execute(f"DROP TRIGGER articles_rollup_{event}")
+            cursor.execute("DELETE FROM daily_rollup WHERE day = ''")
+        # Each trigger adds (+1) or removes (-1) one dated article's contribution to its rollup row
+        rollup_upsert = '''
+            INSERT INTO daily_rollup (day, source, category, article_count, short_content_count, very_short_content_count)
+            SELECT DATE({row}.publish_date), IFNULL({row}.source, ''), IFNULL({row}.category, ''), {sign},
+                   {sign} * (IFNULL({row}.content_length, 0) < 500),
+                   {sign} * (IFNULL({row}.content_length, 0) < 200)
+            WHERE {row}.publish_date IS NOT NULL
+            ON CONFLICT (day, source, category) DO UPDATE SET
+                article_count = article_count + excluded.article_count,
+                short_content_count = short_content_count + excluded.short_content_count,
+                very_short_content_count = very_short_content_count + excluded.very_short_content_count;
+        '''
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS articles_rollup_insert AFTER INSERT ON articles BEGIN
+            {rollup_upsert.format(row='new', sign=1)}
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS articles_rollup_delete AFTER DELETE ON articles BEGIN
+            {rollup_upsert.format(row='old', sign=-1)}
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS articles_rollup_update AFTER UPDATE OF publish_date, source, category, content_length ON articles BEGIN
+            {rollup_upsert.format(row='old', sign=-1)}
+            {rollup_upsert.format(row='new', sign=1)}
+        END
+        ''')
+        if needs_backfill:
+            cursor.execute('''
+            INSERT INTO daily_rollup (day, source, category, article_count, short_content_count, very_short_content_count)
+            SELECT DATE(publish_date), IFNULL(source, ''), IFNULL(category, ''), COUNT(*),
+                   SUM(IFNULL(content_length, 0) < 500),
+                   SUM(IFNULL(content_length, 0) < 200)
+            FROM articles
+            WHERE publish_date IS NOT NULL
+            GROUP BY 1, 2, 3
+            ''')
+            logging.info("Built daily rollup for existing articles")
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS articles_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO articles_version (id, version) VALUES (1, 0)")
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS articles_version_{event.lower()} AFTER {event} ON articles BEGIN
+                UPDATE articles_version SET version = version + 1 WHERE id = 1;
+            END
+            ''')
+    
+    def setup_fts(self, cursor, batch_size=500):
+        """
+        Create the FTS5 index over title, summary and content. Triggers keep title and
+        summary in sync with the articles table; bodies are compressed, so the article
+        writer and re-extraction add the decompressed content themselves. An existing
+        database is indexed once when the FTS table is first created, including one whose
+        index still reads from the articles_full view. Sets self.fts_enabled.
+        """
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='articles_fts'")
+        row = cursor.fetchone()
+        if row is not None and 'articles_full' in row[0]:
+            # Older layout: an external-content index whose triggers decompressed bodies in SQL
+            for name in ('articles_fts_insert', 'articles_fts_delete', 'articles_fts_update'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute("DROP TABLE articles_fts")
+            row = None
+        needs_rebuild = row is None
+        try:
+            cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(title, summary, content)
+            ''')
+        except sqlite3.OperationalError as e:
+            logging.warning(f"SQLite FTS5 is unavailable, search will scan the articles table: {e}")
+            self.fts_enabled = False
+            return
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+            INSERT INTO articles_fts (rowid, title, summary, content)
+            VALUES (new.id, new.title, new.summary, new.content);
+        END
+        ''')
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+            DELETE FROM articles_fts WHERE rowid = old.id;
+        END
+        ''')
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, summary ON articles BEGIN
+            UPDATE articles_fts SET title = new.title, summary = new.summary WHERE rowid = new.id;
+        END
+        ''')
+        if needs_rebuild:
+            last_id = 0
+            while True:
+                cursor.execute("SELECT id, title, summary, content, body FROM articles_full WHERE id > ? ORDER BY id LIMIT ?",
+                               (last_id, batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                cursor.executemany("INSERT INTO articles_fts (rowid, title, summary, content) VALUES (?, ?, ?, ?)",
+                                   [(id, title, summary, article_content(content, body))
+                                    for id, title, summary, content, body in rows])
+                last_id = rows[-1][0]
+            logging.info("Built full-text index for existing articles")
+        self.fts_enabled = True
+    
+    def get_writer(self):
+        """Return the shared article writer, opening it on first use"""
+        with self.writer_lock:
+            if self.writer is None or self.writer.closed:
+                self.writer = ArticleWriter(self.db_path, metrics=self.metrics, on_write_failure=self.requeue_unwritten,
+                                            on_write=self.record_written if self.queue_url else None)
+            return self.writer
+    
+    def requeue_unwritten(self, articles, error):
+        """
+        Called by the article writer when a batch could not be written: forget the articles
+        in the known-URL and near-duplicate indexes, and mark their frontier entries failed,
+        due for another fetch after frontier_retry_base seconds, instead of leaving them
+        leased in flight.
+        """
+        url_keys = [article['url_key'] for article in articles]
+        for article in articles:
+            if self.known_urls is not None:
+                self.known_urls.discard(url_hash(article['url_key']))
+            if self.duplicate_index is not None and article['simhash'] is not None:
+                self.duplicate_index.discard(article['simhash'] & ((1 << 64) - 1), article['url'])
+        try:
+            requeued = self.get_work_queue().finish(
+                self.worker_id, [(url_key, 'failed', f"Database write failed: {error}", False) for url_key in url_keys],
+                self.frontier_retry_policy())
+            logging.warning(f"Requeued {requeued} frontier URL(s) of {len(url_keys)} unwritten articles")
+        except WORK_QUEUE_ERRORS as e:
+            logging.error(f"Error requeueing {len(url_keys)} unwritten articles: {e}")
+    
+    def close(self):
+        """Flush buffered articles and release the database and HTTP connections and any leases"""
+        if self.writer is not None:
+            self.writer.close()
+        self.lease_keeper_stop.set()
+        if self.work_queue is not None:
+            try:
+                if self.lease_keeper is not None:
+                    self.release_leases()
+                else:
+                    self.flush_frontier_outcomes()
+            except WORK_QUEUE_ERRORS as e:
+                logging.error(f"Error releasing frontier leases: {e}")
+            self.work_queue.close()
+            self.work_queue = None
+        if self.archive is not None:
+            self.archive.close()
+        if self.archive_reader is not None:
+            self.archive_reader.close()
+            self.archive_reader = None
+        with self.known_url_reader_lock:
+            if self.known_url_reader is not None:
+                self.known_url_reader.close()
+                self.known_url_reader = None
+        self.metrics.stop()
+        self.session.close()
     
     def get_random_user_agent(self):
         """Return a random user agent from the list"""
         return random.choice(self.user_agents)
     
-    def get_soup(self, url):
-        """Get the BeautifulSoup object for a URL with error handling"""
+    def create_session(self):
+        """
+        Create the shared HTTP session. Connections are kept alive and pooled per host,
+        so repeat requests to a source skip the TCP and TLS handshakes.
+        """
+        session = requests.Session()
+        # Connection errors are retried a couple of times right away; throttling responses
+        # are left to http_get and the rate limiter, and the frontier retries later failures
+        retries = Retry(total=2, backoff_factor=0.5, allowed_methods=frozenset(['GET', 'HEAD']),
+                        respect_retry_after_header=False)
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=self.per_host_limit + self.source_workers,
+                              max_retries=retries)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def get_crawl_delay(self, url):
+        """
+        Return the robots.txt crawl delay for a URL's host in seconds (from Crawl-delay or
+        Request-rate), or None. robots.txt is fetched once per host, through the host's rate
+        limiter, and cached for robots_ttl; other threads asking meanwhile wait for that fetch.
+        """
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        origin = f"{parts.scheme}://{host}"
+        with self.robots_lock:
+            cached = self.robots_cache.get(origin)
+            if cached is not None and time.time() - cached[1] < self.robots_ttl:
+                return cached[0]
+            fetch_lock = self.robots_fetch_locks.setdefault(origin, threading.Lock())
+        with fetch_lock:
+            with self.robots_lock:
+                cached = self.robots_cache.get(origin)
+            if cached is not None and time.time() - cached[1] < self.robots_ttl:
+                return cached[0]
+            return self._fetch_crawl_delay(origin, host)
+    
+    def _fetch_crawl_delay(self, origin, host):
+        """Fetch and parse an origin's robots.txt for get_crawl_delay, and cache the delay"""
+        delay = None
+        try:
+            self.rate_limiter.acquire(host)
+            start = time.monotonic()
+            try:
+                response = self.session.get(origin + '/robots.txt', headers={'User-Agent': self.get_random_user_agent()}, timeout=10)
+            except requests.exceptions.RequestException:
+                self.rate_limiter.record(host, None, time.monotonic() - start)
+                raise
+            self.rate_limiter.record(host, response.status_code, time.monotonic() - start)
+            if response.status_code == 200:
+                robots = RobotFileParser()
+                robots.parse(response.text.splitlines())
+                delay = robots.crawl_delay('*')
+                request_rate = robots.request_rate('*')
+                if request_rate and request_rate.requests:
+                    delay = max(float(delay or 0), request_rate.seconds / request_rate.requests)
+                delay = float(delay) if delay else None
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logging.warning(f"Could not read robots.txt for {origin}: {e}")
+        with self.robots_lock:
+            self.robots_cache[origin] = (delay, time.time())
+        self.rate_limiter.set_crawl_delay(host, delay)
+        if delay:
+            logging.info(f"Using robots.txt crawl delay of {delay}s for {origin}")
+        return delay
+    
+    def http_get(self, url, **kwargs):
+        """
+        GET a URL through the per-host rate limiter. Each response's status and latency feed
+        back into the host's request rate, and 429/503 responses are retried once their
+        Retry-After has passed, when it is short enough to wait for.
+        """
+        host = urlsplit(url).netloc.lower()
+        self.get_crawl_delay(url)
+        kwargs.setdefault('timeout', 10)
+        for attempt in range(self.throttle_retries + 1):
+            with self.metrics.time('rate_limit_wait'):
+                self.rate_limiter.acquire(host)
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, **kwargs)
+            except requests.exceptions.RequestException:
+                self.rate_limiter.record(host, None, time.monotonic() - start)
+                raise
+            # Connection setup (DNS, TCP, TLS) and waiting for the headers; streamed bodies are read later
+            self.metrics.observe('request', time.monotonic() - start)
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            self.rate_limiter.record(host, response.status_code, time.monotonic() - start, retry_after)
+            if (response.status_code not in (429, 503) or attempt == self.throttle_retries
+                    or (retry_after or 0) > self.max_retry_wait):
+                return response
+            logging.info(f"Throttled by {host} (status {response.status_code}), retrying {url}")
+            response.close()
+    
+    def get_validators(self, url):
+        """Return the stored (etag, last_modified) pair for a URL, or (None, None)"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT etag, last_modified FROM http_validators WHERE url=?", (url,))
+        row = cursor.fetchone()
+        conn.close()
+        return row if row else (None, None)
+    
+    def save_validators(self, validators):
+        """Store ETag/Last-Modified validators, a list of (url, etag, last_modified)"""
+        if not validators:
+            return
+        checked_date = datetime.datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.executemany('''
+        INSERT OR REPLACE INTO http_validators (url, etag, last_modified, checked_date)
+        VALUES (?, ?, ?, ?)
+        ''', [(url, etag, last_modified, checked_date) for url, etag, last_modified in validators])
+        conn.commit()
+        conn.close()
+    
+    def get_response(self, url, conditional=False, validators=None):
+        """
+        Fetch a URL, returning the response or None on error.
+        With conditional=True the stored ETag/Last-Modified validators are sent, a 304
+        Not Modified response is returned as is, and the validators of a fresh response are saved,
+        or appended to the validators list as (url, etag, last_modified) for the caller to save
+        with save_validators once it has used the response.
+        """
         headers = {'User-Agent': self.get_random_user_agent()}
+        if conditional:
+            etag, last_modified = self.get_validators(url)
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.http_get(url, headers=headers)
+            if conditional and response.status_code == 304:
+                logging.info(f"Not modified since last fetch, skipping: {url}")
+                return response
             response.raise_for_status()
-            return BeautifulSoup(response.text, 'html.parser')
+            if conditional and (response.headers.get('ETag') or response.headers.get('Last-Modified')):
+                if validators is not None:
+                    validators.append((url, response.headers.get('ETag'), response.headers.get('Last-Modified')))
+                else:
+                    self.save_validators([(url, response.headers.get('ETag'), response.headers.get('Last-Modified'))])
+            return response
         except requests.exceptions.RequestException as e:
             logging.error(f"Error fetching {url}: {e}")
             return None
+    
+    def get_soup(self, url, conditional=False, validators=None):
+        """
+        Get the BeautifulSoup object for a URL with error handling.
+        With conditional=True, None is returned without parsing when the page is unchanged.
+        """
+        response = self.get_response(url, conditional=conditional, validators=validators)
+        if response is None or response.status_code == 304:
+            return None
+        with self.metrics.time('listing_parse'):
+            return BeautifulSoup(response.text, self.html_parser)
         
-    def extract_article_links(self, source_name, source_url):
-        """Extract article links from a news source"""
+    def extract_article_links(self, source_name, source_url, conditional=True, validators=None):
+        """
+        Extract article links from a news source.
+        Listing pages are fetched conditionally, so an unchanged page yields no links.
+        """
         logging.info(f"Scraping links from {source_name}: {source_url}")
-        soup = self.get_soup(source_url)
+        soup = self.get_soup(source_url, conditional=conditional, validators=validators)
         if not soup:
             return []
         
@@ -151,194 +3377,731 @@ class FinancialNewsScraper:
         logging.info(f"Found {len(links)} potential article links from {source_name}")
         return links
     
-    def extract_article_content(self, url):
-        """Extract article content using BeautifulSoup with robust date extraction"""
+    def fetch_feed_links(self, feed_url, date_range=None, follow_index=True, conditional=False, validators=None):
+        """
+        Read article links from an RSS/Atom feed or a news sitemap.
+        Returns (url, published, modified) tuples, or None when the feed could not be read
+        or holds no entries. With conditional=True an unchanged feed (304) returns an empty
+        list, so only polls that look past the watermark should ask for it.
+        """
+        response = self.get_response(feed_url, conditional=conditional, validators=validators)
+        if response is None:
+            return None
+        if response.status_code == 304:
+            return []
+        document = response.content
+        head = document[:2048]
         try:
-            soup = self.get_soup(url)
-            if not soup:
+            if document[:2] == b'\x1f\x8b' or b'<urlset' in head or b'<sitemapindex' in head:
+                entries, child_sitemaps = parse_sitemap(document)
+                if follow_index and child_sitemaps:
+                    # Sitemap indexes list one sitemap per period; only read those touched inside the window
+                    recent = [(url, modified) for url, modified in child_sitemaps if in_date_window(None, modified, date_range)]
+                    recent.sort(key=lambda child: child[1] or datetime.datetime.max.replace(tzinfo=timezone.utc), reverse=True)
+                    children_read = not recent
+                    for child_url, _ in recent[:self.max_child_sitemaps]:
+                        found = self.fetch_feed_links(child_url, date_range, False, conditional, validators)
+                        if found is not None:
+                            children_read = True
+                            entries.extend(found)
+                    if children_read:
+                        return entries
+            elif feedparser is not None:
+                feed = feedparser.parse(document)
+                entries = []
+                for entry in feed.entries:
+                    if not entry.get('link'):
+                        continue
+                    published = entry.get('published_parsed')
+                    modified = entry.get('updated_parsed')
+                    entries.append((
+                        entry['link'],
+                        datetime.datetime(*published[:6], tzinfo=timezone.utc) if published else None,
+                        datetime.datetime(*modified[:6], tzinfo=timezone.utc) if modified else None
+                    ))
+            else:
+                logging.warning(f"feedparser is not installed, skipping feed {feed_url}")
                 return None
-            
-            # Extract title
-            title = soup.title.text.strip() if soup.title else ''
-            
-            # Extract author (common patterns)
-            author = 'Unknown'
-            author_elements = soup.select('a[rel="author"], span.author, .byline, .author')
-            if author_elements:
-                author = author_elements[0].text.strip()
-            
-            # Extract publish date using robust parsing
-            publish_date = None
-            date_elements = soup.select('time, .date, .published, meta[property="article:published_time"]')
-            if date_elements:
-                if date_elements[0].name == 'meta':
-                    date_text = date_elements[0].get('content', '').strip()
-                else:
-                    date_text = date_elements[0].text.strip()
-                try:
-                    if 'ago' in date_text.lower():
-                        publish_date = parse_relative_time(date_text)
-                    else:
-                        publish_date = date_parser.parse(date_text)
-                    # Ensure we have UTC awareness
-                    if publish_date.tzinfo is None:
-                        publish_date = publish_date.replace(tzinfo=timezone.utc)
-                    else:
-                        publish_date = publish_date.astimezone(timezone.utc)
-                except Exception as e:
-                    logging.warning(f"Could not parse date '{date_text}' from {url}: {e}")
-                    publish_date = datetime.datetime.now(timezone.utc)
+        except (ElementTree.ParseError, OSError, EOFError) as e:
+            logging.error(f"Error parsing feed {feed_url}: {e}")
+            return None
+        return entries or None
+    
+    def discover_article_links(self, source_name, source_url, date_range=None, incremental=False, validators=None):
+        """
+        Find article links for a source from its RSS/Atom feeds and news sitemaps, dropping
+        links whose feed timestamp is outside date_range before anything is fetched.
+        Falls back to scraping the section page when none of the feeds can be read.
+        incremental, without a date range, drops entries older than the source's watermark
+        and fetches feeds and listing pages conditionally, so unchanged ones yield no links.
+        The validators of those responses go to the validators list if one is given, to be
+        saved only once the links are queued.
+        """
+        with self.metrics.time('discover', source_name):
+            return self._discover_article_links(source_name, source_url, date_range, incremental, validators)
+    
+    def _discover_article_links(self, source_name, source_url, date_range=None, incremental=False, validators=None):
+        """discover_article_links without the timing"""
+        if date_range is None and incremental:
+            # Without a date range only look past the newest article already stored for the source
+            watermark = self.get_source_watermark(source_name)
+            if watermark is not None:
+                date_range = (watermark - self.watermark_overlap, datetime.datetime.max.replace(tzinfo=timezone.utc))
+        entries = None
+        for feed_url in self.feed_urls.get(source_name, []):
+            found = self.fetch_feed_links(feed_url, date_range, conditional=incremental, validators=validators)
+            if found is not None:
+                entries = (entries or []) + found
+        if entries is None:
+            return self.extract_article_links(source_name, source_url, conditional=incremental, validators=validators)
+        
+        links, seen, out_of_range = [], set(), 0
+        for url, published, modified in entries:
+            url_key = normalize_url(url)
+            if url_key in seen:
+                continue
+            seen.add(url_key)
+            if in_date_window(published, modified, date_range):
+                links.append(url)
             else:
-                publish_date = datetime.datetime.now(timezone.utc)
-            
-            # Extract main content using common selectors
-            content_selectors = [
-                'article', '.article-body', '.article-content', '.story-body',
-                '.post-content', '.entry-content', '.content', '#content',
-                '[itemprop="articleBody"]', '.body'
-            ]
-            content_element = None
-            for selector in content_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    content_element = elements[0]
-                    break
-            if not content_element:
-                content_element = soup.body
-            paragraphs = content_element.find_all('p') if content_element else []
-            content = '\n\n'.join([p.text.strip() for p in paragraphs])
-            
-            # Simple summary: first 2 paragraphs (max 500 characters)
-            summary = '\n\n'.join([p.text.strip() for p in paragraphs[:2]])
-            if len(summary) > 500:
-                summary = summary[:497] + '...'
-            
-            # Extract keywords from meta tags if available
-            keywords = []
-            keyword_meta = soup.find('meta', attrs={'name': 'keywords'})
-            if keyword_meta:
-                keywords = [k.strip() for k in keyword_meta.get('content', '').split(',')]
-            
-            return {
-                'title': title,
-                'author': author,
-                'publish_date': publish_date,
-                'content': content,
-                'summary': summary,
-                'keywords': ','.join(keywords)
-            }
+                out_of_range += 1
+        logging.info(f"Found {len(links)} article links in feeds for {source_name}, {out_of_range} outside the date range")
+        return links
+    
+    def fetch_article_html(self, url, date_range=None):
+        """
+        Stream an article page and return its raw bytes and declared charset.
+        When date_range is given, the publish date is read from the page head as soon as
+        it arrives and the download is abandoned if the article is outside the range.
+        Pages larger than max_page_bytes are abandoned as well. Returns (None, None) when
+        the page was skipped or could not be fetched.
+        """
+        try:
+            return self._fetch_article_html(url, date_range)
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Error fetching {url}: {e}")
+            return None, None
+    
+    def _fetch_article_html(self, url, date_range=None):
+        """Like fetch_article_html, but fetch errors are raised to the caller"""
+        headers = {'User-Agent': self.get_random_user_agent()}
+        with self.http_get(url, headers=headers, stream=True) as response:
+            response.raise_for_status()
+            declared_length = response.headers.get('Content-Length')
+            if declared_length and declared_length.isdigit() and int(declared_length) > self.max_page_bytes:
+                logging.warning(f"Page too large ({declared_length} bytes), skipping: {url}")
+                return None, None
+            encoding = response.encoding if 'charset' in response.headers.get('Content-Type', '').lower() else None
+            body = bytearray()
+            date_checked = date_range is None
+            head_search_from = 0
+            download_start = time.perf_counter()
+            for chunk in response.iter_content(chunk_size=16384):
+                body.extend(chunk)
+                if len(body) > self.max_page_bytes:
+                    logging.warning(f"Page exceeded {self.max_page_bytes} bytes, skipping: {url}")
+                    return None, None
+                if not date_checked:
+                    # Only a complete head is read for a date; pages without one are left to the full extraction
+                    head_end = HEAD_END_BYTES_PATTERN.search(body, head_search_from)
+                    if head_end:
+                        date_checked = True
+                        publish_date = find_head_date(bytes(body[:head_end.start()]))
+                        if publish_date is not None:
+                            start_date, end_date = date_range
+                            if not (start_date <= publish_date <= end_date):
+                                logging.info(f"Article skipped due to date filter: {url} published on {publish_date} (read {len(body)} bytes)")
+                                return None, None
+                    elif len(body) >= self.head_probe_bytes:
+                        date_checked = True
+                    else:
+                        # A marker split across chunks is found on the next pass
+                        head_search_from = max(0, len(body) - 16)
+            self.metrics.observe('download', time.perf_counter() - download_start)
+            return bytes(body), encoding
+    
+    def extract_article_content(self, url, date_range=None):
+        """
+        Extract article content using BeautifulSoup with robust date extraction.
+        date_range lets the streaming fetch drop out-of-range articles before the body is read.
+        """
+        try:
+            html, encoding = self.fetch_article_html(url, date_range)
+            if html is None:
+                return None
+            return self.extractor.extract(self.extractor.parse(html, encoding), url, html, encoding)
         except Exception as e:
             logging.error(f"Error extracting content from {url}: {e}")
             return None
         
+    def load_known_urls(self):
+        """
+        Load the in-memory index of stored article URLs. Keys are 8-byte digests of
+        the normalized URL, so the index stays small even for a large archive.
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+        SELECT url_key FROM articles WHERE url_key IS NOT NULL
+        UNION ALL
+        SELECT url_key FROM article_duplicates WHERE url_key IS NOT NULL
+        ''')
+        self.known_urls = {url_hash(url_key) for (url_key,) in cursor}
+        conn.close()
+        logging.info(f"Loaded {len(self.known_urls)} known article URLs")
+        return len(self.known_urls)
+    
+    def load_duplicate_index(self):
+        """Load the fingerprints of articles published within duplicate_window_days"""
+        since = (datetime.datetime.now(timezone.utc) - datetime.timedelta(days=self.duplicate_window_days)).strftime('%Y-%m-%d %H:%M:%S')
+        index = NearDuplicateIndex()
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT simhash, url FROM articles WHERE simhash IS NOT NULL AND IFNULL(publish_date, retrieved_date) >= ?", (since,))
+        for fingerprint, url in cursor:
+            index.add(fingerprint & ((1 << 64) - 1), url)
+        conn.close()
+        self.duplicate_index = index
+        logging.info(f"Loaded {index.size} article fingerprints for near-duplicate detection")
+        return index.size
+    
+    def record_duplicate(self, url, source, original_url, match_type, distance=0):
+        """
+        Link a URL to the already stored copy of its story instead of storing it again.
+        original_url is stored normalized, so it always joins with articles.url_key.
+        """
+        url_key = normalize_url(url)
+        original_url = normalize_url(original_url)
+        conn = self.connect(timeout=30)
+        cursor = conn.cursor()
+        cursor.execute('''
+        INSERT OR IGNORE INTO article_duplicates (url, url_key, source, original_url, match_type, distance, detected_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (url, url_key, source, original_url, match_type, distance,
+              datetime.datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')))
+        conn.commit()
+        conn.close()
+        if self.known_urls is not None:
+            self.known_urls.add(url_hash(url_key))
+        logging.info(f"Linked duplicate {url} to {original_url} ({match_type}, distance {distance})")
+    
+    def is_known_url(self, url):
+        """
+        Check whether an article URL is already stored. With the known-URL index loaded, a
+        miss is answered from the index alone and a hit is confirmed against the articles
+        still queued in the writer and then the database, so a digest collision can never
+        hide a new article.
+        """
+        url_key = normalize_url(url)
+        if self.known_urls is not None:
+            if url_hash(url_key) not in self.known_urls:
+                return False
+            with self.writer_lock:
+                writer = self.writer
+            if writer is not None and writer.is_pending(url_key):
+                return True
+        with self.known_url_reader_lock:
+            if self.known_url_reader is None:
+                self.known_url_reader = self.connect(timeout=30, check_same_thread=False)
+            row = self.known_url_reader.execute('''
+            SELECT 1 FROM articles WHERE url_key=? OR url=?
+            UNION ALL
+            SELECT 1 FROM article_duplicates WHERE url_key=?
+            ''', (url_key, url, url_key)).fetchone()
+        return row is not None
+    
+    def filter_new_links(self, links):
+        """
+        Drop links that are already stored, in bulk, before anything is fetched.
+        Index hits are confirmed with a single query so a digest collision can never
+        hide a new article. Also removes links that normalize to the same URL.
+        """
+        if self.known_urls is None:
+            self.load_known_urls()
+        new_links = []
+        suspected = {}
+        seen = set()
+        for link in links:
+            url_key = normalize_url(link)
+            if url_key in seen:
+                continue
+            seen.add(url_key)
+            if url_hash(url_key) in self.known_urls:
+                suspected[url_key] = link
+            else:
+                new_links.append(link)
+        if suspected:
+            conn = self.connect()
+            cursor = conn.cursor()
+            keys = list(suspected)
+            confirmed = set()
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f'''
+                SELECT url_key FROM articles WHERE url_key IN ({placeholders})
+                UNION
+                SELECT url_key FROM article_duplicates WHERE url_key IN ({placeholders})
+                ''', chunk + chunk)
+                confirmed.update(row[0] for row in cursor.fetchall())
+            conn.close()
+            new_links.extend(link for url_key, link in suspected.items() if url_key not in confirmed)
+            logging.info(f"Skipping {len(confirmed)} links already in the database")
+        return new_links
+    
     def process_article(self, url, source, date_range=None):
         """
-        Process an individual article URL.
-        If date_range is provided (tuple of start and end datetime objects in UTC),
-        only save the article if its publish_date falls within the range.
+        Process an individual article URL.
+        If date_range is provided (tuple of start and end datetime objects in UTC),
+        only save the article if its publish_date falls within the range.
+        """
+        return self._process_article(url, source, date_range)[0] == 'saved'
+    
+    def _process_article(self, url, source, date_range=None):
+        """
+        Process an article URL and return (outcome, error). The outcome is 'saved',
+        'known' (already stored), 'duplicate', 'skipped' (outside the date range, too
+        large or empty) or 'failed', in which case error holds the exception.
+        """
+        outcome, error, page = self._fetch_article_stage(url, date_range, source)
+        if outcome is not None:
+            return outcome, error
+        try:
+            article_data = parse_article_page(page[0], page[1], url, self.extractor, self.categorizer)
+            return self._store_article_stage(url, source, article_data, date_range), None
+        except Exception as e:
+            logging.error(f"Error processing article {url}: {e}")
+            return 'failed', e
+    
+    def _fetch_article_stage(self, url, date_range=None, source=None):
+        """
+        Fetch stage of processing an article. Returns (None, None, (html, encoding)) for a
+        page to parse, or (outcome, error, None) when processing ends here.
+        """
+        logging.debug(f"Processing article: {url}")
+        if self.is_known_url(url):
+            logging.info(f"Article already exists in database: {url}")
+            return 'known', None, None
+        try:
+            with self.metrics.time('fetch', source):
+                html, encoding = self._fetch_article_html(url, date_range)
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Error fetching {url}: {e}")
+            return 'failed', e, None
+        except Exception as e:
+            logging.error(f"Error processing article {url}: {e}")
+            return 'failed', e, None
+        if html is None:
+            return 'skipped', None, None
+        self.metrics.count(source, 'fetched')
+        self.metrics.count(source, 'bytes', len(html))
+        if self.archive is not None:
+            try:
+                self.archive_page(url, html, encoding)
+            except (OSError, sqlite3.Error) as e:
+                logging.error(f"Error archiving page {url}: {e}")
+        return None, None, (html, encoding)
+    
+    def _store_article_stage(self, url, source, article_data, date_range=None):
+        """
+        Last stage of processing an article: filter a parsed article by date, drop it if it
+        duplicates a stored one, otherwise queue it for writing. Returns the outcome.
+        """
+        self.record_selector_stats(url, article_data.get('selector_stats'))
+        for stage, seconds in article_data.get('timings', {}).items():
+            self.metrics.observe(stage, seconds, source)
+        if article_data['publish_date'] is None:
+            # Stored without a publish date, so it stays out of the daily rollup and the watermark
+            self.metrics.count(source, 'undated')
+            if date_range is not None:
+                logging.info(f"Article skipped, no publish date found: {url}")
+                return 'skipped'
+        if date_range is not None:
+            start_date, end_date = date_range
+            if not (start_date <= article_data['publish_date'] <= end_date):
+                logging.info(f"Article skipped due to date filter: {url} published on {article_data['publish_date']}")
+                return 'skipped'
+        
+        # A page whose canonical URL is already stored is the same article under another URL
+        canonical_url = article_data.get('canonical_url')
+        if canonical_url and normalize_url(canonical_url) != normalize_url(url) and self.is_known_url(canonical_url):
+            self.record_duplicate(url, source, canonical_url, 'canonical')
+            return 'duplicate'
+        
+        fingerprint = article_data['simhash']
+        if fingerprint is not None:
+            if self.duplicate_index is None:
+                self.load_duplicate_index()
+            with self.metrics.time('dedupe'):
+                match = self.duplicate_index.find_or_add(fingerprint, url)
+            if match:
+                self.record_duplicate(url, source, match[0], 'simhash', match[1])
+                return 'duplicate'
+        
+        data = {
+            'title': article_data['title'],
+            'url': url,
+            'url_key': normalize_url(url),
+            'source': source,
+            'author': article_data['author'],
+            'publish_date': article_data['publish_date'].strftime('%Y-%m-%d %H:%M:%S') if article_data['publish_date'] else None,
+            'content': article_data['content'],
+            'summary': article_data['summary'],
+            'keywords': article_data['keywords'],
+            'retrieved_date': datetime.datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+            'category': article_data['category'],
+            'simhash': to_signed64(fingerprint) if fingerprint is not None else None
+        }
+        
+        self.get_writer().add(data)
+        if self.known_urls is not None:
+            self.known_urls.add(url_hash(data['url_key']))
+        logging.info(f"Queued article for writing: {data['title']}")
+        return 'saved'
+    
+    def get_work_queue(self):
+        """Return the work queue holding the frontier and source jobs, opening it on first use"""
+        with self.work_queue_lock:
+            if self.work_queue is None:
+                self.work_queue = RemoteWorkQueue(self.queue_url) if self.queue_url else SQLiteWorkQueue(self.db_path)
+            return self.work_queue
+    
+    def frontier_retry_policy(self):
+        """(max attempts, base delay, max delay) of failed frontier URLs, for the work queue"""
+        return (self.frontier_max_attempts, self.frontier_retry_base, self.frontier_retry_max)
+    
+    def prepare_frontier(self):
+        """
+        Get the frontier ready for a run: URLs left in flight by an interrupted run go back
+        to pending, and finished rows past frontier_retention_days are pruned. URLs leased
+        to a process that is still running (or may be, on another host) are left alone
+        until their lease runs out. Returns the number of URLs waiting from earlier runs.
+        """
+        return self.get_work_queue().prepare(self.frontier_retention_days)
+    
+    def enqueue_links(self, source, links):
+        """
+        Add discovered article links to the frontier as pending. URLs already in the frontier
+        keep their state, except skipped ones, which are looked at again when re-listed.
+        """
+        self.get_work_queue().enqueue(source, links)
+        self.metrics.count(source, 'discovered', len(links))
+    
+    def claim_frontier(self, source):
+        """
+        Mark a source's pending URLs, and failed URLs whose retry time has come, as in flight
+        and return them, oldest first
+        """
+        return [url for url, _ in self.lease_frontier(source=source)]
+    
+    def lease_frontier(self, limit=None, source=None):
+        """
+        Lease frontier URLs to this process and return them as [(url, source)], oldest first:
+        pending URLs, failed URLs whose retry time has come and in-flight URLs whose lease ran
+        out, at most limit of them and only a source's if given. They are picked and marked in
+        flight in one write transaction, so concurrent workers never lease the same URL; the
+        outcomes recorded since the last lease go in the same transaction.
+        """
+        outcomes = self.take_frontier_outcomes()
+        try:
+            items = self.get_work_queue().lease(self.worker_id, self.lease_seconds, limit, source,
+                                                outcomes, self.frontier_retry_policy())
+        except WORK_QUEUE_ERRORS:
+            self.return_frontier_outcomes(outcomes)
+            raise
+        if items:
+            self.start_lease_keeper()
+        return items
+    
+    def start_lease_keeper(self):
+        """Start the thread that renews this process's leases every third of lease_seconds, once"""
+        with self.lease_lock:
+            if self.lease_keeper is None:
+                self.lease_keeper = threading.Thread(target=self._keep_leases, daemon=True)
+                self.lease_keeper.start()
+    
+    def _keep_leases(self):
+        while not self.lease_keeper_stop.wait(self.lease_seconds / 3):
+            try:
+                self.renew_leases()
+            except WORK_QUEUE_ERRORS as e:
+                logging.error(f"Error renewing frontier leases: {e}")
+    
+    def renew_leases(self):
+        """Extend the leases of this process's in-flight URLs and source jobs by lease_seconds"""
+        return self.get_work_queue().renew(self.worker_id, self.lease_seconds)
+    
+    def release_leases(self):
+        """
+        Record the outcomes still buffered, then hand this process's unfinished URLs and source
+        jobs back to the queue, e.g. when it stops
+        """
+        self.flush_frontier_outcomes()
+        released = self.get_work_queue().release(self.worker_id)
+        if released:
+            logging.info(f"Returned {released} unfinished URLs to the frontier")
+        return released
+    
+    def lease_source_job(self, sources):
+        """
+        Lease the source that has been due for a poll the longest, among the given names, to
+        this process and return its name, or None if none is due. Sources not polled by any
+        worker yet are due at once.
+        """
+        name = self.get_work_queue().lease_source(self.worker_id, self.lease_seconds, list(sources))
+        if name is not None:
+            self.start_lease_keeper()
+        return name
+    
+    def finish_source_job(self, source, error=None):
+        """Release a polled source's lease and schedule its next poll after its poll interval"""
+        self.get_work_queue().finish_source(self.worker_id, source,
+                                            self.poll_intervals.get(source, self.default_poll_interval), error)
+    
+    def finish_frontier(self, url, outcome, error=None):
+        """
+        Record the outcome of processing a frontier URL. Saved articles are marked done once
+        they are written, so a crash before the write leaves them in flight to be retried.
+        Failures are retried with exponential backoff, except client errors such as 404, and
+        are given up after frontier_max_attempts. Outcomes are buffered and recorded with the
+        next lease, or once worker_batch_size of them are waiting; nothing is recorded if the
+        URL's lease has passed to another process in the meantime.
+        """
+        if outcome == 'saved':
+            return
+        if outcome == 'failed':
+            response = getattr(error, 'response', None)
+            status = response.status_code if response is not None else None
+            permanent = status is not None and 400 <= status < 500 and status not in (408, 429)
+            record = (normalize_url(url), 'failed', str(error), permanent)
+        else:
+            record = (normalize_url(url), 'skipped' if outcome == 'skipped' else 'done', None, False)
+        with self.frontier_outcomes_lock:
+            self.frontier_outcomes.append(record)
+            full = len(self.frontier_outcomes) >= self.worker_batch_size
+        if full:
+            self.flush_frontier_outcomes()
+    
+    def record_written(self, url_keys):
+        """
+        Called by the article writer with the URL keys of each batch it wrote: mark them done
+        in a remote queue, whose database the articles trigger cannot reach. Recorded with the
+        next lease, so the writer never waits on the network.
         """
-        logging.debug(f"Processing article: {url}")
-        conn = sqlite3.connect(self.db_path)
+        with self.frontier_outcomes_lock:
+            self.frontier_outcomes.extend((url_key, 'done', None, False) for url_key in url_keys)
+    
+    def take_frontier_outcomes(self):
+        with self.frontier_outcomes_lock:
+            outcomes, self.frontier_outcomes = self.frontier_outcomes, []
+        return outcomes
+    
+    def return_frontier_outcomes(self, outcomes):
+        """Put outcomes that could not be recorded back in front of the buffer, to try again"""
+        with self.frontier_outcomes_lock:
+            self.frontier_outcomes[:0] = outcomes
+    
+    def flush_frontier_outcomes(self):
+        """Record the buffered frontier outcomes in one write transaction"""
+        outcomes = self.take_frontier_outcomes()
+        if not outcomes:
+            return
+        try:
+            with self.metrics.time('frontier_update'):
+                self.get_work_queue().finish(self.worker_id, outcomes, self.frontier_retry_policy())
+        except WORK_QUEUE_ERRORS as e:
+            logging.error(f"Error recording {len(outcomes)} frontier outcomes: {e}")
+            self.return_frontier_outcomes(outcomes)
+    
+    def process_frontier_link(self, url, source, date_range=None):
+        """Process a URL claimed from the frontier and record its outcome. Returns True if it was saved."""
+        outcome, error = self._process_article(url, source, date_range)
+        return self.complete_frontier_link(url, outcome, error, source)
+    
+    def complete_frontier_link(self, url, outcome, error=None, source=None):
+        """Record the outcome of a frontier URL, returning True if it was saved"""
+        self.metrics.count(source, outcome)
+        self.finish_frontier(url, outcome, error)
+        return outcome == 'saved'
+    
+    def get_source_watermark(self, source):
+        """
+        Return the newest publish date stored for a source as a UTC datetime, or None. Stored
+        dates are clamped to their retrieval time, and the result to now.
+        """
+        conn = self.connect()
         cursor = conn.cursor()
-        cursor.execute("SELECT id FROM articles WHERE url=?", (url,))
-        if cursor.fetchone():
-            logging.info(f"Article already exists in database: {url}")
-            conn.close()
-            return False
-        
+        cursor.execute("SELECT newest_publish_date FROM source_watermarks WHERE source=?", (source,))
+        row = cursor.fetchone()
+        conn.close()
+        if not row:
+            return None
         try:
-            article_data = self.extract_article_content(url)
-            if not article_data:
-                conn.close()
-                return False
-            
-            if date_range is not None:
-                start_date, end_date = date_range
-                if not (start_date <= article_data['publish_date'] <= end_date):
-                    logging.info(f"Article skipped due to date filter: {url} published on {article_data['publish_date']}")
-                    conn.close()
-                    return False
-            
-            data = {
-                'title': article_data['title'],
-                'url': url,
-                'source': source,
-                'author': article_data['author'],
-                'publish_date': article_data['publish_date'].strftime('%Y-%m-%d %H:%M:%S'),
-                'content': article_data['content'],
-                'summary': article_data['summary'],
-                'keywords': article_data['keywords'],
-                'retrieved_date': datetime.datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
-                'category': self.categorize_article(article_data['content'], article_data['title'])
-            }
-            
-            cursor.execute('''
-            INSERT INTO articles (title, url, source, author, publish_date, content, summary, keywords, retrieved_date, category)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                data['title'], data['url'], data['source'], data['author'], data['publish_date'],
-                data['content'], data['summary'], data['keywords'], data['retrieved_date'], data['category']
-            ))
-            
-            conn.commit()
-            logging.info(f"Successfully saved article: {data['title']}")
-            conn.close()
-            return True
-            
-        except Exception as e:
-            logging.error(f"Error processing article {url}: {e}")
-            conn.close()
-            return False
+            watermark = datetime.datetime.strptime(row[0][:19], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+        except ValueError:
+            return None
+        return min(watermark, datetime.datetime.now(timezone.utc))
     
     def categorize_article(self, content, title):
         """Simple categorization of article content"""
-        categories = {
-            'stocks': ['stock', 'stocks', 'equities', 'nasdaq', 'dow jones', 'nyse', 's&p'],
-            'cryptocurrency': ['bitcoin', 'ethereum', 'crypto', 'blockchain', 'token', 'cryptocurrency'],
-            'economy': ['economy', 'gdp', 'inflation', 'recession', 'economic growth', 'fed', 'federal reserve'],
-            'markets': ['market', 'trading', 'trader', 'bulls', 'bears', 'rally', 'correction'],
-            'business': ['company', 'earnings', 'revenue', 'profit', 'ceo', 'startup', 'merger', 'acquisition'],
-            'personal_finance': ['investing', 'retirement', 'mortgage', 'loan', 'credit', 'debt', 'saving'],
-            'real_estate': ['housing', 'real estate', 'property', 'mortgage', 'commercial real estate']
-        }
-        full_text = (title + " " + content).lower()
-        category_scores = {}
-        for category, keywords in categories.items():
-            score = sum(1 for keyword in keywords if keyword.lower() in full_text)
-            if score > 0:
-                category_scores[category] = score
-        return max(category_scores, key=category_scores.get) if category_scores else 'general'
+        return self.categorizer.categorize(content, title)
     
-    def scrape_by_date_range(self, start_date_str=None, end_date_str=None):
-        """Scrape articles with date range filtering (default last 7 days) using UTC."""
+    def recategorize_articles(self, batch_size=500):
+        """
+        Re-run categorization over every stored article, e.g. after a taxonomy change.
+        Rows are streamed in id order in batches and only changed categories are written.
+        Returns the number of articles whose category changed.
+        """
+        conn = self.connect(timeout=30)
+        cursor = conn.cursor()
+        last_id = 0
+        scanned = 0
+        changed = 0
+        while True:
+            cursor.execute('''
+            SELECT id, title, content, body, category
+            FROM articles_full
+            WHERE id > ?
+            ORDER BY id
+            LIMIT ?
+            ''', (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            updates = []
+            for id, title, content, body, category in rows:
+                new_category = self.categorize_article(article_content(content, body) or '', title or '')
+                if new_category != category:
+                    updates.append((new_category, id))
+            if updates:
+                cursor.executemany("UPDATE articles SET category=? WHERE id=?", updates)
+                conn.commit()
+            last_id = rows[-1][0]
+            scanned += len(rows)
+            changed += len(updates)
+            sys.stdout.write(f"\rRe-categorized {scanned} articles | Changed: {changed}    ")
+            sys.stdout.flush()
+        conn.close()
+        print()
+        logging.info(f"Re-categorization completed. {changed} of {scanned} articles changed category.")
+        return changed
+
+    def scrape_sources(self, date_range=None, profile_path=None, sources=None):
+        """
+        Scrape every source in self.news_sources (or the sources dict given) and return
+        the number of new articles. Uses the concurrent crawler unless max_workers is 1.
+        With profile_path, the run is sampled by a SamplingProfiler and its collapsed
+        stacks are written there.
+        """
+        self.load_known_urls()
+        self.load_duplicate_index()
+        waiting = self.prepare_frontier()
+        if waiting:
+            print(f"Resuming {waiting} article URLs left from an earlier run")
+        profiler = SamplingProfiler().start() if profile_path else None
+        try:
+            return self.crawl_sources(date_range, sources)
+        finally:
+            # Make every article from this run visible before the analysis reads it
+            self.get_writer().flush()
+            self.save_extraction_stats()
+            if profiler is not None:
+                profiler.stop()
+                profiler.write(profile_path)
+                print(f"\nProfile of {profiler.samples} samples written to {profile_path}; most sampled functions:")
+                for function, share in profiler.top(10):
+                    print(f"  {share * 100:5.1f}%  {function}")
+            self.report_metrics()
+
+    def report_metrics(self):
+        """Print where the time went so far and write the metrics snapshot, if one is configured"""
+        lines = self.metrics.summary()
+        if lines:
+            print("\nTime by stage:")
+            for line in lines:
+                print(f"  {line}")
+        if self.metrics_path:
+            try:
+                self.metrics.write_snapshot(self.metrics_path)
+            except OSError as e:
+                logging.error(f"Error writing metrics snapshot {self.metrics_path}: {e}")
+
+    def crawl_sources(self, date_range=None, sources=None, incremental=False, quiet=False):
+        """
+        Discover and process new links of the given sources (default: all news_sources)
+        with the URL indexes and frontier as they are, returning the number of new articles.
+        incremental only looks at feed entries past each source's watermark, for polling.
+        quiet leaves the progress lines out of stdout.
+        """
+        sources = self.news_sources if sources is None else sources
+        try:
+            if self.max_workers > 1:
+                return self._scrape_sources_concurrently(date_range, sources, incremental, quiet)
+            return self._scrape_sources_serially(date_range, sources, incremental, quiet)
+        finally:
+            self.flush_frontier_outcomes()
+
+    def open_parse_pipeline(self):
+        """
+        Start a ParsePipeline of parse_workers processes. Each page is submitted with a context
+        of (on_parsed, source), so one pipeline can serve any number of crawls.
+        """
+        return ParsePipeline(lambda url, article_data, error, context: context[0](url, article_data, error, context[1]),
+                             self.parse_workers, self.parse_queue_size, self.html_parser,
+                             self.categorizer.taxonomy, self.extractor.profile_state())
+
+    def request_stop(self):
+        """Ask a running crawl or daemon to stop; links already being fetched are finished"""
+        self.stop_requested.set()
+
+    def install_stop_handlers(self):
+        """
+        Make SIGTERM and SIGINT call request_stop(), and a second signal raise KeyboardInterrupt.
+        Returns the previous handlers for restore_signal_handlers(); only the main thread can do this.
+        """
+        def handle_signal(signum, frame):
+            if self.stop_requested.is_set():
+                raise KeyboardInterrupt
+            logging.info(f"Received signal {signum}, stopping after the fetches in flight")
+            self.request_stop()
+
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                previous_handlers[signum] = signal.signal(signum, handle_signal)
+        return previous_handlers
+
+    @staticmethod
+    def restore_signal_handlers(previous_handlers):
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+
+    def _scrape_sources_serially(self, date_range, sources, incremental=False, quiet=False):
+        """Scrape sources one after another, one article at a time"""
         total_new_articles = 0
-        if not end_date_str:
-            end_date = datetime.datetime.now(timezone.utc)
-        else:
-            end_date = datetime.datetime.strptime(end_date_str, '%Y-%m-%d').replace(tzinfo=timezone.utc)
-            end_date = end_date.replace(hour=23, minute=59, second=59)
-        if not start_date_str:
-            start_date = datetime.datetime.now(timezone.utc) - datetime.timedelta(days=7)
-        else:
-            start_date = datetime.datetime.strptime(start_date_str, '%Y-%m-%d').replace(tzinfo=timezone.utc)
-        date_range = (start_date, end_date)
-        logging.info(f"Scraping articles from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
-        print(f"Scraping articles from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
-        
-        all_sources = list(self.news_sources.items())
+        all_sources = list(sources.items())
         total_sources = len(all_sources)
         for source_idx, (source_name, source_url) in enumerate(all_sources):
+            if self.stop_requested.is_set():
+                break
             try:
                 logging.info(f"Scraping source: {source_name}")
-                print(f"Scraping source: {source_name} ({total_sources - source_idx - 1} sources remaining)")
-                links = self.extract_article_links(source_name, source_url)
+                print_progress(f"Scraping source: {source_name} ({total_sources - source_idx - 1} sources remaining)", quiet)
+                validators = []
+                self.enqueue_links(source_name, self.filter_new_links(
+                    self.discover_article_links(source_name, source_url, date_range, incremental, validators)))
+                self.save_validators(validators)
+                links = self.claim_frontier(source_name)
                 if links:
                     total_links = len(links)
-                    print(f"Found {total_links} articles from {source_name}")
+                    print_progress(f"Found {total_links} articles from {source_name}", quiet)
                     start_time = time.time()
                     new_added = 0
                     for idx, link in enumerate(links):
-                        if self.process_article(link, source_name, date_range=date_range):
+                        if self.stop_requested.is_set():
+                            # Claimed links left in flight go back to pending on the next run
+                            break
+                        if self.process_frontier_link(link, source_name, date_range=date_range):
                             total_new_articles += 1
                             new_added += 1
                         processed = idx + 1
@@ -350,55 +4113,374 @@ class FinancialNewsScraper:
                             mins = int(eta // 60)
                             secs = int(eta % 60)
                             progress_msg = f"\rProgress: {processed}/{total_links} articles | ETA: {mins}m {secs}s | New articles: {new_added}    "
-                            sys.stdout.write(progress_msg)
-                            sys.stdout.flush()
-                        time.sleep(random.uniform(0.5, 1.5))
-                    print(f"\nCompleted {source_name}: Added {new_added} new articles")
+                            print_progress(progress_msg, quiet, end='')
+                    print_progress(f"\nCompleted {source_name}: Added {new_added} new articles", quiet)
             except Exception as e:
                 logging.error(f"Error scraping {source_name}: {e}")
-                print(f"Error scraping {source_name}: {e}")
+                print_progress(f"Error scraping {source_name}: {e}", quiet)
+        return total_new_articles
+
+    def _scrape_sources_concurrently(self, date_range, sources, incremental=False, quiet=False):
+        """
+        Scrape all sources in parallel. Listing pages are fetched by a small pool,
+        and their links are fanned out to per-host lanes so that at most
+        per_host_limit fetches hit one host and at most max_workers run overall.
+        With parse_workers set, fetched pages go through a ParsePipeline (parse_pipeline
+        if one is open, else one for this crawl) and the lanes move on to their next
+        fetch while the page is parsed.
+        """
+        fetch_slots = threading.BoundedSemaphore(self.max_workers)
+        progress_lock = threading.Lock()
+        progress = {'processed': 0, 'total': 0, 'new': 0}
+        remaining_by_source = Counter()
+        new_by_source = Counter()
+        start_time = time.time()
+
+        def record_outcome(source_name, saved):
+            with progress_lock:
+                progress['processed'] += 1
+                remaining_by_source[source_name] -= 1
+                if saved:
+                    progress['new'] += 1
+                    new_by_source[source_name] += 1
+                processed = progress['processed']
+                if processed > 1:
+                    avg_time = (time.time() - start_time) / processed
+                    eta = (progress['total'] - processed) * avg_time
+                    progress_msg = f"\rProgress: {processed}/{progress['total']} articles | ETA: {int(eta // 60)}m {int(eta % 60)}s | New articles: {progress['new']}    "
+                    print_progress(progress_msg, quiet, end='')
+                if remaining_by_source[source_name] == 0:
+                    print_progress(f"\nCompleted {source_name}: Added {new_by_source[source_name]} new articles", quiet)
+
+        def store_parsed(link, article_data, error, source_name):
+            # Runs on the pipeline's consumer thread, the only thread storing parsed articles
+            if error is not None:
+                logging.error(f"Error processing article {link}: {error}")
+                outcome = 'failed'
+            else:
+                try:
+                    outcome = self._store_article_stage(link, source_name, article_data, date_range)
+                except Exception as e:
+                    logging.error(f"Error processing article {link}: {e}")
+                    outcome, error = 'failed', e
+            record_outcome(source_name, self.complete_frontier_link(link, outcome, error, source_name))
+
+        pipeline = self.parse_pipeline
+        own_pipeline = pipeline is None and self.parse_workers > 0
+        if own_pipeline:
+            pipeline = self.open_parse_pipeline()
+
+        def crawl_link(item):
+            link, source_name = item
+            if self.stop_requested.is_set():
+                # Claimed links left in flight go back to pending on the next run
+                return
+            # Wait for the host's rate limiter before taking one of the shared fetch slots
+            self.rate_limiter.wait_ready(urlsplit(link).netloc.lower())
+            if pipeline is None:
+                with fetch_slots:
+                    saved = self.process_frontier_link(link, source_name, date_range=date_range)
+                record_outcome(source_name, saved)
+            else:
+                with fetch_slots:
+                    outcome, error, page = self._fetch_article_stage(link, date_range, source_name)
+                if outcome is None:
+                    # Blocks while the parsers are behind, holding this host lane but not a fetch slot
+                    pipeline.submit(page[0], page[1], link, (store_parsed, source_name))
+                else:
+                    record_outcome(source_name, self.complete_frontier_link(link, outcome, error, source_name))
+
+        work_queue = HostWorkQueue(crawl_link, per_host_limit=self.per_host_limit)
+        print_progress(f"Scraping {len(sources)} sources with up to {self.max_workers} concurrent fetches", quiet)
+        try:
+            with ThreadPoolExecutor(max_workers=self.source_workers) as listing_pool:
+                # Validators are saved only after a source's links are queued, so a crash in between refetches them
+                validators = {source_name: [] for source_name in sources}
+                listing_futures = {
+                    listing_pool.submit(self.discover_article_links, source_name, source_url, date_range, incremental,
+                                        validators[source_name]): source_name
+                    for source_name, source_url in sources.items()
+                }
+                for future in as_completed(listing_futures):
+                    source_name = listing_futures[future]
+                    try:
+                        self.enqueue_links(source_name, self.filter_new_links(future.result()))
+                        self.save_validators(validators[source_name])
+                    except Exception as e:
+                        logging.error(f"Error scraping {source_name}: {e}")
+                        print_progress(f"Error scraping {source_name}: {e}", quiet)
+                    # URLs left over from earlier runs are claimed even when the listing failed
+                    links = self.claim_frontier(source_name)
+                    if not links:
+                        continue
+                    print_progress(f"\nFound {len(links)} articles from {source_name}", quiet)
+                    links_by_host = {}
+                    for link in links:
+                        links_by_host.setdefault(urlparse(link).netloc, []).append((link, source_name))
+                    with progress_lock:
+                        progress['total'] += len(links)
+                        remaining_by_source[source_name] += len(links)
+                    for host, items in links_by_host.items():
+                        work_queue.add(host, items)
+            work_queue.join()
+        finally:
+            if own_pipeline:
+                pipeline.close()
+            elif pipeline is not None:
+                pipeline.wait()
+        return progress['new']
+
+    def scrape_by_date_range(self, start_date_str=None, end_date_str=None):
+        """Scrape articles with date range filtering (default last 7 days) using UTC."""
+        if not end_date_str:
+            end_date = datetime.datetime.now(timezone.utc)
+        else:
+            end_date = datetime.datetime.strptime(end_date_str, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+            end_date = end_date.replace(hour=23, minute=59, second=59)
+        if not start_date_str:
+            start_date = datetime.datetime.now(timezone.utc) - datetime.timedelta(days=7)
+        else:
+            start_date = datetime.datetime.strptime(start_date_str, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        date_range = (start_date, end_date)
+        logging.info(f"Scraping articles from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
+        print(f"Scraping articles from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
+        
+        total_new_articles = self.scrape_sources(date_range)
         logging.info(f"Scraping completed. Added {total_new_articles} new articles.")
         self.analyze_articles_by_date_range(start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
         return total_new_articles
     
     def scrape_all_articles(self):
         """Scrape articles from all defined news sources without date filtering."""
-        total_new_articles = 0
-        all_sources = list(self.news_sources.items())
-        total_sources = len(all_sources)
-        for source_idx, (source_name, source_url) in enumerate(all_sources):
-            try:
-                logging.info(f"Scraping source: {source_name} (all articles)")
-                print(f"Scraping source: {source_name} ({total_sources - source_idx - 1} sources remaining)")
-                links = self.extract_article_links(source_name, source_url)
-                if links:
-                    total_links = len(links)
-                    print(f"Found {total_links} articles from {source_name}")
-                    start_time = time.time()
-                    new_added = 0
-                    for idx, link in enumerate(links):
-                        if self.process_article(link, source_name, date_range=None):
-                            total_new_articles += 1
-                            new_added += 1
-                        processed = idx + 1
-                        if processed > 1:
-                            elapsed_time = time.time() - start_time
-                            avg_time = elapsed_time / processed
-                            remaining = total_links - processed
-                            eta = remaining * avg_time
-                            mins = int(eta // 60)
-                            secs = int(eta % 60)
-                            progress_msg = f"\rProgress: {processed}/{total_links} articles | ETA: {mins}m {secs}s | New articles: {new_added}    "
-                            sys.stdout.write(progress_msg)
-                            sys.stdout.flush()
-                        time.sleep(random.uniform(0.5, 1.5))
-                    print(f"\nCompleted {source_name}: Added {new_added} new articles")
-            except Exception as e:
-                logging.error(f"Error scraping {source_name}: {e}")
-                print(f"Error scraping {source_name}: {e}")
+        logging.info("Scraping all sources (all articles)")
+        total_new_articles = self.scrape_sources(date_range=None)
         logging.info(f"Full scraping completed. Added {total_new_articles} new articles.")
         return total_new_articles
     
+    def run_daemon(self, status_path='scraper_status.json', sources=None):
+        """
+        Poll sources until SIGTERM/SIGINT or request_stop(). Each source is polled every
+        poll_intervals[source] seconds (default_poll_interval if not listed); a poll only
+        fetches links that are new since the last one, thanks to conditional feed requests,
+        the stored URL index and the source watermark. Sources that fall due together are
+        crawled in one batch. status_path gets a JSON health/status file with a heartbeat
+        every few seconds. A signal lets the batch in progress finish its fetches in flight
+        and returns; a second one exits at once.
+        """
+        sources = dict(self.news_sources if sources is None else sources)
+        status = {
+            'pid': os.getpid(),
+            'state': 'starting',
+            'started': datetime.datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+            'polls': 0,
+            'new_articles': 0,
+            'sources': {name: {'interval': self.poll_intervals.get(name, self.default_poll_interval),
+                               'last_poll': None, 'next_poll': None, 'last_new': 0, 'new_articles': 0, 'last_error': None}
+                        for name in sources},
+        }
+
+        def save_status(state=None):
+            if state:
+                status['state'] = state
+            status['updated'] = datetime.datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+            status['counters'] = self.metrics.snapshot()['sources']
+            if status_path:
+                try:
+                    write_json_atomically(status_path, status)
+                except OSError as e:
+                    logging.error(f"Error writing status file {status_path}: {e}")
+
+        previous_handlers = self.install_stop_handlers()
+        self.stop_requested.clear()
+        try:
+            self.load_known_urls()
+            self.load_duplicate_index()
+            self.prepare_frontier()
+            if self.parse_workers > 0 and self.max_workers > 1:
+                # Started once: spawning parser processes on every poll would cost more than the poll
+                self.parse_pipeline = self.open_parse_pipeline()
+            # Spread the first polls a little so the sources do not all start in the same batch
+            next_poll = {name: time.time() + i * 2 for i, name in enumerate(sources)}
+            logging.info(f"Polling {len(sources)} sources, status in {status_path}")
+            save_status('running')
+            while not self.stop_requested.is_set():
+                now = time.time()
+                due = {name: url for name, url in sources.items() if next_poll[name] <= now}
+                if not due:
+                    self.stop_requested.wait(min(5.0, max(0.0, min(next_poll.values()) - now)))
+                    save_status()
+                    continue
+                before = {name: self.metrics.snapshot()['sources'].get(name, {}).get('saved', 0) for name in due}
+                try:
+                    # The progress lines are for the interactive menu; the log and status file cover polling
+                    new_articles = self.crawl_sources(None, due, incremental=True, quiet=True)
+                    self.get_writer().flush()
+                    self.save_extraction_stats()
+                    error = None
+                except Exception as e:
+                    logging.error(f"Error polling {', '.join(due)}: {e}")
+                    new_articles, error = 0, str(e)
+                counters = self.metrics.snapshot()['sources']
+                finished = time.time()
+                status['polls'] += 1
+                status['new_articles'] += new_articles
+                for name in due:
+                    source_status = status['sources'][name]
+                    interval = source_status['interval']
+                    next_poll[name] = max(now + interval, finished + 1)
+                    source_status['last_poll'] = datetime.datetime.fromtimestamp(now, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+                    source_status['next_poll'] = datetime.datetime.fromtimestamp(next_poll[name], timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+                    source_status['last_new'] = counters.get(name, {}).get('saved', 0) - before[name]
+                    source_status['new_articles'] += source_status['last_new']
+                    source_status['last_error'] = error
+                logging.info(f"Polled {', '.join(due)} in {finished - now:.1f}s: {new_articles} new articles")
+                save_status()
+            save_status('stopping')
+        finally:
+            self.restore_signal_handlers(previous_handlers)
+            if self.parse_pipeline is not None:
+                self.parse_pipeline.close()
+                self.parse_pipeline = None
+            if self.writer is not None:
+                self.writer.flush()
+            save_status('stopped')
+            logging.info("Polling stopped")
+        return status['new_articles']
+    
+    def run_worker(self, sources=None, date_range=None, status_path=None, idle_exit=None):
+        """
+        Crawl from the work queue until SIGTERM/SIGINT, request_stop() or, with idle_exit, that
+        many seconds without work. Any number of workers can run at once: as processes on this
+        machine sharing the queue in the database, and on other hosts through the same queue
+        served with SQLiteWorkQueue.serve() (queue_url), each storing articles in its own
+        database; the WAL database itself cannot be shared over a network filesystem. Each one
+        leases due sources from source_jobs to discover their links, so every source is polled
+        on its poll interval by one worker at a time, and leases frontier URLs worker_batch_size
+        at a time to fetch, recording the outcomes of the last batch in the same transaction.
+        Leases are renewed while the worker runs and handed out again once they run out, so the
+        work of a worker that dies is picked up by the others. Every URL is fetched to completion
+        by one worker, as only a URL's lease holder records its outcome. Rate limits are per
+        worker. Returns the number of new articles this worker saved.
+        """
+        sources = dict(self.news_sources if sources is None else sources)
+        status = {
+            'pid': os.getpid(),
+            'worker_id': self.worker_id,
+            'state': 'starting',
+            'started': datetime.datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+            'polls': 0,
+            'new_articles': 0,
+            'in_flight': 0,
+        }
+        fetch_slots = threading.BoundedSemaphore(self.max_workers)
+        progress_lock = threading.Lock()
+        progress = {'in_flight': 0, 'new': 0}
+        finished_link = threading.Event()
+
+        def save_status(state=None):
+            if state:
+                status['state'] = state
+            status['updated'] = datetime.datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+            status['new_articles'] = progress['new']
+            status['in_flight'] = progress['in_flight']
+            status['counters'] = self.metrics.snapshot()['sources']
+            if status_path:
+                try:
+                    write_json_atomically(status_path, status)
+                except OSError as e:
+                    logging.error(f"Error writing status file {status_path}: {e}")
+
+        def crawl_link(item):
+            link, source_name = item
+            saved = False
+            try:
+                # Leased links left when stopping are handed back by release_leases()
+                if not self.stop_requested.is_set():
+                    self.rate_limiter.wait_ready(urlsplit(link).netloc.lower())
+                    with fetch_slots:
+                        saved = self.process_frontier_link(link, source_name, date_range=date_range)
+            finally:
+                with progress_lock:
+                    progress['in_flight'] -= 1
+                    progress['new'] += saved
+                finished_link.set()
+
+        previous_handlers = self.install_stop_handlers()
+        self.stop_requested.clear()
+        work_queue = HostWorkQueue(crawl_link, per_host_limit=self.per_host_limit)
+        try:
+            self.load_known_urls()
+            self.load_duplicate_index()
+            self.prepare_frontier()
+            indexes_loaded = next_source_check = last_status = idle_since = time.time()
+            logging.info(f"Worker {self.worker_id} taking work for {len(sources)} sources")
+            save_status('running')
+            while not self.stop_requested.is_set():
+                now = time.time()
+                worked = False
+                if now - indexes_loaded >= self.index_refresh_interval:
+                    # Pick up what the other workers stored since
+                    self.load_known_urls()
+                    self.load_duplicate_index()
+                    indexes_loaded = now
+                if sources and now >= next_source_check:
+                    source_name = self.lease_source_job(sources)
+                    if source_name is None:
+                        next_source_check = now + 1.0
+                    else:
+                        error = None
+                        try:
+                            validators = []
+                            links = self.discover_article_links(source_name, sources[source_name], date_range,
+                                                                incremental=True, validators=validators)
+                            self.enqueue_links(source_name, self.filter_new_links(links))
+                            self.save_validators(validators)
+                        except Exception as e:
+                            logging.error(f"Error polling {source_name}: {e}")
+                            error = str(e)
+                        self.finish_source_job(source_name, error)
+                        status['polls'] += 1
+                        worked = True
+                with progress_lock:
+                    room = self.worker_batch_size - progress['in_flight']
+                # Top up once half the batch is done, so the fetch lanes never run dry
+                if room >= max(1, self.worker_batch_size // 2):
+                    items = self.lease_frontier(room)
+                    if items:
+                        with progress_lock:
+                            progress['in_flight'] += len(items)
+                        items_by_host = {}
+                        for item in items:
+                            items_by_host.setdefault(urlparse(item[0]).netloc, []).append(item)
+                        for host, host_items in items_by_host.items():
+                            work_queue.add(host, host_items)
+                        worked = True
+                if worked or progress['in_flight']:
+                    idle_since = now
+                elif idle_exit is not None and now - idle_since >= idle_exit:
+                    logging.info(f"No work for {idle_exit}s, worker stopping")
+                    break
+                if now - last_status >= 5:
+                    save_status()
+                    last_status = now
+                if not worked:
+                    finished_link.wait(0.5)
+                    finished_link.clear()
+            save_status('stopping')
+        finally:
+            self.restore_signal_handlers(previous_handlers)
+            work_queue.join()
+            if self.writer is not None:
+                self.writer.flush()
+            try:
+                self.release_leases()
+            except WORK_QUEUE_ERRORS as e:
+                logging.error(f"Error releasing frontier leases: {e}")
+            self.save_extraction_stats()
+            save_status('stopped')
+            logging.info(f"Worker stopped after saving {progress['new']} new articles")
+        return progress['new']
+    
     def analyze_articles_by_date_range(self, start_date, end_date):
         """
         Analyze articles collected within a date range: count articles by source,
@@ -409,38 +4491,44 @@ class FinancialNewsScraper:
         end_dt = end_dt.replace(hour=23, minute=59, second=59)
         start_date_str = start_dt.strftime('%Y-%m-%d %H:%M:%S')
         end_date_str = end_dt.strftime('%Y-%m-%d %H:%M:%S')
-        conn = sqlite3.connect(self.db_path)
+        start_day = start_dt.strftime('%Y-%m-%d')
+        end_day = end_dt.strftime('%Y-%m-%d')
+        conn = self.connect()
         cursor = conn.cursor()
+        # Counts come from the daily rollup, which covers whole days just like this date range
         cursor.execute('''
-        SELECT source, COUNT(*) as article_count
-        FROM articles
-        WHERE publish_date >= ? AND publish_date <= ?
+        SELECT NULLIF(source, ''), SUM(article_count) as article_count
+        FROM daily_rollup
+        WHERE day >= ? AND day <= ?
         GROUP BY source
+        HAVING SUM(article_count) > 0
         ORDER BY article_count DESC
-        ''', (start_date_str, end_date_str))
+        ''', (start_day, end_day))
         source_counts = cursor.fetchall()
         cursor.execute('''
         SELECT id, title, url, source
         FROM articles
         WHERE publish_date >= ? AND publish_date <= ?
-        AND (content IS NULL OR LENGTH(content) < 500)
+        AND IFNULL(content_length, 0) < 500
         ''', (start_date_str, end_date_str))
         articles_with_missing_content = cursor.fetchall()
         cursor.execute('''
-        SELECT DATE(publish_date) as pub_date, COUNT(*) as daily_count
-        FROM articles
-        WHERE publish_date >= ? AND publish_date <= ?
-        GROUP BY pub_date
-        ORDER BY pub_date
-        ''', (start_date_str, end_date_str))
+        SELECT day as pub_date, SUM(article_count) as daily_count
+        FROM daily_rollup
+        WHERE day >= ? AND day <= ?
+        GROUP BY day
+        HAVING SUM(article_count) > 0
+        ORDER BY day
+        ''', (start_day, end_day))
         daily_distribution = cursor.fetchall()
         cursor.execute('''
-        SELECT category, COUNT(*) as category_count
-        FROM articles
-        WHERE publish_date >= ? AND publish_date <= ?
+        SELECT NULLIF(category, ''), SUM(article_count) as category_count
+        FROM daily_rollup
+        WHERE day >= ? AND day <= ?
         GROUP BY category
+        HAVING SUM(article_count) > 0
         ORDER BY category_count DESC
-        ''', (start_date_str, end_date_str))
+        ''', (start_day, end_day))
         category_distribution = cursor.fetchall()
         daily_counts = {day: count for day, count in daily_distribution}
         date_range = []
@@ -508,36 +4596,27 @@ class FinancialNewsScraper:
             start_date = end_date - datetime.timedelta(days=7)
         else:
             start_date = datetime.datetime.strptime(start_date, '%Y-%m-%d').replace(tzinfo=timezone.utc)
-        start_date_str = start_date.strftime('%Y-%m-%d %H:%M:%S')
-        end_date_str = end_date.strftime('%Y-%m-%d %H:%M:%S')
-        conn = sqlite3.connect(self.db_path)
+        # The daily rollup is read in whole days, from the start date's day to the end date's day
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute('''
-        SELECT COUNT(*) FROM articles
-        WHERE publish_date >= ? AND publish_date <= ?
-        ''', (start_date_str, end_date_str))
-        total_articles = cursor.fetchone()[0]
-        cursor.execute('''
-        SELECT source, COUNT(*) as article_count
-        FROM articles
-        WHERE publish_date >= ? AND publish_date <= ?
+        SELECT NULLIF(source, ''), SUM(article_count) as article_count, SUM(very_short_content_count)
+        FROM daily_rollup
+        WHERE day >= ? AND day <= ?
         GROUP BY source
+        HAVING SUM(article_count) > 0
         ORDER BY article_count
-        ''', (start_date_str, end_date_str))
-        source_counts = cursor.fetchall()
+        ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
+        rows = cursor.fetchall()
+        source_counts = [(source, count) for source, count, _ in rows]
+        total_articles = sum(count for _, count in source_counts)
+        short_content_count = sum(short for _, _, short in rows)
         low_coverage_sources = []
         if source_counts:
             total_sources = len(source_counts)
             avg_per_source = total_articles / total_sources if total_sources > 0 else 0
             threshold = max(3, avg_per_source * 0.3)
             low_coverage_sources = [(source, count) for source, count in source_counts if count < threshold]
-        cursor.execute('''
-        SELECT COUNT(*) 
-        FROM articles
-        WHERE publish_date >= ? AND publish_date <= ?
-        AND (content IS NULL OR LENGTH(content) < 200)
-        ''', (start_date_str, end_date_str))
-        short_content_count = cursor.fetchone()[0]
         conn.close()
         print("\n===== COVERAGE QUALITY REPORT =====")
         print(f"Date Range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
@@ -555,92 +4634,145 @@ class FinancialNewsScraper:
             'short_content_count': short_content_count
         }
     
-    def search_by_term(self, term):
-        """Search for articles containing a specific term"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        now = datetime.datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
-        cursor.execute('''
+    def search_by_term(self, term, limit=50):
+        """
+        Search for articles containing a specific term, best matches first.
+        Every word of the term must appear (as a word or word prefix) in the title,
+        summary or content. Returns up to `limit` rows of
+        (id, title, url, source, publish_date, summary, snippet), where snippet is
+        the matching passage with the hits wrapped in [brackets].
+        """
+        return list(self.iter_search_results(term, limit=limit))
+    
+    def iter_search_results(self, term, columns=None, limit=None, chunk_size=500):
+        """
+        Generator version of search_by_term: ArticleRecord namedtuples of the given columns
+        (any of API_COLUMNS plus 'snippet'), best matches first, read chunk_size rows at a time.
+        """
+        columns = select_article_columns(columns, default=SEARCH_COLUMNS, allowed=list(API_COLUMNS) + ['snippet'])
+        conn = self.connect()
+        conn.execute('''
         INSERT OR REPLACE INTO search_terms (term, last_search)
         VALUES (?, ?)
-        ''', (term, now))
-        cursor.execute('''
-        SELECT id, title, url, source, publish_date, summary
-        FROM articles
-        WHERE title LIKE ? OR content LIKE ? OR summary LIKE ?
-        ORDER BY publish_date DESC
-        ''', (f'%{term}%', f'%{term}%', f'%{term}%'))
-        results = cursor.fetchall()
+        ''', (term, datetime.datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')))
         conn.commit()
-        conn.close()
-        return results
+        # Quote each word so punctuation like 'S&P' is searched literally, not as FTS syntax
+        match_query = ' '.join('"' + word.replace('"', '""') + '"*' for word in term.split())
+        if self.fts_enabled and match_query:
+            expressions = dict(API_COLUMNS, snippet="snippet(articles_fts, -1, '[', ']', '...', 16)")
+            query = f'''
+            SELECT {', '.join(expressions[column] for column in columns)}
+            FROM articles_fts
+            JOIN articles a ON a.id = articles_fts.rowid
+            {'LEFT JOIN article_bodies b ON b.content_hash = a.content_hash' if 'content' in columns else ''}
+            WHERE articles_fts MATCH ?
+            ORDER BY bm25(articles_fts, 10.0, 3.0, 1.0)
+            '''
+            params = [match_query]
+        else:
+            expressions = dict(API_COLUMNS, snippet='a.summary')
+            query = f'''
+            SELECT {', '.join(expressions[column] for column in columns)}
+            FROM articles a
+            LEFT JOIN article_bodies b ON b.content_hash = a.content_hash
+            WHERE a.title LIKE ? OR a.summary LIKE ? OR IFNULL(a.content, inflate_body(b.body)) LIKE ?
+            ORDER BY a.publish_date DESC, a.id DESC
+            '''
+            params = [f'%{term}%'] * 3
+        return self._iter_records(conn, query, params, columns, limit, chunk_size)
+    
+    def _iter_records(self, conn, query, params, columns, limit=None, chunk_size=500):
+        """
+        Yield the rows of query as ArticleRecords, fetching chunk_size rows at a time, and close
+        conn when done. The read transaction stays open until the generator is exhausted or closed.
+        """
+        if limit is not None:
+            query += " LIMIT ?"
+            params = list(params) + [limit]
+        record_type = article_record_type(columns)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from map(record_type._make, rows)
+        finally:
+            conn.close()
+    
+    def _iter_articles(self, columns, default, conditions=(), params=(), order='a.publish_date DESC, a.id DESC',
+                       limit=None, chunk_size=500):
+        """ArticleRecords of the articles matching conditions, reading only the projected columns"""
+        columns = select_article_columns(columns, default=default)
+        query = f"SELECT {', '.join(API_COLUMNS[column] for column in columns)} FROM articles a"
+        if 'content' in columns:
+            query += " LEFT JOIN article_bodies b ON b.content_hash = a.content_hash"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {order}"
+        return self._iter_records(self.connect(), query, params, columns, limit, chunk_size)
     
     def get_articles_by_category(self, category):
         """Get articles by category"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-        SELECT id, title, url, source, publish_date, summary
-        FROM articles
-        WHERE category = ?
-        ORDER BY publish_date DESC
-        ''', (category,))
-        results = cursor.fetchall()
-        conn.close()
-        return results
+        return list(self.iter_articles_by_category(category))
+    
+    def iter_articles_by_category(self, category, columns=None, limit=None, chunk_size=500):
+        """
+        Generator version of get_articles_by_category: ArticleRecord namedtuples of the given
+        columns (default id, title, url, source, publish_date, summary), newest first
+        """
+        return self._iter_articles(columns, CATEGORY_COLUMNS, ["a.category = ?"], [category],
+                                   limit=limit, chunk_size=chunk_size)
     
     def get_recent_articles(self, limit=20):
         """Get the most recent articles"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-        SELECT id, title, url, source, publish_date, summary, category
-        FROM articles
-        ORDER BY retrieved_date DESC
-        LIMIT ?
-        ''', (limit,))
-        results = cursor.fetchall()
-        conn.close()
-        return results
+        return list(self.iter_recent_articles(limit=limit))
+    
+    def iter_recent_articles(self, columns=None, limit=None, chunk_size=500):
+        """
+        Generator version of get_recent_articles: ArticleRecord namedtuples of the given columns
+        (default id, title, url, source, publish_date, summary, category), last retrieved first
+        """
+        return self._iter_articles(columns, DEFAULT_API_COLUMNS, order='a.retrieved_date DESC, a.id DESC',
+                                   limit=limit, chunk_size=chunk_size)
         
     def get_articles_by_date_range(self, start_date, end_date):
         """Get articles published within a specific date range (using UTC)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         try:
-            start_date_obj = datetime.datetime.strptime(start_date, '%Y-%m-%d').replace(tzinfo=timezone.utc)
-            end_date_obj = datetime.datetime.strptime(end_date, '%Y-%m-%d').replace(tzinfo=timezone.utc)
-            end_date_obj = end_date_obj.replace(hour=23, minute=59, second=59)
-            start_date_str = start_date_obj.strftime('%Y-%m-%d %H:%M:%S')
-            end_date_str = end_date_obj.strftime('%Y-%m-%d %H:%M:%S')
-            cursor.execute('''
-            SELECT id, title, url, source, publish_date, summary, category
-            FROM articles
-            WHERE publish_date >= ? AND publish_date <= ?
-            ORDER BY publish_date DESC
-            ''', (start_date_str, end_date_str))
-            results = cursor.fetchall()
-            conn.close()
-            return results
+            return list(self.iter_articles_by_date_range(start_date, end_date))
         except ValueError as e:
             logging.error(f"Date format error: {e}")
-            conn.close()
             return []
+    
+    def iter_articles_by_date_range(self, start_date, end_date, columns=None, limit=None, chunk_size=500):
+        """
+        Generator version of get_articles_by_date_range: ArticleRecord namedtuples of the given
+        columns (default id, title, url, source, publish_date, summary, category) published from
+        start_date through end_date (YYYY-MM-DD, UTC), newest first. Raises ValueError for a bad date.
+        """
+        start_date_obj = datetime.datetime.strptime(start_date, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        end_date_obj = datetime.datetime.strptime(end_date, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        end_date_obj = end_date_obj.replace(hour=23, minute=59, second=59)
+        return self._iter_articles(columns, DEFAULT_API_COLUMNS, ["a.publish_date >= ?", "a.publish_date <= ?"],
+                                   [start_date_obj.strftime('%Y-%m-%d %H:%M:%S'), end_date_obj.strftime('%Y-%m-%d %H:%M:%S')],
+                                   limit=limit, chunk_size=chunk_size)
         
     def export_to_json(self, filename='financial_news_export.json', filter_query=None, filter_params=None):
         """Export the database to a JSON file with optional filtering"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         if filter_query and filter_params:
-            query = f'SELECT * FROM articles WHERE {filter_query}'
+            query = f'SELECT * FROM articles_full WHERE {filter_query}'
             cursor.execute(query, filter_params)
         else:
-            cursor.execute('SELECT * FROM articles')
+            cursor.execute('SELECT * FROM articles_full')
         rows = cursor.fetchall()
         result = []
         for row in rows:
-            result.append({key: row[key] for key in row.keys()})
+            article = {key: row[key] for key in row.keys() if key != 'body'}
+            article['content'] = article_content(row['content'], row['body'])
+            result.append(article)
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(result, f, ensure_ascii=False, indent=4)
         conn.close()
@@ -661,11 +4793,255 @@ class FinancialNewsScraper:
         except ValueError as e:
             logging.error(f"Date format error: {e}")
             return 0
+    
+    def export_articles(self, filename, fmt='ndjson', columns=None, start_date=None, end_date=None,
+                        compress=False, chunk_size=1000):
+        """
+        Stream articles to a file without loading the table into memory.
+        fmt is 'ndjson' (one JSON object per line), 'csv' or 'parquet'. columns limits the
+        exported columns (default: all), start_date/end_date (YYYY-MM-DD) filter on publish
+        date like export_date_range_to_json, and compress gzips NDJSON/CSV output (Parquet
+        uses gzip column compression instead). Rows are read chunk_size at a time.
+        Returns the number of exported articles.
+        """
+        if fmt not in ('ndjson', 'csv', 'parquet'):
+            raise ValueError(f"Unsupported export format: {fmt}")
+        if fmt == 'parquet' and pyarrow is None:
+            logging.error("Parquet export requires pyarrow")
+            return 0
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA table_info(articles_full)")
+        column_types = {row[1]: row[2].upper() for row in cursor.fetchall() if row[1] != 'body'}
+        columns = list(columns) if columns else list(column_types)
+        unknown = [column for column in columns if column not in column_types]
+        if unknown:
+            conn.close()
+            raise ValueError(f"Unknown article columns: {', '.join(unknown)}")
+        # The compressed body is read as an extra last column and decompressed into content
+        content_index = columns.index('content') if 'content' in columns else None
+        query = f"SELECT {', '.join(columns + ['body'] * (content_index is not None))} FROM articles_full"
+        params = ()
+        try:
+            if start_date or end_date:
+                start_date_obj = datetime.datetime.strptime(start_date or '1970-01-01', '%Y-%m-%d')
+                end_date_obj = datetime.datetime.strptime(end_date or '9999-12-31', '%Y-%m-%d')
+                end_date_obj = end_date_obj.replace(hour=23, minute=59, second=59)
+                query += " WHERE publish_date >= ? AND publish_date <= ?"
+                params = (start_date_obj.strftime('%Y-%m-%d %H:%M:%S'), end_date_obj.strftime('%Y-%m-%d %H:%M:%S'))
+        except ValueError as e:
+            logging.error(f"Date format error: {e}")
+            conn.close()
+            return 0
+        cursor.execute(query + " ORDER BY id", params)
+
+        def fetch_chunk():
+            rows = cursor.fetchmany(chunk_size)
+            if content_index is None:
+                return rows
+            chunk = []
+            for row in rows:
+                body = row[-1]
+                row = list(row[:-1])
+                row[content_index] = article_content(row[content_index], body)
+                chunk.append(row)
+            return chunk
+
+        count = 0
+        if fmt == 'parquet':
+            schema = pyarrow.schema([(column, pyarrow.int64() if column_types[column] == 'INTEGER' else pyarrow.string())
+                                     for column in columns])
+            with pyarrow.parquet.ParquetWriter(filename, schema, compression='gzip' if compress else 'snappy') as writer:
+                while True:
+                    rows = fetch_chunk()
+                    if not rows:
+                        break
+                    writer.write_table(pyarrow.Table.from_pylist([dict(zip(columns, row)) for row in rows], schema=schema))
+                    count += len(rows)
+        else:
+            opener = gzip.open if compress else open
+            newline = '' if fmt == 'csv' else None
+            with opener(filename, 'wt', encoding='utf-8', newline=newline) as f:
+                csv_writer = None
+                if fmt == 'csv':
+                    csv_writer = csv.writer(f)
+                    csv_writer.writerow(columns)
+                while True:
+                    rows = fetch_chunk()
+                    if not rows:
+                        break
+                    if csv_writer:
+                        csv_writer.writerows(rows)
+                    else:
+                        f.writelines(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n' for row in rows)
+                    count += len(rows)
+        conn.close()
+        logging.info(f"Exported {count} articles to {filename} ({fmt})")
+        return count
         
-def main():
+def parse_arguments(argv=None):
+    """Command line options; without --daemon, --worker, --api-port or --queue-port the interactive menu is started"""
+    parser = argparse.ArgumentParser(description="Scrape, store and search financial news articles.")
+    parser.add_argument('--daemon', action='store_true',
+                        help="poll every source on its own interval until SIGTERM/SIGINT instead of showing the menu")
+    parser.add_argument('--worker', action='store_true',
+                        help="crawl from the work queue in the database, alongside any other workers using it, "
+                             "until SIGTERM/SIGINT")
+    parser.add_argument('--processes', type=int, default=1, help="worker processes to run on this machine with --worker")
+    parser.add_argument('--idle-exit', type=float, help="stop a --worker after this many seconds without work")
+    parser.add_argument('--config', help="JSON file with 'poll_intervals' ({source: seconds}), 'default_interval' "
+                                         "and 'sources' (the names to poll) for --daemon and --worker")
+    parser.add_argument('--status-file', default='scraper_status.json',
+                        help="health/status file written by --daemon and --worker (one per process, numbered)")
+    parser.add_argument('--db', default='financial_news.db', help="SQLite database path")
+    parser.add_argument('--taxonomy', help="JSON file of category keywords to use instead of the built-in taxonomy")
+    parser.add_argument('--extraction-profiles',
+                        help="JSON file of per-domain extraction selectors to use instead of the built-in profiles")
+    parser.add_argument('--archive-dir', help="keep the raw HTML of fetched articles in a page archive in this directory")
+    parser.add_argument('--max-workers', type=int, default=8)
+    parser.add_argument('--parse-workers', type=int, default=0)
+    parser.add_argument('--metrics-file', help="write a JSON metrics snapshot here periodically")
+    parser.add_argument('--metrics-port', type=int, help="serve Prometheus metrics on this port")
+    parser.add_argument('--api-port', type=int, help="serve the JSON article API on this port, alongside --daemon "
+                                                     "or --worker or on its own")
+    parser.add_argument('--api-host', default='127.0.0.1', help="address for --api-port to listen on")
+    parser.add_argument('--queue-port', type=int, help="serve the work queue in the database on this port, for "
+                                                       "--worker processes on other hosts, alongside --worker or on its own")
+    parser.add_argument('--queue-host', default='127.0.0.1', help="address for --queue-port to listen on")
+    parser.add_argument('--queue', help="URL of a work queue served with --queue-port on another host to take work from, "
+                                        "storing articles in --db")
+    return parser.parse_args(argv)
+
+def start_api_from_arguments(args):
+    """Bring the database schema up to date and serve the article API on args.api_port in the background"""
+    FinancialNewsScraper(args.db).close()
+    service = ArticleQueryService(args.db)
+    port = service.serve(args.api_port, args.api_host)
+    print(f"Serving the article API on http://{args.api_host}:{port}/articles")
+    return service
+
+def start_queue_from_arguments(args):
+    """Bring the database schema up to date and serve its work queue on args.queue_port in the background"""
+    FinancialNewsScraper(args.db).close()
+    work_queue = SQLiteWorkQueue(args.db)
+    port = work_queue.serve(args.queue_port, args.queue_host)
+    print(f"Serving the work queue on http://{args.queue_host}:{port}/")
+    return work_queue
+
+def wait_for_stop_signal():
+    """Block until SIGTERM or SIGINT"""
+    stopped = threading.Event()
+    previous_handlers = {signum: signal.signal(signum, lambda signum, frame: stopped.set())
+                         for signum in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        # A timeout keeps the wait short enough for the handlers to run promptly
+        while not stopped.wait(1.0):
+            pass
+    finally:
+        FinancialNewsScraper.restore_signal_handlers(previous_handlers)
+
+def scraper_from_arguments(args):
+    """Set up a scraper from the command line and config file; returns it and the sources to poll"""
+    config = {}
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            config = json.load(f)
+    scraper = FinancialNewsScraper(args.db, max_workers=args.max_workers, parse_workers=args.parse_workers,
+                                   taxonomy_path=args.taxonomy, profiles_path=args.extraction_profiles,
+                                   archive_dir=args.archive_dir or None, metrics_path=args.metrics_file,
+                                   metrics_port=args.metrics_port, queue_url=args.queue)
+    scraper.poll_intervals.update(config.get('poll_intervals', {}))
+    scraper.default_poll_interval = config.get('default_interval', scraper.default_poll_interval)
+    sources = scraper.news_sources
+    if config.get('sources'):
+        unknown = [name for name in config['sources'] if name not in scraper.news_sources]
+        if unknown:
+            logging.warning(f"Ignoring unknown sources in {args.config}: {', '.join(unknown)}")
+        sources = {name: url for name, url in scraper.news_sources.items() if name in config['sources']}
+    return scraper, sources
+
+def run_daemon_from_arguments(args):
+    """Set up a scraper from the command line and config file and poll until stopped"""
+    scraper, sources = scraper_from_arguments(args)
+    try:
+        scraper.run_daemon(args.status_file, sources)
+    finally:
+        scraper.close()
+
+def run_worker_from_arguments(args, number=None):
+    """Set up a scraper from the command line and config file and work from the shared queue until stopped"""
+    status_path = args.status_file
+    if number is not None and status_path:
+        root, ext = os.path.splitext(status_path)
+        status_path = f"{root}.{number}{ext}"
+    scraper, sources = scraper_from_arguments(args)
+    try:
+        scraper.run_worker(sources, status_path=status_path, idle_exit=args.idle_exit)
+    finally:
+        scraper.close()
+
+def run_workers_from_arguments(args):
+    """
+    Run args.processes workers on this machine and wait for them. SIGTERM is passed on to
+    every worker; SIGINT from the terminal reaches them directly.
+    """
+    if args.processes <= 1:
+        run_worker_from_arguments(args)
+        return
+    # Bring the schema up to date once, before the workers open the database
+    FinancialNewsScraper(args.db).close()
+    workers = [multiprocessing.Process(target=run_worker_from_arguments, args=(args, number), name=f"worker-{number}")
+               for number in range(args.processes)]
+    for worker in workers:
+        worker.start()
+
+    def forward_signal(signum, frame):
+        if signum == signal.SIGTERM:
+            for worker in workers:
+                if worker.is_alive():
+                    os.kill(worker.pid, signum)
+
+    previous_handlers = {signum: signal.signal(signum, forward_signal) for signum in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        for worker in workers:
+            worker.join()
+    finally:
+        FinancialNewsScraper.restore_signal_handlers(previous_handlers)
+    failed = [worker.name for worker in workers if worker.exitcode]
+    if failed:
+        logging.error(f"Workers exited with errors: {', '.join(failed)}")
+
+def main(argv=None):
     """Main function to run the scraper"""
+    args = parse_arguments(argv)
+    stop_services = []
+    if args.api_port is not None:
+        stop_services.append(start_api_from_arguments(args).stop)
+    if args.queue_port is not None:
+        stop_services.append(start_queue_from_arguments(args).close)
+    if stop_services:
+        try:
+            if args.daemon:
+                run_daemon_from_arguments(args)
+            elif args.worker:
+                run_workers_from_arguments(args)
+            else:
+                wait_for_stop_signal()
+        finally:
+            for stop in stop_services:
+                stop()
+        return
+    if args.daemon:
+        run_daemon_from_arguments(args)
+        return
+    if args.worker:
+        run_workers_from_arguments(args)
+        return
     try:
-        scraper = FinancialNewsScraper()
+        scraper = FinancialNewsScraper(args.db, max_workers=args.max_workers, parse_workers=args.parse_workers,
+                                       taxonomy_path=args.taxonomy, profiles_path=args.extraction_profiles,
+                                       archive_dir=args.archive_dir or None, metrics_path=args.metrics_file,
+                                       metrics_port=args.metrics_port)
         print("\n=== Financial News Scraper ===")
         print("1. Scrape all news sources (last 7 days)")
         print("2. Scrape news for specific date range")
@@ -677,9 +5053,11 @@ def main():
         print("8. Scrape entire website (all articles)")
         print("9. Analyze articles by date range")
         print("10. Check coverage quality")
-        print("11. Exit")
+        print("11. Re-categorize stored articles")
+        print("12. Re-extract articles from the page archive")
+        print("13. Exit")
         while True:
-            choice = input("\nEnter your choice (1-11): ")
+            choice = input("\nEnter your choice (1-13): ")
             if choice == '1':
                 print("Scraping recent news (last 7 days). This may take several minutes...")
                 new_articles = scraper.scrape_by_date_range()
@@ -694,23 +5072,23 @@ def main():
             elif choice == '3':
                 term = input("Enter search term: ")
                 results = scraper.search_by_term(term)
-                print(f"\nFound {len(results)} articles containing '{term}':")
-                for i, (id, title, url, source, date, summary) in enumerate(results, 1):
-                    print(f"{i}. {title} - {source} ({date})")
+                print(f"\nFound {len(results)} articles containing '{term}' (best matches first):")
+                for i, (id, title, url, source, date, summary, snippet) in enumerate(results, 1):
+                    print(f"{i}. {title} - {source} ({date or 'undated'})")
                     print(f"   URL: {url}")
-                    print(f"   Summary: {summary[:100]}...\n")
+                    print(f"   Match: {snippet}\n")
             elif choice == '4':
                 limit = input("How many recent articles to display? (default: 20): ")
                 limit = int(limit) if limit.isdigit() else 20
                 results = scraper.get_recent_articles(limit)
                 print(f"\nMost recent {len(results)} articles:")
                 for i, (id, title, url, source, date, summary, category) in enumerate(results, 1):
-                    print(f"{i}. {title} - {source} ({date})")
+                    print(f"{i}. {title} - {source} ({date or 'undated'})")
                     print(f"   Category: {category}")
                     print(f"   URL: {url}")
                     print(f"   Summary: {summary[:100]}...\n")
             elif choice == '5':
-                categories = ['stocks', 'cryptocurrency', 'economy', 'markets', 'business', 'personal_finance', 'real_estate', 'general']
+                categories = list(scraper.categorizer.taxonomy) + ['general']
                 print("Available categories:")
                 for i, category in enumerate(categories, 1):
                     print(f"{i}. {category}")
@@ -720,7 +5098,7 @@ def main():
                     results = scraper.get_articles_by_category(category)
                     print(f"\nFound {len(results)} articles in category '{category}':")
                     for i, (id, title, url, source, date, summary) in enumerate(results, 1):
-                        print(f"{i}. {title} - {source} ({date})")
+                        print(f"{i}. {title} - {source} ({date or 'undated'})")
                         print(f"   URL: {url}")
                         print(f"   Summary: {summary[:100]}...\n")
                 else:
@@ -732,7 +5110,7 @@ def main():
                 results = scraper.get_articles_by_date_range(start_date, end_date)
                 print(f"\nFound {len(results)} articles between {start_date} and {end_date}:")
                 for i, (id, title, url, source, date, summary, category) in enumerate(results, 1):
-                    print(f"{i}. {title} - {source} ({date})")
+                    print(f"{i}. {title} - {source} ({date or 'undated'})")
                     print(f"   Category: {category}")
                     print(f"   URL: {url}")
                     print(f"   Summary: {summary[:100]}...\n")
@@ -745,10 +5123,23 @@ def main():
                         count = scraper.export_date_range_to_json(start_date, end_date, filename)
                         print(f"Exported {count} articles to {filename}")
             elif choice == '7':
-                filename = input("Enter export filename (default: financial_news_export.json): ")
-                filename = filename if filename else 'financial_news_export.json'
-                count = scraper.export_to_json(filename)
-                print(f"Exported {count} articles to {filename}")
+                fmt = input("Export format - json, ndjson, csv or parquet (default: json): ").lower() or 'json'
+                if fmt == 'json':
+                    filename = input("Enter export filename (default: financial_news_export.json): ")
+                    filename = filename if filename else 'financial_news_export.json'
+                    count = scraper.export_to_json(filename)
+                    print(f"Exported {count} articles to {filename}")
+                elif fmt in ('ndjson', 'csv', 'parquet'):
+                    compress = fmt != 'parquet' and input("Compress with gzip? (y/n): ").lower() in ['y', 'yes']
+                    default_filename = f"financial_news_export.{fmt}" + ('.gz' if compress else '')
+                    filename = input(f"Enter export filename (default: {default_filename}): ") or default_filename
+                    start_date = input("Start date (YYYY-MM-DD, leave blank for no limit): ")
+                    end_date = input("End date (YYYY-MM-DD, leave blank for no limit): ")
+                    count = scraper.export_articles(filename, fmt, start_date=start_date or None,
+                                                    end_date=end_date or None, compress=compress)
+                    print(f"Exported {count} articles to {filename}")
+                else:
+                    print("Invalid export format.")
             elif choice == '8':
                 print("Scraping entire website (all articles without date filtering). This may take several minutes...")
                 new_articles = scraper.scrape_all_articles()
@@ -778,10 +5169,18 @@ def main():
                 scraper.check_coverage_quality(start_date if start_date else None, 
                                                end_date if end_date else None)
             elif choice == '11':
+                print("Re-categorizing stored articles with the current taxonomy...")
+                changed = scraper.recategorize_articles()
+                print(f"{changed} articles changed category.")
+            elif choice == '12':
+                print("Re-extracting stored articles from their archived pages...")
+                updated = scraper.reextract_archived_articles()
+                print(f"{updated} articles updated.")
+            elif choice == '13':
                 print("Exiting Financial News Scraper.")
                 break
             else:
-                print("Invalid choice. Please enter a number between 1 and 11.")
+                print("Invalid choice. Please enter a number between 1 and 13.")
     except Exception as e:
         print(f"Error in main function: {e}")
         traceback.print_exc()
@@ -792,4 +5191,7 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"Critical error: {e}")
         traceback.print_exc()
-        input("Press Enter to exit...")
+        # Keep a console window open for an interactive user, never block a service
+        if sys.stdin.isatty():
+            input("Press Enter to exit...")
+        sys.exit(1)